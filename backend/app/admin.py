@@ -21,20 +21,34 @@ import hmac
 import base64
 import hashlib
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 import io
+import re
 import csv as _csv
-from collections import Counter
+import zipfile
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from xml.sax.saxutils import escape as _xml_escape
 
 from fastapi import APIRouter, Depends, Header, HTTPException, Query
-from fastapi.responses import Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 
+# supabase-py import ตอนสร้าง client ครั้งแรก (store.remote_client) — ไม่ถ่วง cold start
 try:
-    from supabase import create_client  # type: ignore
-except Exception:  # pragma: no cover
-    create_client = None  # type: ignore
+    from app.store import local_client, remote_client, use_local  # type: ignore
+    from app.timing import instrument  # type: ignore
+    from app import matching, metrics, profiler, replica  # type: ignore
+except Exception:
+    from store import local_client, remote_client, use_local  # type: ignore
+    from timing import instrument  # type: ignore
+    import matching  # type: ignore
+    import metrics  # type: ignore
+    import profiler  # type: ignore
+    import replica  # type: ignore
 
 logger = logging.getLogger("shd-careers.admin")
 
@@ -59,14 +73,36 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 
 
 # ---------------------------
-# Supabase helper
+# Change hooks — ให้ main.py ลงทะเบียนไว้ล้าง cache ฝั่ง public เมื่อแอดมินแก้ข้อมูล
+# (admin ไม่ import main เพื่อกัน circular import)
+# ---------------------------
+_CHANGE_HOOKS: Dict[str, List[Callable[..., None]]] = {"jobs": [], "content": [], "applications": []}
+
+
+def on_change(kind: str, fn: Callable[..., None]) -> None:
+    _CHANGE_HOOKS.setdefault(kind, []).append(fn)
+
+
+def _emit_change(kind: str, **info: Any) -> None:
+    for fn in _CHANGE_HOOKS.get(kind, []):
+        try:
+            fn(**info)
+        except Exception as e:
+            logger.warning("change hook %s failed: %s", kind, e)
+
+
+# ---------------------------
+# Supabase helper (STORAGE_BACKEND=local -> SQLite, ดู store.py)
 # ---------------------------
 def _sb():
+    if use_local():
+        return instrument(local_client())
     if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
         raise HTTPException(status_code=500, detail="Supabase env not configured")
-    if create_client is None:
+    client = remote_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+    if client is None:
         raise HTTPException(status_code=500, detail="supabase client not installed")
-    return create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+    return instrument(client)
 
 
 def _data(res: Any) -> Any:
@@ -152,19 +188,162 @@ def _record_fail(ip: str) -> None:
 # ---------------------------
 # Storage signed URL
 # ---------------------------
-def _signed_url(path: str) -> Optional[str]:
+def _abs_signed(url: Optional[str]) -> Optional[str]:
+    if url and url.startswith("/"):
+        url = f"{SUPABASE_URL}/storage/v1{url}"
+    return url
+
+
+# ✅ Signed URL cache (LRU, in-memory ต่อ worker)
+#   - ใช้ URL เดิมซ้ำจนถึง "ก่อนหมดอายุ SAFETY วินาที"
+#   - เหลืออายุน้อยกว่า REFRESH วินาที -> คืนของเดิมไปก่อน แล้วเซ็นใหม่เบื้องหลัง
+SIGNED_URL_CACHE_MAX = int(os.getenv("SIGNED_URL_CACHE_MAX", "2000"))
+SIGNED_URL_SAFETY_SEC = min(int(os.getenv("SIGNED_URL_SAFETY_SEC", "300")), SIGNED_URL_TTL_SEC // 2)
+SIGNED_URL_REFRESH_SEC = max(
+    SIGNED_URL_SAFETY_SEC, min(int(os.getenv("SIGNED_URL_REFRESH_SEC", "900")), SIGNED_URL_TTL_SEC // 2)
+)
+
+_SIGNED_CACHE: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()  # path -> (expire_ts, url)
+_SIGNED_LOCK = threading.Lock()
+_SIGNED_REFRESHING: set = set()
+_SIGNED_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="signed-url-refresh")
+_SIGNED_STATS: Dict[str, int] = {"hits": 0, "misses": 0, "refreshes": 0, "evictions": 0, "errors": 0}
+
+
+def _signed_cache_put(signed: Dict[str, Optional[str]], issued_at: float) -> None:
+    exp = issued_at + SIGNED_URL_TTL_SEC
+    with _SIGNED_LOCK:
+        for p, url in signed.items():
+            if not url:
+                continue
+            _SIGNED_CACHE[p] = (exp, url)
+            _SIGNED_CACHE.move_to_end(p)
+        while len(_SIGNED_CACHE) > max(1, SIGNED_URL_CACHE_MAX):
+            _SIGNED_CACHE.popitem(last=False)
+            _SIGNED_STATS["evictions"] += 1
+
+
+def _signed_item_url(item: Any) -> Optional[str]:
+    if not isinstance(item, dict) or item.get("error"):
+        return None
+    return _abs_signed(item.get("signedURL") or item.get("signedUrl") or item.get("signed_url"))
+
+
+def _sign_each(bucket: Any, paths: List[str], out: Dict[str, Optional[str]]) -> None:
+    """ทางสำรองเมื่อ batch พัง: เซ็นทีละไฟล์ -> ไฟล์ที่หายไป (signedURL: null) เสียแค่ลิงก์ของตัวเอง"""
+    for p in paths:
+        try:
+            out[p] = _signed_item_url(bucket.create_signed_url(p, SIGNED_URL_TTL_SEC))
+        except Exception as e:
+            logger.info("signed_url failed for %s: %s", p, e)
+
+
+def _sign_batch(paths: List[str], sb: Any = None) -> Dict[str, Optional[str]]:
+    """เรียก Storage จริง (create_signed_urls = 1 request ต่อทุก path) แล้วเก็บลง cache
+    storage3 พังทั้ง batch ถ้ามีไฟล์ใดไม่อยู่ (signedURL เป็น null) -> ถอยไปเซ็นทีละไฟล์"""
+    out: Dict[str, Optional[str]] = {p: None for p in paths}
+    if not paths:
+        return out
+    issued_at = time.time()
     try:
-        sb = _sb()
-        res = sb.storage.from_(SUPABASE_BUCKET).create_signed_url(path, SIGNED_URL_TTL_SEC)
-        url = None
-        if isinstance(res, dict):
-            url = res.get("signedURL") or res.get("signedUrl") or res.get("signed_url")
-        if url and url.startswith("/"):
-            url = f"{SUPABASE_URL}/storage/v1{url}"
-        return url
+        bucket = (sb or _sb()).storage.from_(SUPABASE_BUCKET)
     except Exception as e:
-        logger.warning("signed_url failed for %s: %s", path, e)
-        return None
+        with _SIGNED_LOCK:
+            _SIGNED_STATS["errors"] += 1
+        logger.warning("signed_urls failed for %d paths: %s", len(paths), e)
+        return out
+    try:
+        res = bucket.create_signed_urls(paths, SIGNED_URL_TTL_SEC)
+        for item in res or []:
+            p = item.get("path") if isinstance(item, dict) else None
+            if p in out:
+                out[p] = _signed_item_url(item)
+    except Exception as e:
+        with _SIGNED_LOCK:
+            _SIGNED_STATS["errors"] += 1
+        logger.warning("signed_urls batch failed for %d paths, signing one by one: %s", len(paths), e)
+        _sign_each(bucket, paths, out)
+    _signed_cache_put(out, issued_at)
+    return out
+
+
+def _refresh_signed(paths: List[str]) -> None:
+    try:
+        _sign_batch(paths)
+    finally:
+        with _SIGNED_LOCK:
+            _SIGNED_REFRESHING.difference_update(paths)
+
+
+def _signed_urls(paths: List[str], sb: Any = None) -> Dict[str, Optional[str]]:
+    """เซ็นหลายไฟล์ในครั้งเดียว (ผ่าน cache) คืน {path: url|None} — path ที่เซ็นไม่ผ่านจะได้ None"""
+    uniq = list(dict.fromkeys(p for p in paths if p))
+    out: Dict[str, Optional[str]] = {}
+    miss: List[str] = []
+    stale: List[str] = []
+    now = time.time()
+    n_hit = 0
+    with _SIGNED_LOCK:
+        for p in uniq:
+            hit = _SIGNED_CACHE.get(p)
+            if hit and hit[0] - SIGNED_URL_SAFETY_SEC > now:
+                _SIGNED_CACHE.move_to_end(p)
+                _SIGNED_STATS["hits"] += 1
+                n_hit += 1
+                out[p] = hit[1]
+                if hit[0] - SIGNED_URL_REFRESH_SEC <= now and p not in _SIGNED_REFRESHING:
+                    _SIGNED_REFRESHING.add(p)
+                    stale.append(p)
+            else:
+                _SIGNED_STATS["misses"] += 1
+                miss.append(p)
+        _SIGNED_STATS["refreshes"] += len(stale)
+    # hit ที่ใกล้หมดอายุ (ส่งของเดิม + เซ็นใหม่เบื้องหลัง) นับเป็น stale
+    metrics.cache_event("signed_url", "hit", n_hit - len(stale))
+    metrics.cache_event("signed_url", "stale", len(stale))
+    metrics.cache_event("signed_url", "miss", len(miss))
+    if stale:
+        _SIGNED_POOL.submit(_refresh_signed, stale)
+    if miss:
+        out.update(_sign_batch(miss, sb=sb))
+    return out
+
+
+def signed_url_cache_stats() -> Dict[str, Any]:
+    with _SIGNED_LOCK:
+        st = dict(_SIGNED_STATS)
+        size = len(_SIGNED_CACHE)
+    looked = st["hits"] + st["misses"]
+    return {
+        **st,
+        "size": size,
+        "max_size": SIGNED_URL_CACHE_MAX,
+        "hit_ratio": round(st["hits"] / looked, 4) if looked else 0.0,
+        "ttl_sec": SIGNED_URL_TTL_SEC,
+        "safety_sec": SIGNED_URL_SAFETY_SEC,
+        "refresh_sec": SIGNED_URL_REFRESH_SEC,
+    }
+
+
+def _admin_metrics() -> List[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]:
+    st = signed_url_cache_stats()
+    now = time.time()
+    fails = list(_LOGIN_FAILS.values())
+    locked = sum(1 for f in fails if len([t for t in f if now - t < _LOGIN_WINDOW_SEC]) >= _LOGIN_MAX_FAILS)
+    return [
+        ("signed_url_cache_entries", "gauge", "Signed URLs held in the cache.", [({}, st["size"])]),
+        ("signed_url_cache_evictions_total", "counter", "Signed URLs evicted (LRU).", [({}, st["evictions"])]),
+        ("signed_url_sign_errors_total", "counter", "Signing batches that failed.", [({}, st["errors"])]),
+        ("admin_login_lockout_entries", "gauge", "IPs tracked in the login failure table.", [({}, len(fails))]),
+        ("admin_login_locked_ips", "gauge", "IPs currently locked out of admin login.", [({}, locked)]),
+    ]
+
+
+metrics.register_collector(_admin_metrics)
+
+
+def _signed_url(path: str) -> Optional[str]:
+    return _signed_urls([path]).get(path)
 
 
 def _resolve_file_url(stored: Optional[str]) -> Optional[str]:
@@ -179,6 +358,18 @@ def _resolve_file_url(stored: Optional[str]) -> Optional[str]:
     return stored
 
 
+def _resolve_file_urls(stored: List[Optional[str]], sb: Any = None) -> Dict[str, Optional[str]]:
+    """เหมือน _resolve_file_url แต่ทำทีละชุด — ไฟล์ใน storage เซ็นรวมใน request เดียว"""
+    paths = [v[len("storage:"):] for v in stored if v and v.startswith("storage:")]
+    signed = _signed_urls(paths, sb=sb)
+    out: Dict[str, Optional[str]] = {}
+    for v in stored:
+        if not v:
+            continue
+        out[v] = signed.get(v[len("storage:"):]) if v.startswith("storage:") else v
+    return out
+
+
 # ---------------------------
 # Schemas
 # ---------------------------
@@ -191,6 +382,20 @@ class StatusBody(BaseModel):
     admin_note: Optional[str] = None
 
 
+class BulkFilter(BaseModel):
+    status: str = ""
+    job_id: str = ""
+    q: str = ""
+
+
+class BulkStatusBody(StatusBody):
+    # เลือกอย่างใดอย่างหนึ่ง: ids ตรงๆ หรือ filter แบบเดียวกับหน้า list
+    ids: Optional[List[str]] = None
+    filter: Optional[BulkFilter] = None
+    # (filter) จำนวนแถวที่หน้าจอแสดงว่าจะโดนแก้ — ไม่ตรงกับที่ตรง filter จริง -> 409 ไม่แก้อะไร
+    expected_count: Optional[int] = None
+
+
 # ---------------------------
 # Routes — auth
 # ---------------------------
@@ -215,6 +420,64 @@ def me(admin: Dict[str, Any] = Depends(require_admin)) -> Dict[str, Any]:
     return {"ok": True, "exp": admin.get("exp")}
 
 
+@router.get("/debug/signed-url-cache")
+def debug_signed_url_cache(admin: Dict[str, Any] = Depends(require_admin)) -> Dict[str, Any]:
+    return {"ok": True, **signed_url_cache_stats()}
+
+
+@router.get("/debug/match-cache")
+def debug_match_cache(admin: Dict[str, Any] = Depends(require_admin)) -> Dict[str, Any]:
+    return {"ok": True, **match_cache_stats()}
+
+
+# ---------------------------
+# Routes — sampling profiler (ดู profiler.py)
+# ---------------------------
+@router.get("/debug/profile")
+async def debug_profile(
+    seconds: float = Query(10, gt=0, le=profiler.PROFILE_MAX_SEC),
+    interval_ms: float = Query(profiler.PROFILE_INTERVAL_MS, ge=1, le=1000),
+    include_idle: bool = False,
+    fmt: str = Query("collapsed", alias="format", pattern="^(collapsed|json)$"),
+    admin: Dict[str, Any] = Depends(require_admin),
+) -> Any:
+    """สุ่ม stack ทั้ง worker เป็นเวลา seconds — format=collapsed (flamegraph.pl/speedscope) หรือ json (สรุป)"""
+    sampler = await profiler.profile_for(seconds, interval_ms, include_idle)
+    if sampler is None:
+        raise HTTPException(status_code=409, detail="Another profile is running")
+    if fmt == "json":
+        return {"ok": True, **sampler.summary()}
+    return PlainTextResponse(
+        sampler.collapsed(),
+        headers={"X-Profile-Samples": str(sampler.samples), "Cache-Control": "no-store"},
+    )
+
+
+@router.get("/debug/profile/requests")
+def debug_profile_requests(admin: Dict[str, Any] = Depends(require_admin)) -> Dict[str, Any]:
+    return {"ok": True, "items": profiler.recent()}
+
+
+@router.get("/debug/profile/requests/{profile_id}")
+def debug_profile_request(
+    profile_id: str,
+    fmt: str = Query("collapsed", alias="format", pattern="^(collapsed|json)$"),
+    admin: Dict[str, Any] = Depends(require_admin),
+) -> Any:
+    res = profiler.get_result(profile_id)
+    if not res:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if fmt == "json":
+        return {"ok": True, "id": profile_id, **res["meta"]}
+    return PlainTextResponse(res["collapsed"], headers={"Cache-Control": "no-store"})
+
+
+def profile_authorized(headers: Dict[str, str]) -> bool:
+    """ใช้กับ X-Profile ต่อ request — ต้องมี token แอดมินที่ยังไม่หมดอายุ"""
+    auth = headers.get("authorization", "")
+    return auth.lower().startswith("bearer ") and verify_token(auth[7:].strip()) is not None
+
+
 # ---------------------------
 # Routes — stats (dashboard)
 # ---------------------------
@@ -350,36 +613,150 @@ def analytics(admin: Dict[str, Any] = Depends(require_admin)) -> Dict[str, Any]:
     }
 
 
+def _apply_app_filters(query: Any, q: str = "", status: str = "", job_id: str = "", fts: bool = False) -> Any:
+    """filter ชุดเดียวกันทั้งหน้า list / export (status, job_id, ค้นหาชื่อ/อีเมล/เบอร์)
+    fts=True (อ่านจาก read replica) -> ค้นด้วย FTS5 trigram แทน ilike (ต้องยาว >= 3 ตัวอักษร)"""
+    if status and status in ALLOWED_STATUS:
+        query = query.eq("status", status)
+    if job_id:
+        query = query.eq("job_id", job_id)
+    qn = (q or "").strip()
+    if qn and fts and len(qn) >= 3:
+        query = query.text_search("applications_fts", qn)
+    elif qn:
+        safe = qn.replace(",", " ").replace("*", " ").replace("(", " ").replace(")", " ")
+        query = query.or_(
+            f"first_name.ilike.*{safe}*,last_name.ilike.*{safe}*,"
+            f"email.ilike.*{safe}*,phone.ilike.*{safe}*"
+        )
+    return query
+
+
+# ✅ Match scoring (sort=match) — คะแนน cosine ของผู้สมัครกับคุณสมบัติของงาน (ดู matching.py)
+#   MatchIndex ต่องาน (LRU) เก็บ tf + คะแนนของใบสมัครที่คิดแล้ว -> request ถัดไปดึงตารางลูกและคิดคะแนนเฉพาะใบสมัครใหม่
+MATCH_CACHE_JOBS = max(1, int(os.getenv("MATCH_CACHE_JOBS", "64")))
+MATCH_SORT_MAX = max(1, int(os.getenv("MATCH_SORT_MAX", "5000")))  # ใบสมัครต่องานสูงสุดที่เรียงตามคะแนนได้
+_MATCH: "OrderedDict[str, matching.MatchIndex]" = OrderedDict()
+_MATCH_LOCK = threading.Lock()
+_MATCH_STATS: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0, "fetched": 0}
+
+
+def _match_index(job_id: str) -> matching.MatchIndex:
+    with _MATCH_LOCK:
+        ix = _MATCH.get(job_id)
+        if ix is not None:
+            _MATCH.move_to_end(job_id)
+            _MATCH_STATS["hits"] += 1
+            return ix
+        ix = _MATCH[job_id] = matching.MatchIndex(job_id)
+        _MATCH_STATS["misses"] += 1
+        while len(_MATCH) > MATCH_CACHE_JOBS:
+            _MATCH.popitem(last=False)
+            _MATCH_STATS["evictions"] += 1
+        return ix
+
+
+def match_scores(sb: Any, job_id: str, app_ids: List[str], complete: bool = False) -> Dict[str, float]:
+    """คะแนนของใบสมัคร app_ids ในงาน job_id — complete=True: app_ids คือใบสมัครทั้งหมดของงาน (ไม่มี filter อื่น)"""
+    try:
+        jobs = _data(sb.table("jobs").select(matching.JOB_COLS).eq("job_id", job_id).limit(1).execute()) or []
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"load job failed: {e}")
+    if not jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+    ix = _match_index(job_id)
+    ix.set_job(jobs[0])
+    missing = ix.missing(app_ids)
+    for i in range(0, len(missing), BULK_CHUNK):
+        chunk = missing[i:i + BULK_CHUNK]
+        try:
+            rows = _data(sb.table("applications").select(matching.APPLICANT_SELECT).in_("id", chunk).execute()) or []
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"load applicant profiles failed: {e}")
+        ix.add(rows)
+        with _MATCH_LOCK:
+            _MATCH_STATS["fetched"] += len(rows)
+    if complete:
+        ix.retain(app_ids)
+    return ix.scores()
+
+
+def match_cache_stats() -> Dict[str, Any]:
+    with _MATCH_LOCK:
+        jobs = {jid: {"applications": len(ix), **ix.stats} for jid, ix in _MATCH.items()}
+    return {"jobs": jobs, "max_jobs": MATCH_CACHE_JOBS, **_MATCH_STATS}
+
+
+def _list_by_match(
+    rep: Any, q: str, status: str, job_id: str, page: int, page_size: int
+) -> Dict[str, Any]:
+    """ใบสมัครของงานเดียวเรียงตามคะแนน (เท่ากัน -> ใหม่ก่อน) — ต้องได้ทุกแถวที่ตรง filter ก่อนแบ่งหน้า"""
+    sb = rep or _sb()
+    rows: List[Dict[str, Any]] = []
+    try:
+        while True:
+            query = _apply_app_filters(
+                sb.table("applications").select(replica.APP_LIST_COLS), q=q, status=status, job_id=job_id,
+                fts=rep is not None,
+            )
+            batch = _data(query.order("created_at", desc=True).order("id", desc=True)
+                          .range(len(rows), len(rows) + replica.PAGE - 1).execute()) or []
+            rows.extend(batch)
+            if len(rows) > MATCH_SORT_MAX:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Too many applications to sort by match (max {MATCH_SORT_MAX}); filter by status or q",
+                )
+            if len(batch) < replica.PAGE:
+                break
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"list applications failed: {e}")
+
+    # ตารางลูกไม่ได้อยู่ใน replica -> คะแนนอ่านจาก primary เสมอ
+    scores = match_scores(_sb(), job_id, [str(r["id"]) for r in rows], complete=not q.strip() and not status)
+    rows.sort(key=lambda r: -scores.get(str(r["id"]), 0.0))  # stable -> คะแนนเท่ากันยังใหม่ก่อน
+    start = (page - 1) * page_size
+    out = rows[start:start + page_size]
+    for r in out:
+        r["match_score"] = scores.get(str(r["id"]), 0.0)
+    return {
+        "ok": True,
+        "rows": out,
+        "total": len(rows),
+        "page": page,
+        "page_size": page_size,
+        "sort": "match",
+    }
+
+
 @router.get("/applications")
 def list_applications(
     admin: Dict[str, Any] = Depends(require_admin),
     q: str = "",
     status: str = "",
     job_id: str = "",
+    sort: str = "",
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
 ) -> Dict[str, Any]:
-    sb = _sb()
+    """sort: "" / "newest" (ค่าเริ่มต้น) หรือ "match" (ต้องระบุ job_id — คะแนนเทียบกับคุณสมบัติของงานนั้น)"""
+    sort = sort.strip().lower()
+    if sort not in ("", "newest", "match"):
+        raise HTTPException(status_code=400, detail="Invalid sort. Allowed: newest, match")
+    rep = replica.reader()
+    if sort == "match":
+        if not job_id:
+            raise HTTPException(status_code=400, detail="sort=match requires job_id")
+        return _list_by_match(rep, q, status, job_id, page, page_size)
+    sb = rep or _sb()
     start = (page - 1) * page_size
     end = start + page_size - 1
 
     try:
-        query = sb.table("applications").select(
-            "id,job_id,first_name,last_name,email,phone,country,department,level,"
-            "status,source_channel,created_at,reviewed_at",
-            count="exact",
-        )
-        if status and status in ALLOWED_STATUS:
-            query = query.eq("status", status)
-        if job_id:
-            query = query.eq("job_id", job_id)
-        qn = (q or "").strip()
-        if qn:
-            safe = qn.replace(",", " ").replace("*", " ").replace("(", " ").replace(")", " ")
-            query = query.or_(
-                f"first_name.ilike.*{safe}*,last_name.ilike.*{safe}*,"
-                f"email.ilike.*{safe}*,phone.ilike.*{safe}*"
-            )
+        query = sb.table("applications").select(replica.APP_LIST_COLS, count="exact")
+        query = _apply_app_filters(query, q=q, status=status, job_id=job_id, fts=rep is not None)
         query = query.order("created_at", desc=True).range(start, end)
         res = query.execute()
     except Exception as e:
@@ -399,54 +776,271 @@ def list_applications(
     }
 
 
+# ---------------------------
+# Export (CSV / XLSX แบบ streaming)
+# ---------------------------
+# ดึงทีละหน้าด้วย keyset (created_at desc, id desc) แทน offset/ดึงทั้งตาราง
+# -> ไม่โดน max-rows ของ PostgREST ตัดไฟล์เงียบๆ และไม่ต้องถือทั้งไฟล์ไว้ใน memory
+EXPORT_PAGE_SIZE = max(50, min(1000, int(os.getenv("EXPORT_PAGE_SIZE", "500"))))
+
+EXPORT_COLS = [
+    "id", "created_at", "status", "job_id", "first_name", "last_name", "email", "phone",
+    "country", "department", "level", "address", "visa_required", "available_start_date",
+    "website_url", "source_channel", "resume_url", "transcript_url", "admin_note", "reviewed_at",
+]
+
+# ตารางลูกที่เลือกแนบมาใน pass เดียวกันได้ (embedded select ของ PostgREST)
+# name -> (embedded select, ตัวจัดรูปแต่ละแถวเป็นข้อความ)
+EXPORT_CHILDREN: Dict[str, Any] = {
+    "educations": (
+        "application_educations(degree_level,institute,program,start_month,end_month,gpa)",
+        lambda r: " ".join(
+            x for x in (
+                r.get("degree_level"), r.get("institute"), r.get("program"),
+                f"({r.get('start_month') or ''}-{r.get('end_month') or ''})",
+                f"GPA {r['gpa']}" if r.get("gpa") else "",
+            ) if x
+        ),
+    ),
+    "experiences": (
+        "application_experiences(company,role,start_month,end_month)",
+        lambda r: f"{r.get('role') or ''} @ {r.get('company') or ''} "
+                  f"({r.get('start_month') or ''}-{r.get('end_month') or ''})",
+    ),
+    "skills": ("application_skills(skill)", lambda r: r.get("skill") or ""),
+    "attachments": ("application_attachments(file_name,file_url)", lambda r: r.get("file_name") or ""),
+}
+
+
+def _parse_include(include: str) -> List[str]:
+    names = [x.strip().lower() for x in (include or "").split(",") if x.strip()]
+    bad = [x for x in names if x not in EXPORT_CHILDREN]
+    if bad:
+        raise HTTPException(status_code=400, detail=f"Invalid include. Allowed: {sorted(EXPORT_CHILDREN)}")
+    return [x for x in EXPORT_CHILDREN if x in names]  # ลำดับคงที่
+
+
+def _export_pages(sb: Any, select: str, q: str, status: str, job_id: str):
+    """yield ทีละหน้า (list ของ row) เรียง created_at desc, id desc ด้วย keyset pagination
+    desc = NULLS FIRST -> แถวเก่าที่ไม่มี created_at มาก่อน (เรียงกันเองด้วย id) แล้วต่อด้วยแถวที่มีเวลา"""
+    cursor: Optional[Dict[str, Any]] = None
+    while True:
+        query = _apply_app_filters(sb.table("applications").select(select), q=q, status=status, job_id=job_id)
+        if cursor is not None:
+            ts, rid = cursor.get("created_at"), cursor["id"]
+            if ts:
+                query = query.or_(f'created_at.lt."{ts}",and(created_at.eq."{ts}",id.lt.{rid})')
+            else:
+                query = query.or_(f"and(created_at.is.null,id.lt.{rid}),created_at.not.is.null")
+        res = (
+            query.order("created_at", desc=True)
+            .order("id", desc=True)
+            .limit(EXPORT_PAGE_SIZE)
+            .execute()
+        )
+        rows = _data(res) or []
+        if not rows:
+            return
+        yield rows
+        if len(rows) < EXPORT_PAGE_SIZE:
+            return
+        cursor = rows[-1]
+
+
+def _export_record(r: Dict[str, Any], include: List[str]) -> List[Any]:
+    out: List[Any] = [r.get(c, "") for c in EXPORT_COLS]
+    for name in include:
+        embedded, fmt = EXPORT_CHILDREN[name]
+        children = r.get(embedded.split("(", 1)[0]) or []
+        out.append(" | ".join(s for s in (fmt(c).strip() for c in children) if s))
+    return out
+
+
+class _ChunkSink:
+    """file-like ที่ไม่ seek ได้ — เก็บ bytes ที่ถูกเขียนไว้ให้ generator ดึงออกไปส่งทีละก้อน"""
+
+    def __init__(self) -> None:
+        self._parts: List[bytes] = []
+
+    def write(self, b: bytes) -> int:
+        self._parts.append(bytes(b))
+        return len(b)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        out = b"".join(self._parts)
+        self._parts.clear()
+        return out
+
+
+_XML_BAD = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _xlsx_col(i: int) -> str:
+    s = ""
+    i += 1
+    while i:
+        i, r = divmod(i - 1, 26)
+        s = chr(65 + r) + s
+    return s
+
+
+def _xlsx_row(idx: int, values: List[Any]) -> str:
+    cells = []
+    for i, v in enumerate(values):
+        ref = f"{_xlsx_col(i)}{idx}"
+        if v is None or v == "":
+            continue
+        if isinstance(v, bool):
+            cells.append(f'<c r="{ref}" t="b"><v>{int(v)}</v></c>')
+        elif isinstance(v, (int, float)):
+            cells.append(f'<c r="{ref}"><v>{v}</v></c>')
+        else:
+            txt = _xml_escape(_XML_BAD.sub("", str(v)))
+            cells.append(f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{txt}</t></is></c>')
+    return f'<row r="{idx}">{"".join(cells)}</row>'
+
+
+_XLSX_STATIC = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="applications" sheetId="1" r:id="rId1"/></sheets>'
+        "</workbook>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        "</Relationships>"
+    ),
+}
+
+
+def _stream_csv(header: List[str], pages: Any) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = _csv.writer(buf)
+    # BOM ให้ Excel เปิดภาษาไทยได้ถูกต้อง
+    buf.write("\ufeff")
+    writer.writerow(header)
+    for rows in pages:
+        for r in rows:
+            writer.writerow(r)
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate(0)
+    tail = buf.getvalue()
+    if tail:
+        yield tail.encode("utf-8")
+
+
+def _stream_xlsx(header: List[str], pages: Any) -> Iterator[bytes]:
+    """เขียน .xlsx (OOXML) ด้วย stdlib zipfile ลง sink ที่ seek ไม่ได้
+    -> zipfile ใช้ data descriptor ทำให้ส่งออกทีละก้อนได้โดยไม่ต้องลง openpyxl"""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:  # type: ignore[arg-type]
+        for name, xml in _XLSX_STATIC.items():
+            zf.writestr(name, xml)
+        yield sink.drain()
+        with zf.open("xl/worksheets/sheet1.xml", "w") as ws:
+            ws.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b"<sheetData>"
+            )
+            ws.write(_xlsx_row(1, header).encode("utf-8"))
+            idx = 1
+            for rows in pages:
+                parts = []
+                for r in rows:
+                    idx += 1
+                    parts.append(_xlsx_row(idx, r))
+                ws.write("".join(parts).encode("utf-8"))
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+            ws.write(b"</sheetData></worksheet>")
+    yield sink.drain()
+
+
 @router.get("/applications/export")
 def export_applications(
     admin: Dict[str, Any] = Depends(require_admin),
     q: str = "",
     status: str = "",
-) -> Response:
-    """ดาวน์โหลดผู้สมัครเป็น CSV (รองรับ filter เดียวกับหน้า list)"""
+    job_id: str = "",
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    include: str = "",
+) -> StreamingResponse:
+    """ดาวน์โหลดผู้สมัครเป็น CSV/XLSX (รองรับ filter เดียวกับหน้า list) แบบ streaming
+    include=educations,experiences,skills,attachments -> แนบข้อมูลตารางลูกเป็นคอลัมน์เพิ่ม"""
+    children = _parse_include(include)
+    select = ",".join(EXPORT_COLS + [EXPORT_CHILDREN[c][0] for c in children])
+    header = EXPORT_COLS + children
+
     sb = _sb()
+    pages = _export_pages(sb, select, q=q, status=status, job_id=job_id)
+    # ดึงหน้าแรกก่อนตอบ -> ถ้า query พัง ยังคืน 500 ได้ตามปกติ (หลังเริ่ม stream แล้วเปลี่ยน status ไม่ได้)
     try:
-        query = sb.table("applications").select(
-            "id,created_at,status,job_id,first_name,last_name,email,phone,"
-            "country,department,level,address,visa_required,available_start_date,"
-            "website_url,source_channel,resume_url,transcript_url,admin_note,reviewed_at"
-        )
-        if status and status in ALLOWED_STATUS:
-            query = query.eq("status", status)
-        qn = (q or "").strip()
-        if qn:
-            safe = qn.replace(",", " ").replace("*", " ").replace("(", " ").replace(")", " ")
-            query = query.or_(
-                f"first_name.ilike.*{safe}*,last_name.ilike.*{safe}*,"
-                f"email.ilike.*{safe}*,phone.ilike.*{safe}*"
-            )
-        res = query.order("created_at", desc=True).execute()
-        rows = _data(res) or []
+        first = next(pages, [])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"export failed: {e}")
 
-    cols = [
-        "id", "created_at", "status", "job_id", "first_name", "last_name", "email", "phone",
-        "country", "department", "level", "address", "visa_required", "available_start_date",
-        "website_url", "source_channel", "resume_url", "transcript_url", "admin_note", "reviewed_at",
-    ]
-    buf = io.StringIO()
-    writer = _csv.DictWriter(buf, fieldnames=cols, extrasaction="ignore")
-    writer.writeheader()
-    for r in rows:
-        writer.writerow({c: r.get(c, "") for c in cols})
-
-    # BOM ให้ Excel เปิดภาษาไทยได้ถูกต้อง
-    content = "﻿" + buf.getvalue()
-    return Response(
-        content=content,
+    def records():
+        yield [_export_record(r, children) for r in first]
+        try:
+            for rows in pages:
+                yield [_export_record(r, children) for r in rows]
+        except Exception as e:
+            # หัวไฟล์ (200) ส่งไปแล้ว -> โยนต่อให้ server ตัด connection กลางคัน
+            # (ไม่ส่ง chunk ปิดท้าย) ฝั่ง browser จะเห็นว่าดาวน์โหลดล้มเหลว แทนที่จะได้ไฟล์ไม่ครบแบบเงียบๆ
+            logger.error("export aborted mid-stream: %s", e)
+            raise
+
+    if format == "xlsx":
+        return StreamingResponse(
+            _stream_xlsx(header, records()),
+            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            headers={"Content-Disposition": "attachment; filename=applications.xlsx"},
+        )
+    return StreamingResponse(
+        _stream_csv(header, records()),
         media_type="text/csv; charset=utf-8",
         headers={"Content-Disposition": "attachment; filename=applications.csv"},
     )
 
 
+# ตารางลูกของใบสมัคร — ดึงพร้อมแถวหลักใน embedded select เดียว
+_APP_DETAIL_SELECT = (
+    "*,application_educations(*),application_experiences(*),"
+    "application_skills(skill),application_attachments(*)"
+)
+
+
 @router.get("/applications/{application_id}")
 def get_application(
     application_id: str,
@@ -454,26 +1048,28 @@ def get_application(
 ) -> Dict[str, Any]:
     sb = _sb()
     try:
-        res = sb.table("applications").select("*").eq("id", application_id).limit(1).execute()
+        res = sb.table("applications").select(_APP_DETAIL_SELECT).eq("id", application_id).limit(1).execute()
         rows = _data(res) or []
-        if not rows:
-            raise HTTPException(status_code=404, detail="Application not found")
-        app_row = rows[0]
-
-        edu = _data(sb.table("application_educations").select("*").eq("application_id", application_id).execute()) or []
-        exp = _data(sb.table("application_experiences").select("*").eq("application_id", application_id).execute()) or []
-        sk = _data(sb.table("application_skills").select("*").eq("application_id", application_id).execute()) or []
-        att = _data(sb.table("application_attachments").select("*").eq("application_id", application_id).execute()) or []
-    except HTTPException:
-        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"get application failed: {e}")
-
-    # แนบ URL ที่ดาวน์โหลดได้ (signed สำหรับไฟล์ใน storage)
-    app_row["resume_download_url"] = _resolve_file_url(app_row.get("resume_url"))
-    app_row["transcript_download_url"] = _resolve_file_url(app_row.get("transcript_url"))
+    if not rows:
+        raise HTTPException(status_code=404, detail="Application not found")
+    app_row = rows[0]
+
+    edu = app_row.pop("application_educations", None) or []
+    exp = app_row.pop("application_experiences", None) or []
+    sk = app_row.pop("application_skills", None) or []
+    att = app_row.pop("application_attachments", None) or []
+
+    # แนบ URL ที่ดาวน์โหลดได้ (signed สำหรับไฟล์ใน storage) — เซ็นทุกไฟล์ใน request เดียว
+    urls = _resolve_file_urls(
+        [app_row.get("resume_url"), app_row.get("transcript_url")] + [a.get("file_url") for a in att],
+        sb=sb,
+    )
+    app_row["resume_download_url"] = urls.get(app_row.get("resume_url") or "")
+    app_row["transcript_download_url"] = urls.get(app_row.get("transcript_url") or "")
     for a in att:
-        a["download_url"] = _resolve_file_url(a.get("file_url"))
+        a["download_url"] = urls.get(a.get("file_url") or "")
 
     return {
         "ok": True,
@@ -485,25 +1081,28 @@ def get_application(
     }
 
 
-@router.patch("/applications/{application_id}")
-def update_application(
-    application_id: str,
-    body: StatusBody,
-    admin: Dict[str, Any] = Depends(require_admin),
-) -> Dict[str, Any]:
+def _status_patch(body: StatusBody) -> Dict[str, Any]:
     patch: Dict[str, Any] = {}
     if body.status is not None:
         if body.status not in ALLOWED_STATUS:
             raise HTTPException(status_code=400, detail=f"Invalid status. Allowed: {sorted(ALLOWED_STATUS)}")
         patch["status"] = body.status
-        patch["reviewed_at"] = __import__("datetime").datetime.now(
-            __import__("datetime").timezone.utc
-        ).isoformat()
+        patch["reviewed_at"] = _now_iso()
     if body.admin_note is not None:
         patch["admin_note"] = body.admin_note.strip()
 
     if not patch:
         raise HTTPException(status_code=400, detail="Nothing to update")
+    return patch
+
+
+@router.patch("/applications/{application_id}")
+def update_application(
+    application_id: str,
+    body: StatusBody,
+    admin: Dict[str, Any] = Depends(require_admin),
+) -> Dict[str, Any]:
+    patch = _status_patch(body)
 
     sb = _sb()
     try:
@@ -516,9 +1115,103 @@ def update_application(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"update application failed: {e}")
 
+    _emit_change("applications", ids=[application_id])
     return {"ok": True, "application": rows[0]}
 
 
+BULK_MAX_IDS = 1000
+BULK_CHUNK = 200  # id ต่อ 1 statement (กัน URL ของ in.(...) ยาวเกิน)
+BULK_FILTER_MAX = max(1, int(os.getenv("BULK_FILTER_MAX", "5000")))  # แถวสูงสุดที่โหมด filter แก้ได้ในครั้งเดียว
+
+
+def _valid_uuid(s: str) -> bool:
+    try:
+        uuid.UUID(s)
+        return True
+    except ValueError:
+        return False
+
+
+@router.post("/applications/bulk")
+def bulk_update_applications(
+    body: BulkStatusBody,
+    admin: Dict[str, Any] = Depends(require_admin),
+) -> Dict[str, Any]:
+    """เปลี่ยนสถานะ/โน้ตหลายใบสมัครในคำขอเดียว
+    - ids: อัปเดตเป็นก้อนละ BULK_CHUNK ด้วย in.(...) -> คืนผลราย id (updated / not_found / invalid / error)
+      id ที่ไม่ใช่ UUID ตอบ invalid ทันที (ไม่งั้น Postgres โยน error ทั้งก้อน)
+    - filter: อัปเดตทุกแถวที่ตรง status/job_id/q ใน statement เดียว — นับก่อน เกิน BULK_FILTER_MAX
+      หรือไม่ตรงกับ expected_count -> ไม่แก้อะไรเลย
+    reviewed_at ประทับเวลาจากฝั่ง server ครั้งเดียว ทุกแถวได้ค่าเดียวกัน"""
+    patch = _status_patch(body)
+    ids = list(dict.fromkeys(str(i).strip() for i in (body.ids or []) if str(i).strip()))
+    flt = body.filter
+    has_filter = bool(flt and ((flt.status or "").strip() or (flt.job_id or "").strip() or (flt.q or "").strip()))
+    if bool(ids) == has_filter:
+        raise HTTPException(status_code=400, detail="Provide either ids or a non-empty filter")
+    if len(ids) > BULK_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"Too many ids (max {BULK_MAX_IDS})")
+    if flt and flt.status and flt.status not in ALLOWED_STATUS:
+        raise HTTPException(status_code=400, detail=f"Invalid filter status. Allowed: {sorted(ALLOWED_STATUS)}")
+
+    sb = _sb()
+    results: Dict[str, str] = {}
+    if ids:
+        valid = []
+        for aid in ids:
+            if _valid_uuid(aid):
+                valid.append(aid)
+            else:
+                results[aid] = "invalid"
+        for i in range(0, len(valid), BULK_CHUNK):
+            chunk = valid[i:i + BULK_CHUNK]
+            try:
+                res = sb.table("applications").update(patch).in_("id", chunk).execute()
+                done = {str(r.get("id")) for r in (_data(res) or [])}
+                for aid in chunk:
+                    results[aid] = "updated" if aid in done else "not_found"
+            except Exception as e:
+                logger.warning("bulk update chunk failed (%d ids): %s", len(chunk), e)
+                for aid in chunk:
+                    results[aid] = "error"
+        results = {aid: results[aid] for aid in ids}  # ลำดับเดียวกับที่ส่งมา
+    elif flt is not None:
+        try:
+            matched = _count(_apply_app_filters(
+                sb.table("applications").select("id", count="exact"), q=flt.q, status=flt.status, job_id=flt.job_id
+            ).limit(1).execute())
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"bulk update failed: {e}")
+        matched = int(matched or 0)
+        if matched > BULK_FILTER_MAX:
+            raise HTTPException(
+                status_code=400, detail=f"Filter matches {matched} applications (max {BULK_FILTER_MAX}); narrow it down"
+            )
+        if body.expected_count is not None and body.expected_count != matched:
+            raise HTTPException(
+                status_code=409, detail=f"Filter matches {matched} applications, expected {body.expected_count}"
+            )
+        try:
+            query = _apply_app_filters(
+                sb.table("applications").update(patch), q=flt.q, status=flt.status, job_id=flt.job_id
+            )
+            res = query.execute()
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"bulk update failed: {e}")
+        for r in _data(res) or []:
+            results[str(r.get("id"))] = "updated"
+
+    updated = sum(1 for v in results.values() if v == "updated")
+    _emit_change("applications", ids=[k for k, v in results.items() if v == "updated"])
+    return {
+        "ok": all(v == "updated" for v in results.values()),
+        "updated": updated,
+        "failed": len(results) - updated,
+        "patch": patch,
+        "results": [{"id": k, "result": v} for k, v in results.items()],
+    }
+
+
 # =====================================================================
 # Jobs management (Phase 2)
 # =====================================================================
@@ -563,70 +1256,190 @@ def _job_payload(b: JobBody) -> Dict[str, Any]:
     return d
 
 
+# คอลัมน์ที่หน้า list ใช้จริง (ไม่ดึง desc/qual ยาวๆ ทั้ง 3 ภาษา)
+JOB_LIST_COLS = (
+    "job_id,status,country,department,level,quantity,"
+    "title_th,title_en,title_zh,created_at,updated_at"
+)
+# แถวเต็มของฟอร์มแก้งาน (ไม่รวม pub_* — projection สาธารณะ ดู migrations/006_job_projections.sql)
+JOB_DETAIL_COLS = (
+    JOB_LIST_COLS + ",location_th,location_en,location_zh,desc_th,desc_en,desc_zh,qual_th,qual_en,qual_zh"
+)
+_COUNT_KEYS = ("new", "reviewing", "shortlisted", "rejected", "hired")
+
+
+def _applicant_counts(sb: Any, job_ids: List[str]) -> Dict[str, Dict[str, int]]:
+    """{job_id: {total, new, reviewing, ...}} จาก view job_applicant_counts (GROUP BY ใน Postgres)
+    ถ้ายังไม่ได้รัน migration 004 -> fallback นับเองแบบแบ่งหน้า (ถูกต้อง แต่ช้ากว่า)"""
+    if not job_ids:
+        return {}
+    try:
+        res = sb.table("job_applicant_counts").select("*").in_("job_id", job_ids).execute()
+        return {
+            r["job_id"]: {k: int(r.get(k) or 0) for k in ("total",) + _COUNT_KEYS}
+            for r in (_data(res) or [])
+        }
+    except Exception as e:
+        logger.info("job_applicant_counts view unavailable, counting in python: %s", e)
+
+    out: Dict[str, Dict[str, int]] = {}
+    start = 0
+    while True:
+        res = (
+            sb.table("applications").select("id,job_id,status").in_("job_id", job_ids)
+            .order("id").range(start, start + 999).execute()
+        )
+        rows = _data(res) or []
+        for a in rows:
+            c = out.setdefault(a["job_id"], {k: 0 for k in ("total",) + _COUNT_KEYS})
+            c["total"] += 1
+            st = a.get("status") or "new"
+            if st in c:
+                c[st] += 1
+        if len(rows) < 1000:
+            return out
+        start += 1000
+
+
 @router.get("/jobs")
 def admin_list_jobs(
     admin: Dict[str, Any] = Depends(require_admin),
     q: str = "",
     status: str = "",
+    page: int = Query(1, ge=1),
+    page_size: int = Query(200, ge=1, le=500),
 ) -> Dict[str, Any]:
     sb = _sb()
+    start = (page - 1) * page_size
     try:
-        query = sb.table("jobs").select("*")
+        query = sb.table("jobs").select(JOB_LIST_COLS, count="exact")
         if status and status in JOB_STATUS:
             query = query.eq("status", status)
-        res = query.order("updated_at", desc=True).execute()
+        qn = (q or "").strip()
+        if qn:
+            safe = qn.replace(",", " ").replace("*", " ").replace("(", " ").replace(")", " ")
+            query = query.or_(
+                ",".join(
+                    f"{k}.ilike.*{safe}*"
+                    for k in ("job_id", "title_th", "title_en", "title_zh", "department", "level", "country")
+                )
+            )
+        res = query.order("updated_at", desc=True).range(start, start + page_size - 1).execute()
         rows = _data(res) or []
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"list jobs failed: {e}")
 
-    qn = (q or "").strip().lower()
-    if qn:
-        def hay(r: Dict[str, Any]) -> str:
-            return " ".join(
-                str(r.get(k, "") or "")
-                for k in ("job_id", "title_th", "title_en", "title_zh", "department", "level", "country")
-            ).lower()
-        rows = [r for r in rows if qn in hay(r)]
+    total = _count(res)
+    if total is None:
+        total = len(rows)
 
-    # แนบจำนวนผู้สมัครต่อแต่ละงาน
+    # แนบจำนวนผู้สมัครต่อแต่ละงาน (เฉพาะงานในหน้านี้)
     try:
-        apps = _data(sb.table("applications").select("job_id").limit(1000).execute()) or []
-        cnt = Counter(a.get("job_id") for a in apps)
+        counts = _applicant_counts(sb, [r["job_id"] for r in rows])
         for r in rows:
-            r["applicant_count"] = int(cnt.get(r["job_id"], 0))
-    except Exception:
-        pass
+            c = counts.get(r["job_id"]) or {}
+            r["applicant_count"] = int(c.get("total", 0))
+            r["applicant_by_status"] = {k: int(c.get(k, 0)) for k in _COUNT_KEYS}
+    except Exception as e:
+        logger.warning("applicant counts failed: %s", e)
+
+    return {"ok": True, "rows": rows, "total": int(total), "page": page, "page_size": page_size}
+
+
+# ✅ cache ตัวเลือก department/level/country — ล้างทุกครั้งที่แอดมินแก้งาน
+JOB_OPTIONS_TTL_SEC = int(os.getenv("JOB_OPTIONS_TTL_SEC", "600"))
+_JOB_OPTIONS_CACHE: Dict[str, Any] = {}  # {"t": ts, "v": {...}}
 
-    return {"ok": True, "rows": rows, "total": len(rows)}
+
+def _invalidate_job_options() -> None:
+    _JOB_OPTIONS_CACHE.clear()
+
+
+def _load_job_options(sb: Any) -> Dict[str, List[str]]:
+    opts: Dict[str, set] = {"department": set(), "level": set(), "country": set()}
+    try:
+        # view job_option_values (migration 004) = distinct ใน Postgres
+        rows = _data(sb.table("job_option_values").select("kind,value").execute()) or []
+        pairs = [(r.get("kind"), r.get("value")) for r in rows]
+    except Exception:
+        rows = _data(sb.table("jobs").select("department,level,country").execute()) or []
+        pairs = [(k, r.get(k)) for r in rows for k in opts]
+    for kind, val in pairs:
+        v = (val or "").strip()
+        if kind in opts and v:
+            opts[kind].add(v)
+    return {k: sorted(v) for k, v in opts.items()}
 
 
 @router.get("/job-options")
 def admin_job_options(admin: Dict[str, Any] = Depends(require_admin)) -> Dict[str, Any]:
     """ดึงค่า department/level/country ที่ "มีอยู่จริง" ในงาน เพื่อช่วย autocomplete ตอนสร้าง/แก้"""
-    sb = _sb()
-    try:
-        res = sb.table("jobs").select("department,level,country").execute()
-        rows = _data(res) or []
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"job options failed: {e}")
-
-    def uniq(key: str) -> List[str]:
-        vals = sorted({(r.get(key) or "").strip() for r in rows if (r.get(key) or "").strip()})
-        return vals
+    now = time.time()
+    if _JOB_OPTIONS_CACHE.get("v") is None or now - _JOB_OPTIONS_CACHE.get("t", 0) >= JOB_OPTIONS_TTL_SEC:
+        metrics.cache_event("job_options", "miss" if _JOB_OPTIONS_CACHE.get("v") is None else "stale")
+        try:
+            _JOB_OPTIONS_CACHE["v"] = _load_job_options(replica.reader() or _sb())
+            _JOB_OPTIONS_CACHE["t"] = now
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"job options failed: {e}")
+    else:
+        metrics.cache_event("job_options", "hit")
+    opts = _JOB_OPTIONS_CACHE["v"]
 
     return {
         "ok": True,
-        "departments": uniq("department"),
-        "levels": uniq("level"),
-        "countries": uniq("country"),
+        "departments": opts["department"],
+        "levels": opts["level"],
+        "countries": opts["country"],
     }
 
 
+JOB_CHOICE_COLS = "job_id,status,title_th,title_en,title_zh"
+
+
+@router.get("/jobs/choices")
+def admin_job_choices(admin: Dict[str, Any] = Depends(require_admin)) -> Dict[str, Any]:
+    """ทุกงานแบบย่อ (id/ชื่อ/สถานะ + จำนวนผู้สมัคร) สำหรับ dropdown กรองหน้า applications
+    — /admin/jobs แบ่งหน้าแล้ว ใช้ทำ dropdown ไม่ได้"""
+    sb = replica.reader() or _sb()
+    rows: List[Dict[str, Any]] = []
+    try:
+        while True:
+            batch = _data(
+                sb.table("jobs").select(JOB_CHOICE_COLS).order("updated_at", desc=True).order("job_id")
+                .range(len(rows), len(rows) + replica.PAGE - 1).execute()
+            ) or []
+            rows.extend(batch)
+            if len(batch) < replica.PAGE:
+                break
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"list job choices failed: {e}")
+    # จำนวนผู้สมัครจาก view job_applicant_counts เท่านั้น (ไม่มี view -> ไม่แสดงจำนวน ดีกว่านับทั้งตาราง)
+    try:
+        counts: Dict[str, int] = {}
+        view = _sb().table
+        while True:  # view ก็โดน max-rows 1000 -> แบ่งหน้าเหมือน jobs ด้านบน
+            batch = _data(
+                view("job_applicant_counts").select("job_id,total").order("job_id")
+                .range(len(counts), len(counts) + replica.PAGE - 1).execute()
+            ) or []
+            counts.update((r["job_id"], int(r.get("total") or 0)) for r in batch)
+            if len(batch) < replica.PAGE:
+                break
+        for r in rows:
+            r["applicant_count"] = counts.get(r["job_id"], 0)
+    except Exception as e:
+        logger.info("job choices without applicant counts: %s", e)
+    return {"ok": True, "rows": rows, "total": len(rows)}
+
+
 @router.get("/jobs/{job_id}")
 def admin_get_job(job_id: str, admin: Dict[str, Any] = Depends(require_admin)) -> Dict[str, Any]:
     sb = _sb()
     try:
-        res = sb.table("jobs").select("*").eq("job_id", job_id).limit(1).execute()
+        res = sb.table("jobs").select(JOB_DETAIL_COLS).eq("job_id", job_id).limit(1).execute()
         rows = _data(res) or []
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"get job failed: {e}")
@@ -656,6 +1469,8 @@ def admin_create_job(body: JobBody, admin: Dict[str, Any] = Depends(require_admi
         rows = _data(res) or []
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"create job failed: {e}")
+    _invalidate_job_options()
+    _emit_change("jobs", job_id=payload["job_id"])
     return {"ok": True, "job": (rows[0] if rows else payload)}
 
 
@@ -675,6 +1490,8 @@ def admin_update_job(job_id: str, body: JobBody, admin: Dict[str, Any] = Depends
         raise HTTPException(status_code=500, detail=f"update job failed: {e}")
     if not rows:
         raise HTTPException(status_code=404, detail="Job not found")
+    _invalidate_job_options()
+    _emit_change("jobs", job_id=job_id)
     return {"ok": True, "job": rows[0]}
 
 
@@ -690,6 +1507,7 @@ def admin_set_job_status(job_id: str, body: JobStatusBody, admin: Dict[str, Any]
         raise HTTPException(status_code=500, detail=f"set job status failed: {e}")
     if not rows:
         raise HTTPException(status_code=404, detail="Job not found")
+    _emit_change("jobs", job_id=job_id)
     return {"ok": True, "job": rows[0]}
 
 
@@ -703,6 +1521,8 @@ def admin_delete_job(job_id: str, admin: Dict[str, Any] = Depends(require_admin)
         raise HTTPException(status_code=500, detail=f"delete job failed: {e}")
     if not rows:
         raise HTTPException(status_code=404, detail="Job not found")
+    _invalidate_job_options()
+    _emit_change("jobs", job_id=job_id)
     return {"ok": True, "deleted": job_id}
 
 
@@ -744,6 +1564,7 @@ def admin_upsert_content(body: ContentBody, admin: Dict[str, Any] = Depends(requ
         rows = _data(res) or []
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"save content failed: {e}")
+    _emit_change("content", lang=lang, key=key)
     return {"ok": True, "item": (rows[0] if rows else payload)}
 
 
@@ -758,6 +1579,7 @@ def admin_delete_content(
         sb.table("site_content").delete().eq("key", key).eq("lang", lang).execute()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"delete content failed: {e}")
+    _emit_change("content", lang=lang, key=key)
     return {"ok": True, "deleted": {"key": key, "lang": lang}}
 
 
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+SHD Careers — Cold start report (Phase 5)
+=========================================
+จับเวลาแต่ละช่วงของการเปิด worker (scale-to-zero: request แรกต้องรอทั้งหมดนี้)
+
+  phase("env")            with-block จับเวลาช่วงหนึ่ง -> เก็บ (ชื่อ, เริ่มที่ ms, ใช้ไป ms, thread)
+  lazy_import("supabase") import โมดูลหนักตอนใช้ครั้งแรก (แทน import บนสุดของไฟล์) + จับเวลาเป็น phase
+  mark("ready")           เวลาที่ถึงจุดสำคัญ (นับจาก process เริ่ม)
+
+GET /debug/startup -> report() — ms ทั้งหมดนับจาก process เริ่ม (อ่าน /proc ได้) ไม่งั้นนับจาก import โมดูลนี้
+
+ต้องเป็นโมดูลแรกที่ main.py import (stdlib ล้วน) ไม่งั้นเวลาของโมดูลก่อนหน้าจะไม่ถูกนับ
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+import importlib
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+_T0 = time.perf_counter()
+_LOCK = threading.Lock()
+_PHASES: List[Dict[str, Any]] = []
+_MARKS: Dict[str, float] = {}
+_MODULES_AT_IMPORT = len(sys.modules)
+
+
+def _process_age_sec() -> Optional[float]:
+    """process รันมากี่วินาทีแล้วตอน import โมดูลนี้ (interpreter + uvicorn + import ก่อนหน้า) — Linux เท่านั้น"""
+    try:
+        with open("/proc/self/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        start_ticks = int(fields[19])  # field 22 ของ stat (นับ pid, comm แล้ว)
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except Exception:
+        return None
+
+
+_AGE_AT_IMPORT = _process_age_sec()
+
+
+def _ms(t: float) -> float:
+    """perf_counter -> ms นับจาก process เริ่ม"""
+    return round(((_AGE_AT_IMPORT or 0.0) + (t - _T0)) * 1000.0, 1)
+
+
+def record(name: str, started: float, ended: float, **extra: Any) -> None:
+    with _LOCK:
+        _PHASES.append({
+            "phase": name,
+            "start_ms": _ms(started),
+            "duration_ms": round((ended - started) * 1000.0, 1),
+            "thread": threading.current_thread().name,
+            **extra,
+        })
+
+
+@contextmanager
+def phase(name: str, **extra: Any) -> Iterator[None]:
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, t0, time.perf_counter(), **extra)
+
+
+def mark(name: str) -> None:
+    """เก็บครั้งแรกเท่านั้น (เช่น ready ของ worker นี้)"""
+    with _LOCK:
+        _MARKS.setdefault(name, time.perf_counter())
+
+
+_LAZY: Dict[str, Any] = {}
+_LAZY_LOCK = threading.Lock()
+
+
+def lazy_import(name: str) -> Any:
+    """import ครั้งแรกที่ถูกเรียก (จับเวลาเป็น phase "import <name>") — โยน ImportError ต่อถ้าไม่ได้ติดตั้ง"""
+    mod = _LAZY.get(name)
+    if mod is None:
+        with _LAZY_LOCK:
+            mod = _LAZY.get(name)
+            if mod is None:
+                lazy = name not in sys.modules
+                with phase(f"import {name}", lazy=lazy):
+                    mod = importlib.import_module(name)
+                _LAZY[name] = mod
+    return mod
+
+
+def report() -> Dict[str, Any]:
+    with _LOCK:
+        phases = sorted(_PHASES, key=lambda p: p["start_ms"])
+        marks = {k: _ms(v) for k, v in _MARKS.items()}
+    return {
+        "pid": os.getpid(),
+        "process_age_at_boot_import_ms": (round(_AGE_AT_IMPORT * 1000.0, 1) if _AGE_AT_IMPORT is not None else None),
+        "clock": "process start" if _AGE_AT_IMPORT is not None else "boot import",
+        "marks": marks,
+        "phases": phases,
+        "lazy_loaded": sorted(_LAZY),
+        "modules": {"at_boot_import": _MODULES_AT_IMPORT, "now": len(sys.modules)},
+        "uptime_sec": round(time.perf_counter() - _T0 + (_AGE_AT_IMPORT or 0.0), 1),
+    }
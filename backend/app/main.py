@@ -7,30 +7,56 @@ import re
 import logging
 import asyncio
 import time
+import base64
+import threading
+import hashlib
+from collections import Counter
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
-import httpx
-from fastapi import FastAPI, File, Form, UploadFile, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-
-# ✅ โหลด .env ตั้งแต่ตอน import (ต้องมาก่อนอ่าน os.getenv)
+# ✅ จับเวลา cold start ตั้งแต่ต้น (ดู boot.py) — ต้อง import ก่อนโมดูลหนักตัวอื่น
 try:
-    from dotenv import load_dotenv  # type: ignore
+    from app import boot  # type: ignore
 except Exception:
-    load_dotenv = None  # type: ignore
+    import boot  # type: ignore
 
-if load_dotenv is not None:
-    # 1) backend/.env (ตอนรันจากโฟลเดอร์ backend)
-    load_dotenv(dotenv_path=os.path.join(os.getcwd(), ".env"), override=False)
-    # 2) backend/app/.env (กันพลาด)
-    load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"), override=False)
+with boot.phase("import fastapi"):
+    from fastapi import Depends, FastAPI, File, Form, UploadFile, HTTPException, Request, Response
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import FileResponse, JSONResponse, RedirectResponse
 
-try:
-    # supabase-py v2
-    from supabase import create_client  # type: ignore
-except Exception:
-    create_client = None  # type: ignore
+if TYPE_CHECKING:
+    import httpx  # import จริงตอนใช้ครั้งแรก (http_client / boot.lazy_import)
+
+# ✅ โหลด .env ตั้งแต่ตอน import (ต้องมาก่อนอ่าน os.getenv)
+with boot.phase("env"):
+    try:
+        from dotenv import load_dotenv  # type: ignore
+    except Exception:
+        load_dotenv = None  # type: ignore
+
+    if load_dotenv is not None:
+        # 1) backend/.env (ตอนรันจากโฟลเดอร์ backend)
+        load_dotenv(dotenv_path=os.path.join(os.getcwd(), ".env"), override=False)
+        # 2) backend/app/.env (กันพลาด)
+        load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"), override=False)
+
+# supabase-py ไม่ import ที่นี่แล้ว — store.remote_client() import ตอนสร้าง client ครั้งแรก
+with boot.phase("import app modules"):
+    try:
+        from app.store import (  # type: ignore
+            STORAGE_BACKEND, keyset_after, local_client, local_file_path, remote_client, use_local, verify_signed,
+        )
+        from app.timing import TimingMiddleware, add_observer, instrument, request_id, span, unwrap  # type: ignore
+        from app import metrics  # type: ignore
+        from app.profiler import ProfileMiddleware  # type: ignore
+    except Exception:
+        from store import (  # type: ignore
+            STORAGE_BACKEND, keyset_after, local_client, local_file_path, remote_client, use_local, verify_signed,
+        )
+        from timing import TimingMiddleware, add_observer, instrument, request_id, span, unwrap  # type: ignore
+        import metrics  # type: ignore
+        from profiler import ProfileMiddleware  # type: ignore
 
 
 # ---------------------------
@@ -130,14 +156,17 @@ def parse_skills(skills: str) -> List[str]:
 
 
 # ---------------------------
-# Supabase helpers
+# Supabase helpers (STORAGE_BACKEND=local -> SQLite + โฟลเดอร์ไฟล์, ดู store.py)
 # ---------------------------
 def supabase_client():
+    if use_local():
+        return instrument(local_client())
     require_env("SUPABASE_URL", SUPABASE_URL)
     require_env("SUPABASE_SERVICE_ROLE_KEY", SUPABASE_SERVICE_ROLE_KEY)
-    if create_client is None:
+    client = remote_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+    if client is None:
         raise HTTPException(status_code=500, detail="supabase client not installed. pip install supabase")
-    return create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+    return instrument(client)
 
 
 async def upload_to_supabase_storage(
@@ -219,14 +248,15 @@ async def push_application_to_sheet(payload: Dict[str, Any]) -> None:
         logger.info("Sheets push skipped (missing APPS_SCRIPT_APPLY_SHEET_URL/APPLY_SHEET_API_KEY)")
         return
 
-    client: httpx.AsyncClient = app.state.http  # type: ignore[attr-defined]
+    client = http_client()
     try:
-        r = await client.post(
-            APPS_SCRIPT_APPLY_SHEET_URL,
-            params={"key": APPLY_SHEET_API_KEY},
-            json=payload,
-            timeout=15.0,
-        )
+        with span("sheets"):
+            r = await client.post(
+                APPS_SCRIPT_APPLY_SHEET_URL,
+                params={"key": APPLY_SHEET_API_KEY},
+                json=payload,
+                timeout=15.0,
+            )
         if r.status_code != 200:
             logger.warning("Sheets push HTTP %s: %s", r.status_code, r.text[:300])
             return
@@ -258,21 +288,6 @@ def _format_history(resp: httpx.Response) -> str:
     return " -> ".join(parts)
 
 
-# ✅ Shared HTTP client + Jobs cache (in-memory)
-_JOBS_CACHE: Dict[str, Tuple[float, Dict[str, Any]]] = {}  # key -> (expire_ts, data)
-_JOBS_LOCKS: Dict[str, asyncio.Lock] = {}
-
-
-def _cache_key(lang: str, country: str, department: str, level: str) -> str:
-    return f"{(lang or 'th').lower()}|{country}|{department}|{level}"
-
-
-def _lock_for(key: str) -> asyncio.Lock:
-    if key not in _JOBS_LOCKS:
-        _JOBS_LOCKS[key] = asyncio.Lock()
-    return _JOBS_LOCKS[key]
-
-
 async def _fetch_jobs_feed_raw(
     client: httpx.AsyncClient,
     lang: str = "th",
@@ -281,6 +296,7 @@ async def _fetch_jobs_feed_raw(
     level: str = "",
 ) -> Dict[str, Any]:
     require_env("GOOGLE_JOBS_FEED_URL", GOOGLE_JOBS_FEED_URL)
+    httpx = boot.lazy_import("httpx")
 
     params: Dict[str, str] = {"lang": (lang or "th").lower()}
     if country:
@@ -291,7 +307,8 @@ async def _fetch_jobs_feed_raw(
         params["level"] = level
 
     try:
-        r = await client.get(GOOGLE_JOBS_FEED_URL, params=params)
+        with span("feed"):
+            r = await client.get(GOOGLE_JOBS_FEED_URL, params=params)
     except httpx.RequestError as e:
         raise HTTPException(status_code=502, detail=f"Jobs feed request error: {e}")
 
@@ -331,58 +348,17 @@ async def _fetch_jobs_feed_raw(
     return data
 
 
-async def fetch_jobs_feed(
-    lang: str = "th",
-    country: str = "",
-    department: str = "",
-    level: str = "",
-    q: str = "",  # ✅ รับไว้กัน TypeError (แต่ไม่ส่งให้ feed)
-) -> Dict[str, Any]:
-    """
-    ✅ Cache wrapper: ลดการเรียก Apps Script ซ้ำๆ
-    """
-    key = _cache_key(lang, country, department, level)
-    now = time.time()
-
-    hit = _JOBS_CACHE.get(key)
-    if hit and hit[0] > now:
-        return hit[1]
-
-    lock = _lock_for(key)
-    async with lock:
-        # double-check after acquiring lock
-        hit2 = _JOBS_CACHE.get(key)
-        if hit2 and hit2[0] > time.time():
-            return hit2[1]
-
-        client: httpx.AsyncClient = app.state.http  # type: ignore[attr-defined]
-        data = await _fetch_jobs_feed_raw(
-            client=client,
-            lang=lang,
-            country=country,
-            department=department,
-            level=level,
-        )
-
-        expire_ts = time.time() + max(5, JOBS_CACHE_TTL_SEC)
-        _JOBS_CACHE[key] = (expire_ts, data)
-        return data
-
-
-async def fetch_job_by_id(job_id: str, lang: str = "th") -> Dict[str, Any]:
-    data = await fetch_jobs_feed(lang=lang)
-    for j in (data.get("rows") or []):
-        if str(j.get("job_id", "")).strip() == job_id:
-            return j
-    raise HTTPException(status_code=404, detail="Job not found")
-
-
 # ---------------------------
 # ✅ Jobs from Supabase (Phase 2) — แหล่งข้อมูลหลักใหม่
 #    เก็บ 3 ภาษาแยกคอลัมน์ แล้ว resolve เป็นภาษาเดียวให้ frontend (shape เดิม)
 # ---------------------------
 JOB_LANGS = ("th", "en", "zh")
-_JOBS_DB_FLAG: Dict[str, Any] = {}  # cache has-rows 30s -> ลด query
+# คอลัมน์ข้อมูลจริงของ jobs (ไม่รวม pub_* — projection ของ migration 006)
+JOB_ROW_COLS = (
+    "job_id,status,country,department,level,quantity,"
+    "title_th,title_en,title_zh,location_th,location_en,location_zh,"
+    "desc_th,desc_en,desc_zh,qual_th,qual_en,qual_zh,created_at,updated_at"
+)
 
 
 def _job_public_shape(r: Dict[str, Any], lang: str) -> Dict[str, Any]:
@@ -413,26 +389,268 @@ def _job_public_shape(r: Dict[str, Any], lang: str) -> Dict[str, Any]:
     }
 
 
-def jobs_db_has_rows() -> bool:
-    """เช็คว่าตาราง jobs มีข้อมูลแล้วหรือยัง (cache 30 วิ)
-    ถ้ายังว่าง/ยังไม่มีตาราง -> public ใช้ Google feed เดิมไปก่อน (ไม่ทำเว็บล่ม)"""
-    now = time.time()
-    if _JOBS_DB_FLAG.get("v") is not None and (now - _JOBS_DB_FLAG.get("t", 0)) < 30:
-        return bool(_JOBS_DB_FLAG["v"])
-    has = False
+def _public_select(lang: str) -> str:
+    """คอลัมน์ projection ของภาษาเดียว (migration 006) rename เป็น field ของ _job_public_shape ลำดับเดียวกัน
+    -> แถวที่ได้คือ public shape เลย ไม่ต้องแปลงใน Python"""
+    return (
+        f"job_id,title:pub_title_{lang},location:pub_location_{lang},"
+        f"description:pub_desc_{lang},qualifications:pub_qual_{lang},"
+        "department:pub_department,level:pub_level,country:pub_country,quantity,updated_at,status"
+    )
+
+
+_PROJECTION: Dict[int, Tuple[bool, float]] = {}  # id(client จริง) -> (มีคอลัมน์ pub_* แล้ว, เวลาที่เช็ค)
+_PROJECTION_RETRY_SEC = 60.0
+
+
+def _projection_ready(sb: Any) -> bool:
+    """DB นี้รัน migration 006 แล้วหรือยัง — ยังไม่มีก็ถามใหม่ทุก _PROJECTION_RETRY_SEC (รัน migration แล้วไม่ต้อง restart)
+    key = client จริง (replica/primary) ไม่ใช่ TimedClient ที่สร้างใหม่ทุก request"""
+    key = id(unwrap(sb))
+    seen = _PROJECTION.get(key)
+    if seen and (seen[0] or time.time() - seen[1] < _PROJECTION_RETRY_SEC):
+        return seen[0]
     try:
-        sb = supabase_client()
-        res = sb.table("jobs").select("job_id", count="exact").limit(1).execute()
-        has = (getattr(res, "count", 0) or 0) > 0
-    except Exception:
-        has = False
-    _JOBS_DB_FLAG["v"] = has
-    _JOBS_DB_FLAG["t"] = now
-    return has
+        sb.table("jobs").select("pub_title_th").limit(1).execute()
+    except Exception as e:
+        if seen is None:
+            logger.warning("jobs projection columns unavailable (run migrations/006_job_projections.sql): %s", e)
+        _PROJECTION[key] = (False, time.time())
+        return False
+    _PROJECTION[key] = (True, time.time())
+    return True
+
+
+def _public_rows(lang: str, fetch: Any, sb: Any) -> List[Dict[str, Any]]:
+    """fetch(select) -> แถว public shape ของภาษา lang (projection; DB เก่า -> select * แล้ว shape ใน Python)"""
+    if _projection_ready(sb):
+        return fetch(_public_select(lang))
+    return [_job_public_shape(r, lang) for r in fetch("*")]
+
+
+# ✅ Public catalog cache — DB เป็นแหล่งเดียว: โหลดงาน published ครั้งเดียว ใช้ได้ทุกภาษา/ทุก filter
+#    ล้างเมื่อแอดมินแก้งาน (admin.on_change) หรือ feed sync เขียนแถวที่เปลี่ยน, TTL กันไว้สำหรับ worker อื่น
+_CATALOG: Dict[str, Any] = {}  # {"v": new_catalog(rows)}
+_CATALOG_LOCK = threading.Lock()
+
+
+def _catalog_version(rows: List[Dict[str, Any]]) -> str:
+    sig = sorted(f"{r.get('job_id')}@{r.get('updated_at')}" for r in rows)
+    return hashlib.sha256("|".join(sig).encode("utf-8")).hexdigest()[:12]
+
+
+def _select_all(table: str, select: str, build: Any = None, sb: Any = None) -> List[Dict[str, Any]]:
+    """select ทีละ 1000 แถวจนหมด (PostgREST ตัด max-rows ที่ 1000)"""
+    sb = sb or supabase_client()
+    out: List[Dict[str, Any]] = []
+    start = 0
+    while True:
+        query = sb.table(table).select(select)
+        if build is not None:
+            query = build(query)
+        rows = _get_res_data(query.order("job_id").range(start, start + 999).execute()) or []
+        out.extend(rows)
+        if len(rows) < 1000:
+            return out
+        start += 1000
+
+
+def catalog() -> Dict[str, Any]:
+    cat = _CATALOG.get("v")
+    if cat and time.time() - cat["t"] < JOBS_CACHE_TTL_SEC:
+        metrics.cache_event("jobs_catalog", "hit")
+        return cat
+    with _CATALOG_LOCK:
+        cat = _CATALOG.get("v")
+        if cat and time.time() - cat["t"] < JOBS_CACHE_TTL_SEC:
+            metrics.cache_event("jobs_catalog", "hit")  # อีก thread เพิ่งโหลดเสร็จ
+            return cat
+        metrics.cache_event("jobs_catalog", "stale" if cat else "miss")
+        cat = _CATALOG["v"] = new_catalog(_load_catalog(), prev=cat or _CATALOG.get("prev"))
+        _CATALOG.pop("prev", None)
+        if cat["similar"] is None:
+            schedule_similar(cat)
+        return cat
+
+
+def _load_catalog() -> Dict[str, List[Dict[str, Any]]]:
+    """งาน published ทุกภาษา (select ละ 1 ภาษา) -> {lang: [public shape] เรียง updated_at ใหม่สุดก่อน}"""
+    sb = replica.reader() or supabase_client()
+
+    def published(q: Any) -> Any:
+        return q.eq("status", "published").neq("job_id", "").order("updated_at", desc=True)
+
+    for _ in range(3):
+        shaped = {
+            lang: _public_rows(lang, lambda sel: _select_all("jobs", sel, published, sb=sb), sb)
+            for lang in JOB_LANGS
+        }
+        # มีคนเขียนระหว่าง select แต่ละภาษา -> ชุดงานไม่ตรงกัน อ่านใหม่
+        if len({_catalog_version(rows) for rows in shaped.values()}) == 1:
+            break
+    return shaped
 
 
-def invalidate_jobs_db_flag() -> None:
-    _JOBS_DB_FLAG.clear()
+def new_catalog(shaped: Dict[str, List[Dict[str, Any]]], prev: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """prev = catalog ก่อนหน้า: ชุดงานเดิม (version เท่ากัน) -> ใช้ index/rendered/similar ที่สร้างไว้ต่อ แค่ต่ออายุ TTL"""
+    rows = shaped[JOB_LANGS[0]]
+    version = _catalog_version(rows)
+    if prev is not None and prev["version"] == version:
+        prev["t"] = time.time()  # ตัวเดิม (ไม่ copy) — similar ที่กำลังคำนวณอยู่เขียนลงตัวนี้
+        return prev
+    return {
+        "t": time.time(),
+        "rows": rows,    # public shape ภาษาแรก (ใช้นับ/เช็คว่ามีงานนี้)
+        "by_id": {r["job_id"]: r for r in rows},
+        "version": version,
+        "shaped": shaped,  # lang -> [public shape] เรียง updated_at ใหม่สุดก่อน
+        "index": {},     # lang -> {"hay", "facets", "by_id"} (ดู catalog_index)
+        "rendered": {},  # ("list", lang) / (lang, job_id) -> JSON bytes ที่ตอบได้ทันที
+        "similar": None,  # job_id -> [(job_id, score)] (ดู similar_jobs)
+        # ของ catalog ก่อนหน้า — ตอบ /similar ระหว่างคำนวณชุดใหม่เบื้องหลัง (งานที่หายไปถูกกรองตอนตอบ)
+        "similar_prev": (prev["similar"] or prev.get("similar_prev")) if prev else None,
+    }
+
+
+def invalidate_catalog(**_: Any) -> None:
+    # เก็บตัวเดิมไว้เทียบ version ตอนโหลดใหม่ (แก้งานที่ไม่ได้ published -> ชุดงานเดิม ไม่ต้องสร้าง index ใหม่)
+    cat = _CATALOG.pop("v", None)
+    if cat is not None:
+        _CATALOG["prev"] = cat
+
+
+def _job_lang(lang: str) -> str:
+    lang = (lang or "th").lower()
+    return lang if lang in JOB_LANGS else "th"
+
+
+def _shaped(cat: Dict[str, Any], lang: str) -> List[Dict[str, Any]]:
+    return cat["shaped"][lang]
+
+
+def catalog_jobs(lang: str) -> List[Dict[str, Any]]:
+    """งาน published ทั้งหมดในภาษาเดียว (shape แล้ว เรียง updated_at ใหม่สุดก่อน)"""
+    return _shaped(catalog(), _job_lang(lang))
+
+
+FACET_FIELDS = ("country", "department", "level")
+_Q_MASK_MAX = 256  # คำค้นล่าสุดต่อภาษาที่จำ bitmap ไว้ (พิมพ์/เปลี่ยน filter/เปลี่ยนหน้า ด้วยคำเดิม)
+_BYTE_BITS = [tuple(b for b in range(8) if v >> b & 1) for v in range(256)]
+
+
+try:
+    _popcount = int.bit_count  # Python 3.10+
+except AttributeError:
+    def _popcount(mask: int) -> int:
+        return bin(mask).count("1")
+
+
+def _bitmap(positions: List[int], n: int) -> int:
+    buf = bytearray((n + 7) // 8)
+    for i in positions:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+def _positions(mask: int, n: int) -> List[int]:
+    """bit ที่ตั้งไว้ -> ลำดับงาน (น้อยไปมาก)
+    bit น้อย: หา '1' ในเลขฐาน 2 (str.find ข้ามช่วง 0 ใน C) / bit เยอะ: ไล่ทีละ byte ผ่านตาราง"""
+    out: List[int] = []
+    if _popcount(mask) * 8 < n:
+        s = bin(mask)[:1:-1]  # กลับด้าน -> ตัวอักษรที่ i = bit i
+        i = s.find("1")
+        while i >= 0:
+            out.append(i)
+            i = s.find("1", i + 1)
+        return out
+    for j, byte in enumerate(mask.to_bytes((n + 7) // 8, "little")):
+        if byte:
+            base = j * 8
+            out.extend(base + b for b in _BYTE_BITS[byte])
+    return out
+
+
+def _index(cat: Dict[str, Any], lang: str) -> Dict[str, Any]:
+    """โครงสร้างค้น/กรองของภาษาเดียว — สร้างครั้งเดียวต่อ catalog (ไม่ต้องต่อ string ทุก request)
+    hay[i]          ข้อความค้นหา (lower) ของงานลำดับ i ใน _shaped
+    members[f][v]   ลำดับ (น้อยไปมาก) ของงานที่ field f = v
+    bits[f][v]      bitmap (int) ของ members[f][v] — bit i = งานลำดับ i, value เรียงตามตัวอักษร
+    all             bitmap ของทุกงาน
+    qmask[q]        bitmap ของคำค้น q (จำไว้ _Q_MASK_MAX คำ)
+    by_id[job_id]   public shape"""
+    idx = cat["index"].get(lang)
+    if idx is None:
+        shaped = _shaped(cat, lang)
+        members: Dict[str, Dict[str, List[int]]] = {f: {} for f in FACET_FIELDS}
+        for i, x in enumerate(shaped):
+            for f in FACET_FIELDS:
+                members[f].setdefault(x[f], []).append(i)
+        n = len(shaped)
+        idx = cat["index"][lang] = {
+            "hay": [f"{x['title']} {x['department']} {x['level']} {x['location']} {x['country']}".lower() for x in shaped],
+            "members": members,
+            "bits": {f: {v: _bitmap(values[v], n) for v in sorted(values)} for f, values in members.items()},
+            "all": (1 << n) - 1,
+            "qmask": {},
+            "by_id": {x["job_id"]: x for x in shaped},
+        }
+    return idx
+
+
+def catalog_index(lang: str) -> Dict[str, Any]:
+    return _index(catalog(), _job_lang(lang))
+
+
+def _q_mask(idx: Dict[str, Any], qn: str) -> int:
+    if not qn:
+        return idx["all"]
+    m = idx["qmask"].get(qn)
+    if m is None:
+        hay = idx["hay"]
+        m = _bitmap([i for i, h in enumerate(hay) if qn in h], len(hay))
+        if len(idx["qmask"]) >= _Q_MASK_MAX:
+            idx["qmask"].clear()
+        idx["qmask"][qn] = m
+    return m
+
+
+def _facet_mask(idx: Dict[str, Any], filters: Dict[str, str], skip: str = "") -> int:
+    m = idx["all"]
+    for f, v in filters.items():
+        if v and f != skip:
+            m &= idx["bits"][f].get(v, 0)
+    return m
+
+
+def facet_search(
+    cat: Dict[str, Any], lang: str, filters: Dict[str, str], q: str = "", counts: bool = True
+) -> Dict[str, Any]:
+    """งานที่ตรงทุก filter + จำนวนงานต่อ value ของทุก facet ในครั้งเดียว
+    count ของ facet f นับตาม filter อื่นทั้งหมด (ไม่รวม f เอง) -> เลือก value อื่นใน facet เดียวกันแล้วได้กี่งาน
+    -> {"positions": [ลำดับใน _shaped], "facets": {f: {value: count}}}"""
+    idx = _index(cat, lang)
+    hay = idx["hay"]
+    filters = {f: (filters.get(f) or "") for f in FACET_FIELDS}
+    qn = (q or "").strip().lower()
+    fm = _facet_mask(idx, filters)
+    if qn and not counts and qn not in idx["qmask"]:
+        # ไม่ต้องนับ -> scan เฉพาะงานที่ผ่าน facet แล้ว (ไม่ต้องสร้าง bitmap ของคำค้นทั้ง catalog)
+        active = [(f, v) for f, v in filters.items() if v]
+        if not active:
+            cand: Any = range(len(hay))
+        elif len(active) == 1:
+            cand = idx["members"][active[0][0]].get(active[0][1], [])
+        else:
+            cand = _positions(fm, len(hay))
+        return {"positions": [i for i in cand if qn in hay[i]]}
+    qm = _q_mask(idx, qn)
+    out: Dict[str, Any] = {"positions": _positions(qm & fm, len(hay))}
+    if counts:
+        out["facets"] = {}
+        for f in FACET_FIELDS:
+            base = qm & _facet_mask(idx, filters, skip=f)
+            out["facets"][f] = {v: _popcount(base & m) for v, m in idx["bits"][f].items() if v}
+    return out
 
 
 def fetch_jobs_db(
@@ -442,40 +660,495 @@ def fetch_jobs_db(
     level: str = "",
     q: str = "",
 ) -> List[Dict[str, Any]]:
-    sb = supabase_client()
-    query = sb.table("jobs").select("*").eq("status", "published")
-    if country:
-        query = query.eq("country", country)
-    if department:
-        query = query.eq("department", department)
-    if level:
-        query = query.eq("level", level)
-    res = query.execute()
-    rows = _get_res_data(res) or []
-    shaped = [_job_public_shape(r, lang) for r in rows if str(r.get("job_id", "")).strip()]
+    lang = _job_lang(lang)
+    cat = catalog()
+    shaped = _shaped(cat, lang)
+    if not (country or department or level or (q or "").strip()):
+        return shaped
+    hit = facet_search(cat, lang, {"country": country, "department": department, "level": level}, q, counts=False)
+    return [shaped[i] for i in hit["positions"]]
+
+
+# ✅ Typeahead (/jobs/suggest) — index ต่อภาษาอยู่นอก catalog: catalog ใหม่ -> sync เฉพาะงานที่เปลี่ยน (ดู app/suggest.py)
+_SUGGEST: Dict[str, Any] = {}  # lang -> SuggestIndex
+_SUGGEST_LOCK = threading.Lock()
+
+
+def suggest_index(cat: Dict[str, Any], lang: str) -> Any:
+    ix = _SUGGEST.get(lang)
+    if ix is None:
+        with _SUGGEST_LOCK:
+            ix = _SUGGEST.setdefault(lang, SuggestIndex())
+    if ix.version != cat["version"]:
+        ix.sync(cat["version"], _shaped(cat, lang))
+    return ix
+
+
+# ✅ Similar jobs (/jobs/{job_id}/similar) — TF-IDF ของ title/department/level/รายละเอียด ทั้ง 3 ภาษารวมกัน
+#    คำนวณ top-k ของทุกงานครั้งเดียวต่อ catalog (warm เบื้องหลัง) -> ต่อ request เหลือแค่ lookup
+SIMILAR_JOBS_K = max(1, int(os.getenv("SIMILAR_JOBS_K", "6")))
+SIMILAR_MIN_SCORE = float(os.getenv("SIMILAR_MIN_SCORE", "0.05"))
+_SIMILAR_FIELDS = (("title", 3.0), ("department", 2.0), ("level", 1.0), ("description", 1.0), ("qualifications", 0.5))
+_SIMILAR_MAX_TERMS = 64  # term น้ำหนักสูงสุดต่องาน (คำอธิบายยาวไม่ถ่วง)
+_SIMILAR_MAX_CHARS = 1000  # ต่อ field ต่อภาษา
+_SIMILAR_LOCK = threading.Lock()
+
+
+def similar_jobs(cat: Dict[str, Any]) -> Dict[str, List[Tuple[str, float]]]:
+    """blocking (CPU) — job_id -> [(job_id, cosine)] มากไปน้อย"""
+    sim = cat["similar"]
+    if sim is None:
+        with _SIMILAR_LOCK:
+            sim = cat["similar"]
+            if sim is None:
+                t0 = time.perf_counter()
+                docs: Dict[str, Dict[Tuple[str, float], None]] = {}
+                for lang in JOB_LANGS:
+                    for x in _shaped(cat, lang):
+                        doc = docs.setdefault(x["job_id"], {})
+                        for field, weight in _SIMILAR_FIELDS:
+                            doc[(x[field], weight)] = None  # ภาษาที่ fallback มาเป็นข้อความเดิม -> นับครั้งเดียว
+                tfs = {jid: textvec.term_freq(list(doc), max_chars=_SIMILAR_MAX_CHARS) for jid, doc in docs.items()}
+                vz = textvec.Vectorizer(max_terms=_SIMILAR_MAX_TERMS).fit(tfs.values())
+                vecs = {jid: vz.transform(tf) for jid, tf in tfs.items()}
+                sim = cat["similar"] = textvec.neighbours(vecs, SIMILAR_JOBS_K, min_score=SIMILAR_MIN_SCORE)
+                cat["similar_prev"] = None
+                logger.info("similar jobs: %d jobs in %.0f ms", len(sim), (time.perf_counter() - t0) * 1000.0)
+    return sim
+
+
+async def _build_similar(cat: Dict[str, Any]) -> None:
+    try:
+        await asyncio.to_thread(similar_jobs, cat)
+    except Exception as e:
+        logger.warning("similar jobs failed: %s", getattr(e, "detail", None) or e)
 
-    qn = (q or "").strip().lower()
-    if qn:
-        def hay(x: Dict[str, Any]) -> str:
-            return f"{x['title']} {x['department']} {x['level']} {x['location']} {x['country']}".lower()
-        shaped = [x for x in shaped if qn in hay(x)]
 
-    shaped.sort(key=lambda x: str(x.get("updated_at") or ""), reverse=True)
-    return shaped
+def schedule_similar(cat: Dict[str, Any]) -> None:
+    """ชุดงานเปลี่ยน (catalog ใหม่) -> คำนวณงานคล้ายกันเบื้องหลัง ไม่ให้ request แรกของ /similar รอ"""
+    loop = getattr(app.state, "loop", None)
+    if loop is None or not CACHE_WARM_ENABLED:
+        return
+    loop.call_soon_threadsafe(lambda: asyncio.ensure_future(_build_similar(cat)))
+
+
+async def load_public_jobs(lang: str) -> Tuple[str, List[Dict[str, Any]]]:
+    """catalog ที่เผยแพร่ทั้งหมดของภาษาเดียว (shape เดียวกับ /jobs) -> (version, rows)"""
+    rows = catalog_jobs(lang)
+    return catalog()["version"], rows
 
 
 def fetch_job_db(job_id: str, lang: str = "th") -> Optional[Dict[str, Any]]:
-    sb = supabase_client()
-    res = sb.table("jobs").select("*").eq("job_id", job_id).limit(1).execute()
-    rows = _get_res_data(res) or []
-    if not rows:
+    cat = catalog()
+    if job_id in cat["by_id"]:
+        return _index(cat, _job_lang(lang))["by_id"].get(job_id)
+    # ไม่อยู่ใน catalog (draft/closed หรือเพิ่งสร้างบน worker อื่น) -> ถาม DB ตรงๆ
+    sb = replica.reader() or supabase_client()
+    rows = _public_rows(
+        _job_lang(lang),
+        lambda sel: _get_res_data(sb.table("jobs").select(sel).eq("job_id", job_id).limit(1).execute()) or [],
+        sb,
+    )
+    return rows[0] if rows else None
+
+
+# ---------------------------
+# ✅ Cache warming — หลัง deploy / หลังแอดมินแก้งาน / หลัง feed sync เขียนแถวที่เปลี่ยน
+#    โหลด catalog + shape ทุกภาษา + index ค้น/กรอง + render JSON ของหน้ารวมและ detail ที่คนดูมากสุด
+#    ไว้ก่อน visitor คนแรก; /health ตอบ 503 จนกว่ารอบแรกเสร็จ (LB จะไม่ส่ง traffic เข้า worker ที่ยังเย็น)
+# ---------------------------
+CACHE_WARM_ENABLED = os.getenv("CACHE_WARM_ENABLED", "true").strip().lower() in ("1", "true", "yes")
+CACHE_WARM_TOP_JOBS = max(0, int(os.getenv("CACHE_WARM_TOP_JOBS", "50")))
+CACHE_WARM_DEBOUNCE_SEC = float(os.getenv("CACHE_WARM_DEBOUNCE_SEC", "1"))
+# warm พังนานเกินนี้ -> ประกาศ ready ไปก่อน (อ่าน DB ตามปกติ) ดีกว่าติด 503 ค้าง
+CACHE_WARM_READY_TIMEOUT_SEC = float(os.getenv("CACHE_WARM_READY_TIMEOUT_SEC", "30"))
+
+_JOB_VIEWS: Counter = Counter()  # job_id -> จำนวนครั้งที่เปิด detail (เฉพาะงานใน catalog, ต่อ worker)
+_WARM: Dict[str, Any] = {"ready": not CACHE_WARM_ENABLED, "deadline": None, "scheduled": False,
+                         "runs": 0, "last": None, "last_error": None}
+
+
+def _list_body(cat: Dict[str, Any], rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {"ok": True, "version": cat["version"], "rows": rows, "total": len(rows)}
+
+
+def _rendered(cat: Dict[str, Any], key: Any, build: Any) -> Response:
+    body = cat["rendered"].get(key)
+    if body is None:
+        body = cat["rendered"][key] = JSONResponse(build()).body
+    return Response(content=body, media_type="application/json")
+
+
+def _board(cat: Dict[str, Any], lang: str, facets: bool = False) -> Response:
+    """หน้าแรกของบอร์ด (ไม่มี filter) = request ที่ถี่ที่สุด -> JSON ที่ render ไว้แล้ว"""
+    if facets:
+        return _rendered(cat, ("list+facets", lang), lambda: {
+            **_list_body(cat, _shaped(cat, lang)), "facets": facet_search(cat, lang, {})["facets"],
+        })
+    return _rendered(cat, ("list", lang), lambda: _list_body(cat, _shaped(cat, lang)))
+
+
+def _hot_job_ids(cat: Dict[str, Any], n: int) -> List[str]:
+    """งานที่คนเปิดดูมากสุด (worker นี้) — ยังไม่มีสถิติ (เพิ่ง deploy) เติมด้วยงานใหม่สุด"""
+    hot = [jid for jid, _ in _JOB_VIEWS.most_common() if jid in cat["by_id"]][:n]
+    if len(hot) < n:
+        seen = set(hot)
+        for x in _shaped(cat, "th"):
+            if len(hot) >= n:
+                break
+            if x["job_id"] not in seen:
+                hot.append(x["job_id"])
+    return hot
+
+
+def warm_caches() -> Dict[str, Any]:
+    """blocking (DB + CPU) — เรียกผ่าน asyncio.to_thread"""
+    t0 = time.perf_counter()
+    cat = catalog()
+    hot = _hot_job_ids(cat, CACHE_WARM_TOP_JOBS)
+    for lang in JOB_LANGS:
+        idx = _index(cat, lang)
+        _board(cat, lang)
+        _board(cat, lang, facets=True)
+        suggest_index(cat, lang)
+        for jid in hot:
+            _rendered(cat, (lang, jid), lambda: {"ok": True, "job": idx["by_id"][jid]})
+    return {
+        "version": cat["version"],
+        "jobs": len(cat["rows"]),
+        "langs": list(JOB_LANGS),
+        "details": len(hot),
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000.0, 1),
+    }
+
+
+async def run_warm(reason: str, attempts: int = 3) -> None:
+    for attempt in range(attempts):
+        try:
+            with boot.phase(f"cache warm ({reason})"):
+                stats = await asyncio.to_thread(warm_caches)
+        except Exception as e:
+            detail = getattr(e, "detail", None) or str(e)
+            _WARM["last_error"] = {"at": utc_now_iso(), "reason": reason, "detail": str(detail)[:500]}
+            logger.warning("cache warm (%s) failed: %s", reason, detail)
+            await asyncio.sleep(min(2 ** attempt, 10))
+            continue
+        _WARM.update(ready=True, runs=_WARM["runs"] + 1, last={"at": utc_now_iso(), "reason": reason, **stats})
+        # งานคล้ายกันใช้เวลาหลักวินาทีเมื่องานเยอะ -> คำนวณหลังประกาศ ready (ไม่ถ่วง /health)
+        try:
+            with boot.phase(f"similar jobs ({reason})"):
+                await asyncio.to_thread(similar_jobs, catalog())
+        except Exception as e:
+            logger.warning("similar jobs (%s) failed: %s", reason, getattr(e, "detail", None) or e)
+        return
+
+
+def warm_ready() -> bool:
+    if _WARM["ready"]:
+        return True
+    deadline = _WARM["deadline"]
+    return deadline is not None and time.time() > deadline
+
+
+async def _warm_after_debounce(reason: str) -> None:
+    await asyncio.sleep(CACHE_WARM_DEBOUNCE_SEC)
+    _WARM["scheduled"] = False
+    await run_warm(reason, attempts=1)
+
+
+def schedule_warm(reason: str = "change", **_: Any) -> None:
+    """หลัง invalidate_catalog — เรียกได้ทั้งจาก admin hook (threadpool) และจาก event loop; แก้ติดกันหลายครั้ง = warm รอบเดียว"""
+    loop = getattr(app.state, "loop", None)
+    if loop is None or not CACHE_WARM_ENABLED or _WARM["scheduled"]:
+        return
+    _WARM["scheduled"] = True
+    loop.call_soon_threadsafe(lambda: asyncio.ensure_future(_warm_after_debounce(reason)))
+
+
+# ---------------------------
+# ✅ Feed -> DB synchronizer: ดึง Google feed (Apps Script) ตามรอบ แล้วเขียนเข้า jobs
+#    เฉพาะแถวที่เนื้อหาเปลี่ยน -> public อ่านจาก DB อย่างเดียว (เลิก dual read path)
+#    jobs.feed_hash (migration 008) = hash เนื้อหาที่ sync เขียนครั้งล่าสุด
+#      - แถวที่เนื้อหาปัจจุบันไม่ตรง feed_hash = แอดมินแก้หลัง sync -> ข้าม (ไม่เขียนทับ)
+#      - ไม่เขียน status ของแถวที่มีอยู่แล้ว (แอดมินปิด/ซ่อนงาน sync ไม่เปิดกลับ)
+#      - งานที่ถูกลบ (มี tombstone ใน sync_tombstones) ไม่ถูกสร้างกลับ
+#    หลาย worker รันพร้อมกันได้ (idempotent) แต่ควรเปิด FEED_SYNC_ENABLED แค่ตัวเดียว
+# ---------------------------
+# ค่าเริ่มต้น = เปิดเมื่อตั้ง GOOGLE_JOBS_FEED_URL (public อ่านจาก DB อย่างเดียว — ไม่ sync = บอร์ดว่าง)
+#   worker อื่นที่ไม่ได้เป็นคน sync ให้ตั้ง FEED_SYNC_ENABLED=false เอง
+FEED_SYNC_ENABLED = (
+    os.getenv("FEED_SYNC_ENABLED", "").strip() or ("true" if GOOGLE_JOBS_FEED_URL else "false")
+).lower() in ("1", "true", "yes")
+FEED_SYNC_INTERVAL_SEC = max(30, int(os.getenv("FEED_SYNC_INTERVAL_SEC", "300")))
+# ปิดงานใน DB ที่หายไปจาก feed (ค่าเริ่มต้นปิด) — เฉพาะแถวที่ sync เป็นเจ้าของและไม่มีใครแก้
+FEED_SYNC_CLOSE_MISSING = os.getenv("FEED_SYNC_CLOSE_MISSING", "false").strip().lower() in ("1", "true", "yes")
+FEED_SYNC_BATCH = 200
+
+# ตรงกับ scripts/import_jobs_from_csv.py (hash เดียวกัน -> import กับ sync ไม่เขียนทับกันไปมา)
+JOB_HASH_COLS = [
+    "job_id", "status", "country", "department", "level",
+    "title_th", "title_en", "title_zh",
+    "location_th", "location_en", "location_zh",
+    "desc_th", "desc_en", "desc_zh",
+    "qual_th", "qual_en", "qual_zh",
+    "quantity",
+]
+# คอลัมน์ที่ feed เป็นเจ้าของ (ไม่มี status)
+FEED_CONTENT_COLS = [c for c in JOB_HASH_COLS if c != "status"]
+_FEED_FIELDS = {"title": "title", "location": "location", "description": "desc", "qualifications": "qual"}
+_FEED_SYNC: Dict[str, Any] = {
+    "runs": 0,
+    "last_run_at": None,
+    "last_success_at": None,
+    "last_success_ts": None,
+    "last_version": None,
+    "last_error": None,
+    "last_stats": None,
+}
+
+
+def _to_int(v: Any) -> Optional[int]:
+    try:
+        s = str(v).strip()
+        return int(float(s)) if s else None
+    except Exception:
         return None
-    return _job_public_shape(rows[0], lang)
+
+
+def _job_content_hash(row: Dict[str, Any], cols: List[str] = JOB_HASH_COLS) -> str:
+    norm = {c: ("" if row.get(c) is None else row.get(c)) for c in cols}
+    if norm.get("quantity") == "":
+        norm["quantity"] = None
+    raw = json.dumps(norm, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _feed_hash(row: Dict[str, Any]) -> str:
+    return _job_content_hash(row, FEED_CONTENT_COLS)
+
+
+def feed_to_job_rows(feeds: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """feed (1 ชุดต่อภาษา, shape สาธารณะ) -> แถวตาราง jobs (คอลัมน์ th/en/zh)
+    status ในผลลัพธ์ใช้ตอน insert งานใหม่เท่านั้น"""
+    out: Dict[str, Dict[str, Any]] = {}
+    for lang, rows in feeds.items():
+        for x in rows:
+            jid = str(x.get("job_id", "")).strip()
+            if not jid:
+                continue
+            r = out.setdefault(jid, {c: "" for c in JOB_HASH_COLS})
+            r["job_id"] = jid
+            for field, col in _FEED_FIELDS.items():
+                r[f"{col}_{lang}"] = str(x.get(field) or "").strip()
+            for k in ("department", "level", "country"):
+                r[k] = r[k] or str(x.get(k) or "").strip()
+            if r["quantity"] in ("", None):
+                r["quantity"] = _to_int(x.get("quantity"))
+            r["status"] = r["status"] or (str(x.get("status") or "").strip() or "published")
+    for r in out.values():
+        if r["quantity"] == "":
+            r["quantity"] = None
+    return out
+
+
+def _missing_column(e: Exception) -> bool:
+    """คอลัมน์ยังไม่มี (Postgres 42703 / PostgREST PGRST204 / SQLite)"""
+    code = str(getattr(e, "code", "") or "")
+    return code in ("42703", "PGRST204") or "no such column" in str(e) or "does not exist" in str(e)
+
+
+def _stored_jobs() -> Tuple[Dict[str, Dict[str, Any]], bool]:
+    """job_id -> แถว (เนื้อหา + status/updated_at/feed_hash), มีคอลัมน์ feed_hash หรือไม่"""
+    cols = ",".join(FEED_CONTENT_COLS + ["status", "updated_at"])
+    try:
+        rows = _select_all("jobs", cols + ",feed_hash")
+        owned = True
+    except Exception as e:
+        if not _missing_column(e):
+            raise
+        logger.warning("feed sync: jobs.feed_hash missing (run migration 008) — inserting new jobs only")
+        rows = _select_all("jobs", cols)
+        owned = False
+    return {r["job_id"]: r for r in rows}, owned
+
+
+def _deleted_job_ids(ids: List[str]) -> set:
+    """job_id ที่แอดมินลบไปแล้ว (tombstone) — sync ไม่สร้างกลับ"""
+    sb = supabase_client()
+    out: set = set()
+    for i in range(0, len(ids), FEED_SYNC_BATCH):
+        try:
+            res = (
+                sb.table("sync_tombstones").select("entity_key")
+                .eq("entity", "job").in_("entity_key", ids[i:i + FEED_SYNC_BATCH]).execute()
+            )
+        except Exception as e:
+            if not _missing_table(e):
+                raise
+            return out  # ยังไม่ได้รัน migration 005 -> ไม่มีข้อมูลการลบ
+        out.update(r["entity_key"] for r in (_get_res_data(res) or []))
+    return out
+
+
+def plan_feed_sync(
+    mapped: Dict[str, Dict[str, Any]], stored: Dict[str, Dict[str, Any]], owned: bool, deleted: set
+) -> Dict[str, List[Any]]:
+    """แยกงานใน feed ตามสิ่งที่ต้องทำ (ไม่แตะ DB)"""
+    plan: Dict[str, List[Any]] = {
+        "insert": [], "update": [], "claim": [], "close": [], "skipped_local": [], "skipped_deleted": [],
+    }
+    for jid, r in mapped.items():
+        fh = _feed_hash(r)
+        cur = stored.get(jid)
+        if cur is None:
+            if jid in deleted:
+                plan["skipped_deleted"].append(jid)
+            else:
+                plan["insert"].append({**r, "feed_hash": fh} if owned else dict(r))
+            continue
+        if not owned:
+            continue
+        cur_hash, own = _feed_hash(cur), cur.get("feed_hash")
+        if own is None:
+            # แถวเดิมก่อน migration 008: เนื้อหาตรง feed -> รับเป็นของ sync, ไม่ตรง -> ถือว่าแก้เอง
+            if cur_hash == fh:
+                plan["claim"].append((cur, fh))
+            else:
+                plan["skipped_local"].append(jid)
+        elif own != cur_hash:
+            plan["skipped_local"].append(jid)
+        elif own != fh:
+            plan["update"].append((cur, {c: r[c] for c in FEED_CONTENT_COLS if c != "job_id"}, fh))
+    if FEED_SYNC_CLOSE_MISSING and owned:
+        plan["close"] = [
+            cur for jid, cur in sorted(stored.items())
+            if jid not in mapped and cur.get("status") != "closed"
+            and cur.get("feed_hash") is not None and cur["feed_hash"] == _feed_hash(cur)
+        ]
+    return plan
+
+
+def _write_job_changes(plan: Dict[str, List[Any]]) -> int:
+    """เขียนตาม plan -> จำนวนแถวที่เปลี่ยนจริง
+    update/claim/close ใช้ updated_at ที่อ่านมาเป็นเงื่อนไข: แอดมินแก้ระหว่างรอบ -> แถวนั้นไม่ถูกเขียนทับ"""
+    sb = supabase_client()
+    now = utc_now_iso()
+    written = 0
+    inserts = plan["insert"]
+    for i in range(0, len(inserts), FEED_SYNC_BATCH):
+        batch = [{**r, "updated_at": now} for r in inserts[i:i + FEED_SYNC_BATCH]]
+        res = sb.table("jobs").upsert(batch, on_conflict="job_id", ignore_duplicates=True).execute()
+        written += len(_get_res_data(res) or [])
+    writes = [(cur, {**data, "feed_hash": fh, "updated_at": now}) for cur, data, fh in plan["update"]]
+    writes += [(cur, {"feed_hash": fh}) for cur, fh in plan["claim"]]
+    writes += [(cur, {"status": "closed", "updated_at": now}) for cur in plan["close"]]
+    for cur, payload in writes:
+        q = sb.table("jobs").update(payload).eq("job_id", cur["job_id"])
+        if cur.get("updated_at") is not None:
+            q = q.eq("updated_at", cur["updated_at"])
+        written += len(_get_res_data(q.execute()) or [])
+    return written
+
+
+async def sync_feed_to_db() -> Dict[str, Any]:
+    t0 = time.time()
+    _FEED_SYNC["runs"] += 1
+    _FEED_SYNC["last_run_at"] = utc_now_iso()
+    try:
+        client = http_client()
+        feeds: Dict[str, List[Dict[str, Any]]] = {}
+        version = ""
+        for lang in JOB_LANGS:
+            data = await _fetch_jobs_feed_raw(client=client, lang=lang)
+            feeds[lang] = data.get("rows") or []
+            version = version or str(data.get("version", ""))
+        mapped = feed_to_job_rows(feeds)
+
+        stored, owned = await asyncio.to_thread(_stored_jobs)
+        fresh = sorted(j for j in mapped if j not in stored)
+        deleted = await asyncio.to_thread(_deleted_job_ids, fresh) if fresh else set()
+        plan = plan_feed_sync(mapped, stored, owned, deleted)
+        written = 0
+        if plan["insert"] or plan["update"] or plan["claim"] or plan["close"]:
+            written = await asyncio.to_thread(_write_job_changes, plan)
+        if written:
+            invalidate_catalog()
+            schedule_warm("feed sync")
+            _schedule_snapshot()
+    except Exception as e:
+        detail = getattr(e, "detail", None) or str(e)
+        _FEED_SYNC["last_error"] = {"at": utc_now_iso(), "detail": str(detail)[:500]}
+        logger.warning("feed sync failed: %s", detail)
+        raise
+
+    stats = {
+        "feed_rows": len(mapped),
+        "stored_rows": len(stored),
+        "inserted": len(plan["insert"]),
+        "updated": len(plan["update"]),
+        "claimed": len(plan["claim"]),
+        "closed": len(plan["close"]),
+        "skipped_local": len(plan["skipped_local"]),
+        "skipped_deleted": len(plan["skipped_deleted"]),
+        "written": written,
+        "elapsed_ms": int((time.time() - t0) * 1000),
+    }
+    _FEED_SYNC.update(
+        last_success_at=utc_now_iso(), last_success_ts=time.time(), last_version=version, last_stats=stats
+    )
+    if written or plan["skipped_local"] or plan["skipped_deleted"]:
+        logger.info("feed sync: %s", stats)
+    return stats
+
+
+_FEED_GAP: Dict[str, Any] = {"ok": False, "checked": 0.0, "empty": False}
+_FEED_GAP_RECHECK_SEC = 30.0
+
+
+def feed_jobs_missing() -> bool:
+    """ตั้ง feed ไว้แต่ตาราง jobs ยังว่าง (ยังไม่เคย sync / worker นี้ไม่ได้ sync และไม่มีใคร sync)
+    -> /health ไม่ ready แทนที่จะเปิดบอร์ดว่างกับ 404 ทุกงาน; เจอแถวแล้วครั้งเดียวพอ ไม่เช็คอีก"""
+    if not GOOGLE_JOBS_FEED_URL or _FEED_GAP["ok"]:
+        return False
+    if _FEED_SYNC.get("last_success_ts") or (_CATALOG.get("v") or {}).get("rows"):
+        _FEED_GAP["ok"] = True
+        return False
+    if time.time() - _FEED_GAP["checked"] < _FEED_GAP_RECHECK_SEC:
+        return _FEED_GAP["empty"]
+    _FEED_GAP["checked"] = time.time()
+    try:
+        rows = _get_res_data(supabase_client().table("jobs").select("job_id").limit(1).execute()) or []
+    except Exception as e:
+        logger.warning("jobs table check failed: %s", getattr(e, "detail", None) or e)
+        return _FEED_GAP["empty"]
+    if rows:
+        _FEED_GAP.update(ok=True, empty=False)
+        return False
+    if not _FEED_GAP["empty"]:
+        logger.error(
+            "GOOGLE_JOBS_FEED_URL is set but the jobs table is empty — %s",
+            "waiting for the first feed sync" if FEED_SYNC_ENABLED
+            else "FEED_SYNC_ENABLED is off on this worker; enable it on one worker or import the feed",
+        )
+    _FEED_GAP["empty"] = True
+    return True
+
+
+async def _feed_sync_loop() -> None:
+    while True:
+        try:
+            await sync_feed_to_db()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            pass  # log แล้วใน sync_feed_to_db — รอรอบถัดไป
+        await asyncio.sleep(FEED_SYNC_INTERVAL_SEC)
 
 
 # ---------------------------
 # App
 # ---------------------------
+_t_app = time.perf_counter()
 app = FastAPI(title=APP_NAME)
 
 app.add_middleware(
@@ -485,49 +1158,161 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Request-ID"],
 )
+# ✅ X-Profile: 1 + token แอดมิน -> profile เฉพาะ request นั้น (ดู profiler.py)
+# อยู่ข้างใน Timing เพื่อใช้ request id เดียวกัน — profile_authorized มาจาก admin ที่ import ด้านล่าง
+app.add_middleware(ProfileMiddleware, authorize=lambda headers: profile_authorized(headers), request_id=request_id)
+# ✅ Server-Timing + X-Request-ID + log ต่อ request (ดู timing.py) — add ทีหลัง = ครอบนอกสุด
+app.add_middleware(TimingMiddleware)
+# ✅ Prometheus metrics ต่อ route + upstream (ดู metrics.py) — GET /metrics
+#    นอก APP_ENV local/dev ต้องตั้ง METRICS_TOKEN ไม่งั้นปิด (route/upstream/ขนาด cache ไม่ควรเปิดสาธารณะ)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").strip().lower() in ("1", "true", "yes")
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "").strip()
+if METRICS_ENABLED and not METRICS_TOKEN and APP_ENV.strip().lower() not in ("local", "dev", "development"):
+    logger.warning("metrics disabled: set METRICS_TOKEN to expose /metrics when APP_ENV=%s", APP_ENV)
+    METRICS_ENABLED = False
+if METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+    add_observer(metrics.observe_upstream)
+boot.record("app + middleware", _t_app, time.perf_counter())
 
 # ✅ Admin router (Phase 1) — auth + applications management
 # รองรับทั้งการรันแบบ `uvicorn app.main:app` (cwd=backend) และ `uvicorn main:app` (cwd=app)
+_t_admin = time.perf_counter()
 try:
-    from app.admin import router as admin_router  # type: ignore
+    from app.admin import router as admin_router, on_change as admin_on_change, profile_authorized, require_admin  # type: ignore
+    from app.snapshot import LocalSink, StorageSink, build_snapshot_files, sync_snapshot  # type: ignore
+    from app.suggest import SuggestIndex  # type: ignore
+    from app import textvec  # type: ignore
+    from app import replica  # type: ignore
 except Exception:
-    from admin import router as admin_router  # type: ignore
+    from admin import router as admin_router, on_change as admin_on_change, profile_authorized, require_admin  # type: ignore
+    from snapshot import LocalSink, StorageSink, build_snapshot_files, sync_snapshot  # type: ignore
+    from suggest import SuggestIndex  # type: ignore
+    import textvec  # type: ignore
+    import replica  # type: ignore
 app.include_router(admin_router)
+boot.record("admin router", _t_admin, time.perf_counter())
+
+# ✅ Read replica (READ_REPLICA_ENABLED) — แอดมินเขียน -> ดึงแถวนั้นเข้า replica ก่อน hook อื่นโหลด cache ใหม่
+replica.configure(supabase_client)
+admin_on_change("jobs", lambda job_id="", **_: replica.pull("jobs", [{"job_id": job_id}]))
+admin_on_change("content", lambda lang="", key="", **_: replica.pull("site_content", [{"key": key, "lang": lang}]))
+admin_on_change("applications", lambda ids=(), **_: replica.pull("applications", [{"id": i} for i in ids]))
+
+# แอดมินแก้งาน -> ล้าง catalog ให้ public เห็นทันที แล้วอุ่นใหม่เบื้องหลัง
+admin_on_change("jobs", invalidate_catalog)
+admin_on_change("jobs", lambda **_: schedule_warm("admin"))
+
+
+async def _replica_loop() -> None:
+    while True:
+        if replica.due():
+            await asyncio.to_thread(replica.refresh)
+        await asyncio.sleep(1)
+
+
+# ✅ โหลด httpx / supabase-py + สร้าง client ใน thread หลัง startup -> พอร์ตเปิดรับได้ทันที
+#    และปกติ client พร้อมก่อน request แรก (ถ้า request มาก่อน ก็ import ตอนนั้นตามปกติ)
+STARTUP_PREWARM = os.getenv("STARTUP_PREWARM", "true").strip().lower() in ("1", "true", "yes")
+
+
+def http_client() -> "httpx.AsyncClient":
+    """shared AsyncClient (keep-alive) — สร้างตอนใช้ครั้งแรก"""
+    client = getattr(app.state, "http", None)
+    if client is None:
+        httpx = boot.lazy_import("httpx")
+        client = app.state.http = httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT,
+            follow_redirects=True,  # Apps Script /exec -> googleusercontent 302
+            headers={
+                "User-Agent": "SHD-Careers-Backend/1.0",
+                "Accept": "application/json,text/plain,*/*",
+            },
+        )
+    return client
+
+
+def _prewarm_clients() -> None:
+    boot.lazy_import("httpx")
+    if not use_local() and SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY:
+        remote_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+
+
+async def _prewarm() -> None:
+    if STARTUP_PREWARM:
+        try:
+            await asyncio.to_thread(_prewarm_clients)
+            http_client()
+        except Exception as e:
+            logger.warning("prewarm failed: %s", e)
+        boot.mark("clients_ready")
+    if CACHE_WARM_ENABLED:
+        await run_warm("startup")
+        boot.mark("warm")
 
 
 @app.on_event("startup")
 async def _startup() -> None:
-    # ✅ Shared HTTP client (keep-alive) เร็วขึ้นมาก
-    app.state.http = httpx.AsyncClient(
-        timeout=HTTP_TIMEOUT,
-        follow_redirects=True,  # Apps Script /exec -> googleusercontent 302
-        headers={
-            "User-Agent": "SHD-Careers-Backend/1.0",
-            "Accept": "application/json,text/plain,*/*",
-        },
-    )
+    t0 = time.perf_counter()
+    app.state.loop = asyncio.get_running_loop()
 
     logger.info("startup env=%s", APP_ENV)
     logger.info("GOOGLE_JOBS_FEED_URL=%s", "set" if GOOGLE_JOBS_FEED_URL else "missing")
     logger.info("CORS_ORIGINS=%s", CORS_ORIGINS)
     logger.info("JOBS_CACHE_TTL_SEC=%s", JOBS_CACHE_TTL_SEC)
+    logger.info("STORAGE_BACKEND=%s", STORAGE_BACKEND)
     logger.info("APPS_SCRIPT_APPLY_SHEET_URL=%s", "set" if APPS_SCRIPT_APPLY_SHEET_URL else "missing")
 
+    # ✅ client + cache warm เบื้องหลัง — /health เป็น 503 จนกว่า warm รอบแรกเสร็จ (หรือเกิน timeout)
+    if CACHE_WARM_ENABLED:
+        _WARM["deadline"] = time.time() + CACHE_WARM_READY_TIMEOUT_SEC
+    if STARTUP_PREWARM or CACHE_WARM_ENABLED:
+        app.state.prewarm_task = asyncio.create_task(_prewarm())
+
+    # ✅ Feed -> DB sync (รอบแรกรันทันทีเบื้องหลัง ไม่บล็อก startup)
+    if FEED_SYNC_ENABLED and GOOGLE_JOBS_FEED_URL:
+        app.state.feed_sync_task = asyncio.create_task(_feed_sync_loop())
+    logger.info("FEED_SYNC=%s every %ss", "on" if FEED_SYNC_ENABLED and GOOGLE_JOBS_FEED_URL else "off",
+                FEED_SYNC_INTERVAL_SEC)
+
+    # ✅ Read replica (รอบแรกโหลดทั้งหมด — ระหว่างนั้นอ่านจาก Supabase ตามปกติ)
+    if replica.enabled():
+        app.state.replica_task = asyncio.create_task(_replica_loop())
+    logger.info("READ_REPLICA=%s", "on" if replica.enabled() else "off")
+
+    boot.record("startup hook", t0, time.perf_counter())
+    boot.mark("ready")
+    logger.info("ready in %.0f ms (see /debug/startup)", boot.report()["marks"]["ready"])
+
 
 @app.on_event("shutdown")
 async def _shutdown() -> None:
-    try:
-        client: httpx.AsyncClient = app.state.http  # type: ignore[attr-defined]
-        await client.aclose()
-    except Exception:
-        pass
+    for name in ("prewarm_task", "feed_sync_task", "replica_task"):
+        task = getattr(app.state, name, None)
+        if task is not None:
+            task.cancel()
+    client = getattr(app.state, "http", None)
+    if client is not None:
+        try:
+            await client.aclose()
+        except Exception:
+            pass
 
 
 # Health
 @app.get("/health")
-def health() -> Dict[str, Any]:
-    return {"ok": True, "env": APP_ENV, "time": utc_now_iso()}
+def health(response: Response) -> Dict[str, Any]:
+    """readiness — 503 ระหว่าง cache warm รอบแรก (ดู run_warm) และระหว่างที่ตั้ง feed ไว้แต่ยังไม่มีงานใน DB"""
+    missing = feed_jobs_missing()
+    ready = warm_ready() and not missing
+    if not ready:
+        response.status_code = 503
+    out = {"ok": ready, "ready": ready, "env": APP_ENV, "time": utc_now_iso()}
+    if missing:
+        out["detail"] = "jobs table is empty; waiting for feed sync"
+    return out
 
 
 @app.get("/api/health")
@@ -535,10 +1320,58 @@ def health_api() -> Dict[str, Any]:
     return {"ok": True, "env": APP_ENV, "time": utc_now_iso()}
 
 
+# ✅ ไฟล์ใน local storage (STORAGE_BACKEND=local) — เปิดได้เฉพาะลิงก์ที่เซ็นแล้ว (แทน signed URL ของ Supabase)
+@app.get("/storage/local/{bucket}/{path:path}")
+def local_storage_file(bucket: str, path: str, exp: int = 0, sig: str = "") -> FileResponse:
+    if not use_local() or not verify_signed(bucket, path, exp, sig):
+        raise HTTPException(status_code=404, detail="Not found")
+    try:
+        fp = local_file_path(bucket, path)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not os.path.isfile(fp):
+        raise HTTPException(status_code=404, detail="Not found")
+    return FileResponse(fp, filename=os.path.basename(fp), headers={"Cache-Control": "private, max-age=300"})
+
+
+# ✅ Prometheus scrape (METRICS_TOKEN ตั้งไว้ -> ต้องส่ง Authorization: Bearer <token>; ว่างได้เฉพาะ local/dev)
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint(request: Request) -> Response:
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not metrics.check_token(METRICS_TOKEN, request.headers.get("authorization")):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def _app_metrics() -> List[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]:
+    cat = _CATALOG.get("v")
+    last_ts = _FEED_SYNC.get("last_success_ts")
+    rep_age = replica.staleness() if replica.enabled() else None
+    out = [
+        ("jobs_catalog_rows", "gauge", "Published jobs in the in-process catalog.",
+         [({}, len(cat["rows"]) if cat else 0)]),
+        ("jobs_catalog_age_seconds", "gauge", "Age of the in-process jobs catalog.",
+         [({}, time.time() - cat["t"] if cat else 0)]),
+        ("content_cache_langs", "gauge", "Languages held in the site content cache.",
+         [({}, len(_CONTENT_CACHE))]),
+    ]
+    if last_ts:
+        out.append(("feed_sync_lag_seconds", "gauge", "Seconds since the last successful feed sync.",
+                    [({}, time.time() - last_ts)]))
+    if rep_age is not None:
+        out.append(("read_replica_staleness_seconds", "gauge", "Seconds since the last successful replica refresh.",
+                    [({}, rep_age)]))
+    return out
+
+
+metrics.register_collector(_app_metrics)
+
+
 # ✅ Debug endpoint: ดู feed ดิบ
 @app.get("/debug/jobs-feed")
 async def debug_jobs_feed(lang: str = "th") -> Dict[str, Any]:
-    data = await fetch_jobs_feed(lang=lang)
+    data = await _fetch_jobs_feed_raw(client=http_client(), lang=lang)
     return {
         "ok": True,
         "env": APP_ENV,
@@ -552,18 +1385,49 @@ async def debug_jobs_feed(lang: str = "th") -> Dict[str, Any]:
 # ✅ Debug cache
 @app.get("/debug/jobs-cache")
 def debug_jobs_cache() -> Dict[str, Any]:
-    now = time.time()
-    items = []
-    for k, (exp, data) in _JOBS_CACHE.items():
-        items.append(
-            {
-                "key": k,
-                "expires_in_sec": max(0, int(exp - now)),
-                "total": int((data.get("total") or 0)),
-                "version": data.get("version", ""),
-            }
-        )
-    return {"ok": True, "ttl_sec": JOBS_CACHE_TTL_SEC, "keys": items}
+    cat = _CATALOG.get("v")
+    if not cat:
+        return {"ok": True, "ttl_sec": JOBS_CACHE_TTL_SEC, "loaded": False,
+                "warm": {k: v for k, v in _WARM.items() if k != "deadline"}}
+    return {
+        "ok": True,
+        "ttl_sec": JOBS_CACHE_TTL_SEC,
+        "loaded": True,
+        "version": cat["version"],
+        "total": len(cat["rows"]),
+        "age_sec": int(time.time() - cat["t"]),
+        "shaped_langs": sorted(cat["shaped"]),
+        "indexed_langs": sorted(cat["index"]),
+        "rendered": len(cat["rendered"]),
+        "suggest": {lang: {"version": ix.version, "terms": len(ix), **ix.stats} for lang, ix in sorted(_SUGGEST.items())},
+        "warm": {k: v for k, v in _WARM.items() if k != "deadline"},
+    }
+
+
+# ✅ Debug: สถานะ feed -> DB sync (lag = เวลาตั้งแต่ sync สำเร็จครั้งล่าสุด)
+@app.get("/debug/feed-sync")
+def debug_feed_sync() -> Dict[str, Any]:
+    last_ts = _FEED_SYNC.get("last_success_ts")
+    return {
+        "ok": True,
+        "enabled": bool(FEED_SYNC_ENABLED and GOOGLE_JOBS_FEED_URL),
+        "interval_sec": FEED_SYNC_INTERVAL_SEC,
+        "close_missing": FEED_SYNC_CLOSE_MISSING,
+        "lag_sec": (int(time.time() - last_ts) if last_ts else None),
+        **{k: v for k, v in _FEED_SYNC.items() if k != "last_success_ts"},
+    }
+
+
+# ✅ Debug: สถานะ read replica (staleness = เวลาตั้งแต่รอบ refresh ที่สำเร็จล่าสุดเริ่ม)
+@app.get("/debug/read-replica")
+def debug_read_replica() -> Dict[str, Any]:
+    return {"ok": True, **replica.status()}
+
+
+# ✅ Debug: cold start — เวลาแต่ละ phase นับจาก process เริ่ม (ดู boot.py)
+@app.get("/debug/startup")
+def debug_startup() -> Dict[str, Any]:
+    return {"ok": True, "prewarm": STARTUP_PREWARM, **boot.report()}
 
 
 # ✅ Debug: ทดสอบยิงเข้า Google Sheet (เรียกใน browser ได้)
@@ -604,58 +1468,494 @@ async def list_jobs(
     country: str = "",
     department: str = "",
     level: str = "",
-) -> Dict[str, Any]:
+    facets: bool = False,
+) -> Response:
     """
     Returns:
       { ok:true, version:"...", rows:[...], total:n }
+      facets=true -> + facets:{country|department|level: {value: count}} (ดู facet_search)
     """
-    # ✅ Phase 2: อ่านจาก Supabase ก่อน ถ้ายังไม่ได้ import ค่อย fallback ไป Google feed
-    if jobs_db_has_rows():
+    # ✅ อ่านจาก catalog (DB) อย่างเดียว — feed ถูก sync เข้า DB เบื้องหลังแล้ว
+    lang = _job_lang(lang)
+    cat = catalog()
+    filters = {"country": country, "department": department, "level": level}
+    if not (q.strip() or country or department or level):
+        return _board(cat, lang, facets)
+    if not facets:
         rows = fetch_jobs_db(lang=lang, country=country, department=department, level=level, q=q)
-        return {"ok": True, "version": "db", "rows": rows, "total": len(rows)}
+        return JSONResponse(_list_body(cat, rows))
+    hit = facet_search(cat, lang, filters, q)
+    shaped = _shaped(cat, lang)
+    return JSONResponse({**_list_body(cat, [shaped[i] for i in hit["positions"]]), "facets": hit["facets"]})
 
-    # ✅ อย่าส่ง q ให้ feed (feed ไม่รองรับ q)
-    data = await fetch_jobs_feed(lang=lang, country=country, department=department, level=level)
-    rows: List[Dict[str, Any]] = data.get("rows", []) or []
 
-    # ✅ search ทำใน backend
-    qn = (q or "").strip().lower()
-    if qn:
-        def hay(x: Dict[str, Any]) -> str:
-            return (
-                f"{x.get('title','')} {x.get('department','')} {x.get('level','')} "
-                f"{x.get('location','')} {x.get('country','')}"
-            ).lower()
-        rows = [x for x in rows if qn in hay(x)]
+@app.get("/jobs/suggest")
+async def job_suggest(q: str = "", lang: str = "th", limit: int = 8) -> Dict[str, Any]:
+    """คำแนะนำขณะพิมพ์: title/department/location/country ที่ขึ้นต้น (หรือมีคำที่ขึ้นต้น) ด้วย q
+    เรียงตามจำนวนงานที่เปิดอยู่ -> [{text, field, count}]"""
+    lang = _job_lang(lang)
+    return {"ok": True, "q": q, "suggestions": suggest_index(catalog(), lang).query(q, limit)}
+
+
+@app.get("/jobs/facets")
+async def job_facets(
+    lang: str = "th",
+    q: str = "",
+    country: str = "",
+    department: str = "",
+    level: str = "",
+) -> Dict[str, Any]:
+    """ตัวนับของ sidebar filter: job_id ที่ตรง + จำนวนต่อ value ของทุก facet (ไม่ส่งเนื้องาน)"""
+    lang = _job_lang(lang)
+    cat = catalog()
+    hit = facet_search(cat, lang, {"country": country, "department": department, "level": level}, q)
+    shaped = _shaped(cat, lang)
+    return {
+        "ok": True,
+        "version": cat["version"],
+        "total": len(hit["positions"]),
+        "job_ids": [shaped[i]["job_id"] for i in hit["positions"]],
+        "facets": hit["facets"],
+    }
+
+
+@app.get("/jobs/{job_id}/similar")
+async def job_similar(job_id: str, lang: str = "th") -> Response:
+    """งานที่คล้ายกัน (งาน published เท่านั้น) -> { ok, job_id, rows:[public shape], scores:[cosine], total }"""
+    lang = _job_lang(lang)
+    cat = catalog()
+    if job_id not in cat["by_id"]:
+        raise HTTPException(status_code=404, detail="Job not found")
 
-    return {"ok": True, "version": data.get("version", ""), "rows": rows, "total": len(rows)}
+    def build(sim: Dict[str, List[Tuple[str, float]]]) -> Dict[str, Any]:
+        by_id = _index(cat, lang)["by_id"]
+        pairs = [(by_id[o], score) for o, score in sim.get(job_id, []) if o in by_id]
+        return {"ok": True, "job_id": job_id, "rows": [x for x, _ in pairs],
+                "scores": [score for _, score in pairs], "total": len(pairs)}
+
+    if cat["similar"] is None:
+        if cat.get("similar_prev") is not None:
+            # ชุดใหม่กำลังคำนวณเบื้องหลัง (schedule_similar) -> ตอบจากชุดก่อน ไม่ cache
+            return JSONResponse(build(cat["similar_prev"]))
+        await asyncio.to_thread(similar_jobs, cat)  # เพิ่ง start และ warm ยังไม่เสร็จ
+    return _rendered(cat, ("similar", lang, job_id), lambda: build(cat["similar"]))
 
 
 @app.get("/jobs/{job_id}")
-async def job_detail(job_id: str, lang: str = "th") -> Dict[str, Any]:
-    if jobs_db_has_rows():
-        j = fetch_job_db(job_id, lang)
-        if not j:
-            raise HTTPException(status_code=404, detail="Job not found")
-        return {"ok": True, "job": j}
-    j = await fetch_job_by_id(job_id=job_id, lang=lang)
-    return {"ok": True, "job": j}
+async def job_detail(job_id: str, lang: str = "th") -> Response:
+    lang = _job_lang(lang)
+    cat = catalog()
+    if job_id in cat["by_id"]:
+        _JOB_VIEWS[job_id] += 1
+        return _rendered(cat, (lang, job_id), lambda: {"ok": True, "job": _index(cat, lang)["by_id"][job_id]})
+    j = fetch_job_db(job_id, lang)
+    if not j:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JSONResponse({"ok": True, "job": j})
 
 
+# ---------------------------
 # ✅ Public CMS content (Phase 3): override ข้อความต่อ key+lang
-@app.get("/content")
-def get_content(lang: str = "th") -> Dict[str, Any]:
+#    cache เป็น bundle ต่อภาษา + version (hash ของเนื้อหา)
+#    - ล้างเฉพาะภาษาที่ถูกแก้ ทันทีที่แอดมิน upsert/delete (ผ่าน admin.on_change)
+#    - TTL กันไว้สำหรับ worker อื่นที่ไม่ได้รับ event
+#    - /content/{lang}.{version}.json = URL ที่ไม่เปลี่ยนเนื้อหา -> browser/CDN cache ได้ถาวร
+# ---------------------------
+CONTENT_CACHE_TTL_SEC = int(os.getenv("CONTENT_CACHE_TTL_SEC", "300"))
+CONTENT_DEFAULTS_DIR = os.getenv("CONTENT_DEFAULTS_DIR", "").strip() or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "frontend", "src", "i18n", "locales"
+)
+# โหลดไม่สำเร็จ (DB/เน็ตสะดุด) -> ใช้ bundle เดิมต่อ แล้วลองใหม่หลังจากนี้ (ไม่รอจนครบ TTL)
+CONTENT_RETRY_SEC = float(os.getenv("CONTENT_RETRY_SEC", "10"))
+_CONTENT_CACHE: Dict[str, Dict[str, Any]] = {}  # lang -> {"t", "items", "version", "merged", "merged_version"}
+_CONTENT_DEFAULTS: Dict[str, Optional[Dict[str, Any]]] = {}
+
+
+def _content_version(obj: Any) -> str:
+    raw = json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _content_defaults(lang: str) -> Optional[Dict[str, Any]]:
+    """ข้อความ default จากไฟล์ i18n ของ frontend (ถ้า deploy backend แยกแล้วไม่มีไฟล์ -> None)"""
+    if lang not in _CONTENT_DEFAULTS:
+        path = os.path.join(CONTENT_DEFAULTS_DIR, lang, "common.json")
+        try:
+            with open(path, encoding="utf-8") as f:
+                _CONTENT_DEFAULTS[lang] = json.load(f)
+        except Exception:
+            _CONTENT_DEFAULTS[lang] = None
+    return _CONTENT_DEFAULTS[lang]
+
+
+def _unflatten(flat: Dict[str, Any]) -> Dict[str, Any]:
+    """{"a.b.c": "x"} -> {"a": {"b": {"c": "x"}}} (ตรงกับ unflatten ใน i18n.ts)"""
+    out: Dict[str, Any] = {}
+    for k, v in flat.items():
+        parts = k.split(".")
+        node = out
+        for p in parts[:-1]:
+            node[p] = node[p] if isinstance(node.get(p), dict) else {}
+            node = node[p]
+        node[parts[-1]] = v
+    return out
+
+
+def _deep_merge(base: Dict[str, Any], over: Dict[str, Any]) -> Dict[str, Any]:
+    out = dict(base)
+    for k, v in over.items():
+        if isinstance(v, dict) and isinstance(out.get(k), dict):
+            out[k] = _deep_merge(out[k], v)
+        else:
+            out[k] = v
+    return out
+
+
+def _missing_table(e: Exception) -> bool:
+    """ตารางยังไม่ถูกสร้าง (Postgres 42P01 / PostgREST PGRST205 / SQLite) — ไม่ใช่ error ชั่วคราว"""
+    code = str(getattr(e, "code", "") or "")
+    return code in ("42P01", "PGRST205") or "no such table" in str(e) or "does not exist" in str(e)
+
+
+def _load_content_items(lang: str) -> Dict[str, Any]:
+    """โยน exception ต่อถ้าอ่านไม่ได้ — ยกเว้นยังไม่มีตาราง (= ยังไม่มี override, เว็บใช้ default)"""
     items: Dict[str, Any] = {}
     try:
-        sb = supabase_client()
+        sb = replica.reader() or supabase_client()
         res = sb.table("site_content").select("key,value").eq("lang", lang).execute()
-        for r in (_get_res_data(res) or []):
-            k = str(r.get("key", "")).strip()
-            if k:
-                items[k] = r.get("value")
+    except Exception as e:
+        if _missing_table(e):
+            return items
+        raise
+    for r in (_get_res_data(res) or []):
+        k = str(r.get("key", "")).strip()
+        if k:
+            items[k] = r.get("value")
+    return items
+
+
+def content_bundle(lang: str, merged: bool = False) -> Tuple[Dict[str, Any], str]:
+    """คืน (items, version) ของภาษานั้นจาก cache
+    merged=True -> default จากไฟล์ i18n + override (nested) พร้อมใช้ได้ทันที"""
+    now = time.time()
+    ent = _CONTENT_CACHE.get(lang)
+    if not ent or now - ent["t"] >= CONTENT_CACHE_TTL_SEC:
+        metrics.cache_event("content", "stale" if ent else "miss")
+        try:
+            items = _load_content_items(lang)
+        except Exception as e:
+            detail = getattr(e, "detail", None) or str(e)
+            if not ent:
+                # ไม่มีของเดิม -> ห้าม cache ผลว่าง (override หายทั้งเว็บจนครบ TTL) ให้ frontend ใช้ของที่มีอยู่
+                raise HTTPException(status_code=503, detail=f"content unavailable: {detail}")
+            logger.warning("content reload (%s) failed, serving previous bundle: %s", lang, detail)
+            ent["t"] = now - CONTENT_CACHE_TTL_SEC + CONTENT_RETRY_SEC
+        else:
+            ent = {"t": now, "items": items, "version": _content_version(items)}
+            _CONTENT_CACHE[lang] = ent
+    else:
+        metrics.cache_event("content", "hit")
+    if not merged:
+        return ent["items"], ent["version"]
+    if "merged" not in ent:
+        ent["merged"] = _deep_merge(_content_defaults(lang) or {}, _unflatten(ent["items"]))
+        ent["merged_version"] = _content_version(ent["merged"])
+    return ent["merged"], ent["merged_version"]
+
+
+def invalidate_content(lang: Optional[str] = None, **_: Any) -> None:
+    """ทำให้หมดอายุ (ไม่ลบทิ้ง) -> ถ้าโหลดใหม่ไม่สำเร็จยังมี bundle เดิมให้ใช้"""
+    for key, ent in list(_CONTENT_CACHE.items()):
+        if not lang or key == lang:
+            ent["t"] = float("-inf")
+
+
+admin_on_change("content", invalidate_content)
+
+
+def _content_lang(lang: str) -> str:
+    lang = (lang or "th").lower()
+    return lang if lang in JOB_LANGS else "th"
+
+
+def _bundle_url(lang: str, version: str, merged: bool) -> str:
+    return f"/content/{lang}.{version}.json" + ("?merged=1" if merged else "")
+
+
+@app.get("/content")
+def get_content(request: Request, lang: str = "th", merged: bool = False) -> Response:
+    lang = _content_lang(lang)
+    items, version = content_bundle(lang, merged=merged)
+    etag = f'"{version}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=0, must-revalidate"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(
+        {
+            "ok": True,
+            "lang": lang,
+            "items": items,
+            "merged": merged,
+            "version": version,
+            "bundle_url": _bundle_url(lang, version, merged),
+        },
+        headers=headers,
+    )
+
+
+@app.get("/content/{lang}.{version}.json")
+def get_content_bundle(lang: str, version: str, merged: bool = False) -> Response:
+    lang = _content_lang(lang)
+    items, current = content_bundle(lang, merged=merged)
+    if version != current:
+        # version เก่า (มีการแก้ไปแล้ว) -> ส่งไป URL ปัจจุบัน ห้าม cache ตัว redirect
+        return RedirectResponse(
+            _bundle_url(lang, current, merged), status_code=307, headers={"Cache-Control": "no-store"}
+        )
+    return JSONResponse(
+        {"ok": True, "lang": lang, "items": items, "merged": merged, "version": current},
+        headers={"ETag": f'"{current}"', "Cache-Control": "public, max-age=31536000, immutable"},
+    )
+
+
+# ---------------------------
+# ✅ Delta sync (Phase 5): คืนเฉพาะสิ่งที่เปลี่ยนหลัง watermark
+#    - อ่าน jobs/site_content ตาม (updated_at, key) + sync_tombstones สำหรับแถวที่ถูกลบ (migration 005)
+#    - token เป็น opaque (base64 ของ cursor ทั้ง 2 stream) — ส่ง next กลับมาเรื่อยๆ จน has_more=false
+#    - ผู้ใช้ควร apply แบบ upsert/delete ตาม key (idempotent) เพราะอาจได้แถวเดิมซ้ำได้
+# ---------------------------
+SYNC_PAGE_MAX = 1000
+
+
+def _encode_sync_token(cur: Dict[str, Any]) -> str:
+    raw = json.dumps({"v": 1, **cur}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _decode_sync_token(token: str) -> Dict[str, Any]:
+    """รับได้ทั้ง token ที่ออกให้ หรือ watermark ISO timestamp ตรงๆ (เช่น 2025-01-01T00:00:00Z)"""
+    token = (token or "").strip()
+    if not token:
+        return {}
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        cur = json.loads(raw)
+        if isinstance(cur, dict) and cur.get("v") == 1:
+            return cur
     except Exception:
-        items = {}  # DB ว่าง/ตารางยังไม่มี -> เว็บใช้ default
-    return {"ok": True, "lang": lang, "items": items}
+        pass
+    try:
+        ts = datetime.fromisoformat(token.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return {"r": [ts.isoformat()], "t": [ts.isoformat()]}
+
+
+def _sync_read(
+    table: str,
+    select: str,
+    ts_col: str,
+    key_cols: List[str],
+    cursor: Optional[List[Any]],
+    limit: int,
+    filters: Dict[str, str],
+) -> List[Dict[str, Any]]:
+    sb = supabase_client()
+    query = sb.table(table).select(select)
+    for k, v in filters.items():
+        query = query.eq(k, v)
+    if cursor:
+        query = query.or_(keyset_after(ts_col, key_cols, cursor))
+    query = query.order(ts_col)
+    for k in key_cols:
+        query = query.order(k)
+    return _get_res_data(query.limit(limit).execute()) or []
+
+
+def sync_changes(
+    table: str,
+    entity: str,
+    key_cols: List[str],
+    since: str,
+    limit: int,
+    filters: Optional[Dict[str, str]] = None,
+    select: str = "*",
+) -> Dict[str, Any]:
+    """merge 2 stream (แถวที่ยังอยู่ + tombstone) เรียงตามเวลา แล้วตัดที่ limit
+    คืน {"rows": [...], "deleted": [...], "next": token, "has_more": bool}"""
+    filters = filters or {}
+    cur = _decode_sync_token(since)
+    limit = max(1, min(SYNC_PAGE_MAX, limit))
+
+    rows = _sync_read(table, select, "updated_at", key_cols, cur.get("r"), limit, filters)
+    tomb_filters = {"entity": entity, **{k: v for k, v in filters.items() if k == "lang"}}
+    tomb_keys = ["entity_key", "lang"]
+    try:
+        tombs = _sync_read("sync_tombstones", "entity_key,lang,deleted_at", "deleted_at", tomb_keys,
+                           cur.get("t"), limit, tomb_filters)
+    except Exception as e:
+        # ยังไม่ได้รัน migration 005 -> ยัง sync ได้ แต่ไม่เห็นการลบ
+        logger.warning("sync_tombstones unavailable: %s", e)
+        tombs = []
+
+    events: List[Tuple[str, int, Dict[str, Any]]] = (
+        [(str(r.get("updated_at") or ""), 0, r) for r in rows]
+        + [(str(t.get("deleted_at") or ""), 1, t) for t in tombs]
+    )
+    events.sort(key=lambda e: (e[0], e[1]))
+    taken = events[:limit]
+
+    def event_key(kind: int, item: Dict[str, Any]) -> Tuple[Any, ...]:
+        if kind == 0:
+            return tuple(item.get(k) for k in key_cols)
+        return (item.get("entity_key"),) + ((item.get("lang"),) if len(key_cols) > 1 else ())
+
+    # key เดียวกันทั้งแถวและ tombstone ในหน้าเดียว (ลบแล้วสร้างใหม่ บน DB ที่ยังไม่รัน migration 007)
+    # -> ส่งเฉพาะเหตุการณ์ล่าสุดของ key นั้น (upserts/removed แยก list กัน client เรียงลำดับเองไม่ได้)
+    latest = {event_key(kind, item): i for i, (_, kind, item) in enumerate(taken)}
+
+    next_cur = {"r": cur.get("r"), "t": cur.get("t")}
+    out_rows: List[Dict[str, Any]] = []
+    out_deleted: List[Dict[str, Any]] = []
+    for i, (ts, kind, item) in enumerate(taken):
+        keep = latest[event_key(kind, item)] == i
+        if kind == 0:
+            if keep:
+                out_rows.append(item)
+            next_cur["r"] = [item.get("updated_at")] + [item.get(k) for k in key_cols]
+        else:
+            if keep:
+                out_deleted.append(item)
+            next_cur["t"] = [item.get("deleted_at")] + [item.get(k) for k in tomb_keys]
+    has_more = len(events) > len(taken) or len(rows) >= limit or len(tombs) >= limit
+    return {"rows": out_rows, "deleted": out_deleted, "next": _encode_sync_token(next_cur), "has_more": has_more}
+
+
+@app.get("/sync/jobs")
+def sync_jobs(since: str = "", limit: int = 500, lang: str = "") -> Dict[str, Any]:
+    """changes ของงานหลัง since
+    - upserts: งานที่ published (lang ว่าง = คอลัมน์ครบ 3 ภาษา, ระบุ lang = shape เดียวกับ /jobs)
+    - removed: งานที่ถูกปิด/กลับเป็น draft (reason=status) หรือถูกลบ (reason=deleted)"""
+    select, shape_lang = JOB_ROW_COLS, ""
+    try:
+        if lang:
+            if _projection_ready(supabase_client()):
+                select = _public_select(_job_lang(lang))
+            else:
+                select, shape_lang = "*", lang
+        ch = sync_changes("jobs", "job", ["job_id"], since, limit, select=select)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"sync jobs failed: {e}")
+
+    upserts: List[Dict[str, Any]] = []
+    removed: List[Dict[str, Any]] = []
+    for r in ch["rows"]:
+        if (r.get("status") or "") == "published":
+            upserts.append(_job_public_shape(r, shape_lang) if shape_lang else r)
+        else:
+            removed.append({"job_id": r.get("job_id"), "reason": r.get("status") or "", "at": r.get("updated_at")})
+    for t in ch["deleted"]:
+        removed.append({"job_id": t.get("entity_key"), "reason": "deleted", "at": t.get("deleted_at")})
+    return {"ok": True, "upserts": upserts, "removed": removed, "next": ch["next"], "has_more": ch["has_more"]}
+
+
+@app.get("/sync/content")
+def sync_content(since: str = "", limit: int = 500, lang: str = "") -> Dict[str, Any]:
+    """changes ของ CMS override หลัง since (lang ว่าง = ทุกภาษา)"""
+    filters = {"lang": _content_lang(lang)} if lang else {}
+    try:
+        ch = sync_changes("site_content", "content", ["key", "lang"], since, limit, filters)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"sync content failed: {e}")
+
+    upserts = [
+        {"key": r.get("key"), "lang": r.get("lang"), "value": r.get("value"), "updated_at": r.get("updated_at")}
+        for r in ch["rows"]
+    ]
+    removed = [
+        {"key": t.get("entity_key"), "lang": t.get("lang"), "at": t.get("deleted_at")} for t in ch["deleted"]
+    ]
+    return {"ok": True, "upserts": upserts, "removed": removed, "next": ch["next"], "has_more": ch["has_more"]}
+
+
+# ---------------------------
+# ✅ Static snapshot (Phase 5): pre-render jobs/content เป็น JSON ไฟล์ hash สำหรับ CDN (ดู app/snapshot.py)
+#    - build-time: scripts/export_static_snapshot.py
+#    - on-demand: แอดมินแก้งาน/เนื้อหา -> export ใหม่ (debounce) เขียนเฉพาะไฟล์ที่เปลี่ยน
+#    ปลายทาง: SNAPSHOT_DIR (โฟลเดอร์) และ/หรือ SNAPSHOT_BUCKET (Supabase Storage bucket แบบ public)
+# ---------------------------
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "").strip()
+SNAPSHOT_BUCKET = os.getenv("SNAPSHOT_BUCKET", "").strip()
+SNAPSHOT_DEBOUNCE_SEC = float(os.getenv("SNAPSHOT_DEBOUNCE_SEC", "3"))
+_SNAPSHOT_STATE: Dict[str, Any] = {"scheduled": False, "last": None}
+
+
+def _snapshot_sinks() -> List[Tuple[str, Any]]:
+    sinks: List[Tuple[str, Any]] = []
+    if SNAPSHOT_DIR:
+        sinks.append(("dir", LocalSink(SNAPSHOT_DIR)))
+    if SNAPSHOT_BUCKET:
+        sinks.append(("storage", StorageSink(supabase_client(), SNAPSHOT_BUCKET)))
+    return sinks
+
+
+async def export_snapshot(sinks: Optional[List[Tuple[str, Any]]] = None) -> Dict[str, Any]:
+    sinks = _snapshot_sinks() if sinks is None else sinks
+    if not sinks:
+        return {"ok": False, "detail": "SNAPSHOT_DIR / SNAPSHOT_BUCKET not configured"}
+    jobs_by_lang = {lang: await load_public_jobs(lang) for lang in JOB_LANGS}
+    content_by_lang = {lang: content_bundle(lang, merged=True) for lang in JOB_LANGS}
+    files = build_snapshot_files(jobs_by_lang, content_by_lang)
+    result: Dict[str, Any] = {"ok": True, "at": utc_now_iso()}
+    for name, sink in sinks:
+        # เขียนไฟล์/อัปโหลดเป็น I/O แบบ blocking -> ย้ายไป thread
+        result[name] = await asyncio.to_thread(sync_snapshot, files, sink)
+    _SNAPSHOT_STATE["last"] = result
+    return result
+
+
+async def _snapshot_after_debounce() -> None:
+    await asyncio.sleep(SNAPSHOT_DEBOUNCE_SEC)
+    _SNAPSHOT_STATE["scheduled"] = False
+    try:
+        await export_snapshot()
+    except Exception as e:
+        logger.warning("snapshot export failed: %s", e)
+
+
+def _schedule_snapshot(**_: Any) -> None:
+    """เรียกจาก admin hook (อยู่ใน threadpool) -> ส่งงานเข้า event loop หลัก, รวมการแก้ติดๆ กันเป็นรอบเดียว"""
+    loop = getattr(app.state, "loop", None)
+    if loop is None or not (SNAPSHOT_DIR or SNAPSHOT_BUCKET) or _SNAPSHOT_STATE["scheduled"]:
+        return
+    _SNAPSHOT_STATE["scheduled"] = True
+    loop.call_soon_threadsafe(lambda: asyncio.ensure_future(_snapshot_after_debounce()))
+
+
+admin_on_change("jobs", _schedule_snapshot)
+admin_on_change("content", _schedule_snapshot)
+
+
+@app.post("/admin/snapshot/export")
+async def admin_export_snapshot(admin: Dict[str, Any] = Depends(require_admin)) -> Dict[str, Any]:
+    return await export_snapshot()
+
+
+@app.get("/admin/snapshot/status")
+def admin_snapshot_status(admin: Dict[str, Any] = Depends(require_admin)) -> Dict[str, Any]:
+    return {
+        "ok": True,
+        "dir": SNAPSHOT_DIR or None,
+        "bucket": SNAPSHOT_BUCKET or None,
+        "scheduled": _SNAPSHOT_STATE["scheduled"],
+        "last": _SNAPSHOT_STATE["last"],
+    }
 
 
 # Apply endpoint -> Supabase + Google Sheet
@@ -687,16 +1987,15 @@ async def apply(
     transcript: Optional[UploadFile] = File(None),
     attachments: Optional[List[UploadFile]] = File(None),
 ) -> Dict[str, Any]:
-    require_env("SUPABASE_URL", SUPABASE_URL)
-    require_env("SUPABASE_SERVICE_ROLE_KEY", SUPABASE_SERVICE_ROLE_KEY)
+    if not use_local():
+        require_env("SUPABASE_URL", SUPABASE_URL)
+        require_env("SUPABASE_SERVICE_ROLE_KEY", SUPABASE_SERVICE_ROLE_KEY)
     require_env("SUPABASE_BUCKET", SUPABASE_BUCKET)
 
-    # Lookup job to prevent tampering (Phase 2: DB ก่อน, fallback feed)
-    job: Optional[Dict[str, Any]] = None
-    if jobs_db_has_rows():
-        job = fetch_job_db(job_id, "en")
+    # Lookup job to prevent tampering
+    job = fetch_job_db(job_id, "en")
     if not job:
-        job = await fetch_job_by_id(job_id=job_id, lang="en")
+        raise HTTPException(status_code=404, detail="Job not found")
     job_country = str(job.get("country", "")).strip()
     job_department = str(job.get("department", "")).strip()
     job_level = str(job.get("level", "")).strip()
@@ -738,6 +2037,8 @@ async def apply(
             raise HTTPException(status_code=400, detail="Attachments total must be <= 50MB")
         attach_payloads.append((name, a.content_type or "application/octet-stream", b))
 
+    metrics.APPLY_UPLOAD_BYTES.observe(len(resume_bytes) + len(transcript_bytes or b"") + total_attach)
+
     educations = parse_json_list(education_json, "education_json")[:5]
     experiences = parse_json_list(experience_json, "experience_json")[:20]
     skill_list = parse_skills(skills)
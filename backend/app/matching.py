@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+SHD Careers — Applicant match scoring (Phase 5)
+===============================================
+คะแนนความเข้ากันของผู้สมัครกับงาน สำหรับ GET /admin/applications?job_id=...&sort=match
+
+  งาน     = qual_* (คุณสมบัติ, น้ำหนักหลัก) + title_* ทั้ง 3 ภาษา
+  ผู้สมัคร = skills + role ของประสบการณ์ + program ของการศึกษา
+  TF-IDF (textvec) แยกต่องาน: corpus = ตัวงาน + ผู้สมัครของงานนั้น
+      -> skill ที่ผู้สมัครเกือบทุกคนใส่ (เช่น "excel") ได้น้ำหนักต่ำ ไม่ดันทุกคนขึ้นเท่ากัน
+  คะแนน  = cosine(งาน, ผู้สมัคร) ของทุกคนในรอบเดียว (textvec.scores)
+
+MatchIndex เก็บ tf ของผู้สมัครที่เคยคิดแล้ว -> ใบสมัครใหม่ tokenize เฉพาะใบใหม่ (Vectorizer.add)
+ข้อความงานเปลี่ยน -> แทน tf ของงานอย่างเดียว ผู้สมัครไม่ต้อง tokenize ซ้ำ
+ใบสมัครเข้า/ออกทีละน้อย -> คิดคะแนนเฉพาะใบใหม่ด้วย idf ปัจจุบัน, vector/คะแนนของใบเดิมใช้ต่อ
+  คิดใหม่ทั้งงานเมื่อข้อความงานเปลี่ยน หรือใบที่เข้า/ออกรวมกันเกิน RESCORE_DRIFT ของ corpus ตอนคิดรอบก่อน
+  (ระหว่างนั้นคะแนนใบเดิมอิง idf เก่า — df ขยับได้ไม่เกินสัดส่วนนี้ ลำดับแทบไม่เปลี่ยน)
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    from app import textvec  # type: ignore
+except Exception:
+    import textvec  # type: ignore
+
+LANGS = ("th", "en", "zh")
+JOB_FIELDS = (("qual", 2.0), ("title", 1.0))
+JOB_COLS = ",".join(["job_id"] + [f"{f}_{lang}" for f, _ in JOB_FIELDS for lang in LANGS])
+# embedded select ของตารางลูก (ต่อใบสมัคร) ที่ใช้สร้าง vector
+APPLICANT_SELECT = "id,application_skills(skill),application_experiences(role),application_educations(program)"
+_APPLICANT_FIELDS = (
+    ("application_skills", "skill", 1.0),
+    ("application_experiences", "role", 1.0),
+    ("application_educations", "program", 0.5),
+)
+RESCORE_DRIFT = 0.1
+
+
+def job_doc(job: Dict[str, Any]) -> textvec.Doc:
+    # ภาษาที่ยังไม่แปล มักคัดลอกข้อความเดียวกันมา -> นับครั้งเดียว
+    doc = {(job.get(f"{f}_{lang}") or "", w): None for f, w in JOB_FIELDS for lang in LANGS}
+    return [(text, w) for text, w in doc if text]
+
+
+def applicant_doc(row: Dict[str, Any]) -> textvec.Doc:
+    return [
+        (x.get(col) or "", w)
+        for table, col, w in _APPLICANT_FIELDS
+        for x in (row.get(table) or [])
+        if x.get(col)
+    ]
+
+
+class MatchIndex:
+    """คะแนนของผู้สมัครทุกคนในงานเดียว (ต่อ worker)"""
+
+    def __init__(self, job_id: str) -> None:
+        self.job_id = job_id
+        self._lock = threading.Lock()
+        self._vz = textvec.Vectorizer()
+        self._job_tf: Optional[Dict[str, float]] = None
+        self._apps: Dict[str, Dict[str, float]] = {}  # application id -> tf
+        self._query: textvec.Vec = {}  # vector ของงาน ณ รอบที่คิดทั้งงานล่าสุด
+        self._scores: Optional[Dict[str, float]] = None  # None = ต้องคิดใหม่ทั้งงาน
+        self._pending: List[str] = []  # ใบที่เพิ่มหลังคิดทั้งงาน ยังไม่มีคะแนน
+        self._scored_docs = 0  # ขนาด corpus ตอนคิดทั้งงานล่าสุด
+        self._drift = 0  # ใบที่เข้า/ออกหลังจากนั้น
+        self.stats = {"added": 0, "removed": 0, "job_changes": 0, "rescores": 0, "incremental": 0}
+
+    def __len__(self) -> int:
+        return len(self._apps)
+
+    def set_job(self, job: Dict[str, Any]) -> None:
+        tf = textvec.term_freq(job_doc(job))
+        with self._lock:
+            if tf == self._job_tf:
+                return
+            if self._job_tf is not None:
+                self._vz.remove(self._job_tf)
+                self.stats["job_changes"] += 1
+            self._vz.add(tf)
+            self._job_tf = tf
+            self._scores = None
+
+    def missing(self, ids: Iterable[str]) -> List[str]:
+        apps = self._apps
+        return [i for i in ids if i not in apps]
+
+    def add(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """rows = ใบสมัครพร้อมตารางลูก (APPLICANT_SELECT) -> จำนวนที่เพิ่มใหม่"""
+        fresh = {str(r["id"]): textvec.term_freq(applicant_doc(r)) for r in rows}
+        with self._lock:
+            added = 0
+            for aid, tf in fresh.items():
+                if aid in self._apps:
+                    continue
+                self._apps[aid] = tf
+                self._vz.add(tf)
+                self._pending.append(aid)
+                added += 1
+            self._drift += added
+            self.stats["added"] += added
+            return added
+
+    def retain(self, ids: Iterable[str]) -> int:
+        """เหลือเฉพาะใบสมัครชุดนี้ (ใบที่ถูกลบ/ย้ายงานออกจาก df) -> จำนวนที่เอาออก"""
+        keep = set(ids)
+        with self._lock:
+            gone = [aid for aid in self._apps if aid not in keep]
+            for aid in gone:
+                self._vz.remove(self._apps.pop(aid))
+                if self._scores is not None:
+                    self._scores.pop(aid, None)
+            if gone:
+                self._pending = [aid for aid in self._pending if aid in self._apps]
+                self._drift += len(gone)
+                self.stats["removed"] += len(gone)
+            return len(gone)
+
+    def scores(self) -> Dict[str, float]:
+        """application id -> cosine (0-1, ทศนิยม 4 ตำแหน่ง)"""
+        with self._lock:
+            vz = self._vz
+            if self._scores is None or self._drift > RESCORE_DRIFT * self._scored_docs:
+                self._query = vz.transform(self._job_tf or {})
+                vecs = {aid: vz.transform(tf) for aid, tf in self._apps.items()}
+                self._scores = {aid: round(s, 4) for aid, s in textvec.scores(self._query, vecs).items()}
+                self._pending, self._drift, self._scored_docs = [], 0, vz.n_docs
+                self.stats["rescores"] += 1
+            elif self._pending:
+                query = self._query
+                for aid in self._pending:
+                    self._scores[aid] = round(textvec.dot(query, vz.transform(self._apps[aid])), 4)
+                self.stats["incremental"] += len(self._pending)
+                self._pending = []
+            return dict(self._scores)  # สำเนา — ใบที่เข้า/ออกทีหลังไม่แก้ dict ที่ผู้เรียกถืออยู่
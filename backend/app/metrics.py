@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+SHD Careers — Prometheus metrics (Phase 5)
+==========================================
+เขียนเองด้วย stdlib (ไม่ต้องลง prometheus_client) — GET /metrics คืน text exposition format 0.0.4
+
+  http_requests_total{method,route,status}          จำนวน request ต่อ route template
+  http_request_duration_seconds{method,route}       histogram เวลาตอบ (ถึงส่ง body ครบ)
+  http_requests_in_flight                           request ที่กำลังทำอยู่
+  upstream_call_duration_seconds{target}            histogram ต่อหมวด upstream (db/storage/sign/feed/sheets/replica)
+  upstream_errors_total{target}                     call ที่ throw exception
+  cache_requests_total{cache,result}                hit / miss / stale ของ cache ต่างๆ
+  cache_hit_ratio{cache}                            hit / ทั้งหมด (คำนวณตอน scrape)
+  apply_upload_bytes                                histogram ขนาดไฟล์รวมต่อใบสมัคร
+  + gauge จาก collector ที่โมดูลอื่นลงทะเบียน (signed URL cache, login lockout, replica, feed sync)
+
+route เป็น path template ของ FastAPI (เช่น /admin/applications/{application_id}) -> label ไม่บวม
+request ที่ไม่ match route ใดๆ นับเป็น route="unmatched"
+"""
+from __future__ import annotations
+
+import hmac
+import time
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (64 << 10, 256 << 10, 1 << 20, 2 << 20, 5 << 20, 10 << 20, 25 << 20, 50 << 20)
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _esc(v: Any) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_esc(v)}"' for k, v in labels.items()) + "}"
+
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help = help_
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def _key(self, labels: Tuple[Any, ...]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name}: expected labels {self.labelnames}")
+        return tuple(str(x) for x in labels)
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_: str, labelnames: Iterable[str] = ()) -> None:
+        super().__init__(name, help_, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: Any, amount: float = 1.0) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, *labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, dict(zip(self.labelnames, k)), v) for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, *labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def dec(self, *labels: Any, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, help_, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], List[float]] = {}  # [count ต่อ bucket..., +Inf, sum]
+
+    def observe(self, value: float, *labels: Any) -> None:
+        key = self._key(labels)
+        n = len(self.buckets)
+        i = 0
+        while i < n and value > self.buckets[i]:
+            i += 1
+        with self._lock:
+            ent = self._values.get(key)
+            if ent is None:
+                ent = self._values[key] = [0.0] * (n + 2)
+            ent[i] += 1  # เก็บแบบไม่สะสม แล้วค่อยสะสมตอน render
+            ent[n + 1] += value
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        out: List[Sample] = []
+        n = len(self.buckets)
+        for key, ent in items:
+            base = dict(zip(self.labelnames, key))
+            acc = 0.0
+            for i, le in enumerate(self.buckets + (float("inf"),)):
+                acc += ent[i]
+                out.append((f"{self.name}_bucket", {**base, "le": _fmt_value(le)}, acc))
+            out.append((f"{self.name}_sum", base, ent[n + 1]))
+            out.append((f"{self.name}_count", base, acc))
+        return out
+
+
+_REGISTRY: List[_Metric] = []
+# collector = ฟังก์ชันคืน [(name, kind, help, [(labels, value), ...]), ...] — เรียกตอน scrape
+_COLLECTORS: List[Callable[[], List[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]] = []
+
+
+def register_collector(fn: Callable[[], List[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]) -> None:
+    _COLLECTORS.append(fn)
+
+
+# ---------------------------
+# Metrics ของแอป
+# ---------------------------
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status"))
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency in seconds.", ("method", "route"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served.")
+UPSTREAM_LATENCY = Histogram("upstream_call_duration_seconds", "Upstream call latency in seconds.", ("target",))
+UPSTREAM_ERRORS = Counter("upstream_errors_total", "Upstream calls that raised.", ("target",))
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by result (hit, miss, stale).", ("cache", "result"))
+APPLY_UPLOAD_BYTES = Histogram("apply_upload_bytes", "Total uploaded bytes per application.", buckets=BYTES_BUCKETS)
+
+HTTP_IN_FLIGHT.set(0)
+
+
+def cache_event(cache: str, result: str, n: int = 1) -> None:
+    if n:
+        CACHE_REQUESTS.inc(cache, result, amount=n)
+
+
+def observe_upstream(target: str, seconds: float, failed: bool) -> None:
+    UPSTREAM_LATENCY.observe(seconds, target)
+    if failed:
+        UPSTREAM_ERRORS.inc(target)
+
+
+def _cache_ratios() -> List[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]:
+    totals: Dict[str, Dict[str, float]] = {}
+    for _, labels, v in CACHE_REQUESTS.samples():
+        totals.setdefault(labels["cache"], {})[labels["result"]] = v
+    rows = []
+    for cache, by in sorted(totals.items()):
+        looked = sum(by.values())
+        rows.append(({"cache": cache}, (by.get("hit", 0.0) / looked) if looked else 0.0))
+    return [("cache_hit_ratio", "gauge", "Cache hit ratio since start.", rows)]
+
+
+register_collector(_cache_ratios)
+
+
+def render() -> str:
+    lines: List[str] = []
+    for m in _REGISTRY:
+        lines.append(f"# HELP {m.name} {m.help}")
+        lines.append(f"# TYPE {m.name} {m.kind}")
+        for name, labels, v in m.samples():
+            lines.append(f"{name}{_fmt_labels(labels)} {_fmt_value(v)}")
+    for fn in _COLLECTORS:
+        try:
+            families = fn()
+        except Exception:
+            continue  # collector พังไม่ควรทำให้ทั้ง /metrics พัง
+        for name, kind, help_, rows in families:
+            lines.append(f"# HELP {name} {help_}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, v in rows:
+                lines.append(f"{name}{_fmt_labels(labels)} {_fmt_value(v)}")
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------
+# ASGI middleware
+# ---------------------------
+_ROUTE_BY_ENDPOINT: Dict[Any, str] = {}
+
+
+def _route_label(scope: Dict[str, Any]) -> str:
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    label = _ROUTE_BY_ENDPOINT.get(endpoint)
+    if label is None:
+        label = "unmatched"
+        app = scope.get("app")
+        for r in getattr(app, "routes", []) or []:
+            if getattr(r, "endpoint", None) is endpoint:
+                label = getattr(r, "path", "unmatched")
+                break
+        _ROUTE_BY_ENDPOINT[endpoint] = label
+    return label
+
+
+class MetricsMiddleware:
+    def __init__(self, app: Any, skip_paths: Iterable[str] = ("/metrics",)) -> None:
+        self.app = app
+        self.skip = set(skip_paths)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or scope.get("path") in self.skip:
+            await self.app(scope, receive, send)
+            return
+        status = [500]
+
+        async def send_status(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            dt = time.perf_counter() - t0
+            HTTP_IN_FLIGHT.dec()
+            method = scope.get("method", "")
+            route = _route_label(scope)
+            HTTP_REQUESTS.inc(method, route, status[0])
+            HTTP_LATENCY.observe(dt, method, route)
+
+
+def check_token(expected: str, authorization: Optional[str]) -> bool:
+    if not expected:
+        return True
+    return hmac.compare_digest((authorization or "").strip().encode("utf-8"), f"Bearer {expected}".encode("utf-8"))
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+SHD Careers — Sampling profiler (Phase 5)
+=========================================
+สุ่มดู stack ของทุก thread ใน worker ที่รันอยู่ (sys._current_frames) ทุก N ms — ไม่ต้อง restart/redeploy
+ผลลัพธ์เป็น collapsed stack (1 บรรทัด = "thread;frame;frame;... count") เปิดได้ทันทีด้วย
+flamegraph.pl / speedscope / inferno
+
+  GET /admin/debug/profile?seconds=10&interval_ms=5         สุ่มทั้ง worker N วินาที
+  header X-Profile: 1 (+ Authorization ของแอดมิน)           profile เฉพาะช่วงเวลาของ request นั้น
+      -> response มี X-Profile-Id แล้วดึงผลที่ GET /admin/debug/profile/requests/{id}
+
+หมายเหตุ:
+  - ครั้งละ 1 profile ต่อ worker (อีกอันจะได้ 409 / request ไม่ถูก profile)
+  - โหมดต่อ request สุ่มทุก thread ในช่วงเวลานั้น -> request อื่นที่รันพร้อมกันจะติดมาด้วย
+  - thread ที่รออยู่เฉยๆ (select / queue.get / lock wait) ถูกตัดทิ้ง เว้นแต่ include_idle
+"""
+from __future__ import annotations
+
+import os
+import re
+import sys
+import time
+import asyncio
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+PROFILE_INTERVAL_MS = max(1.0, float(os.getenv("PROFILE_INTERVAL_MS", "10")))
+PROFILE_MAX_SEC = max(1, int(os.getenv("PROFILE_MAX_SEC", "60")))
+PROFILE_KEEP = max(1, int(os.getenv("PROFILE_KEEP", "20")))  # ผล profile ต่อ request ที่เก็บไว้ล่าสุด
+PROFILE_MAX_DEPTH = 128
+
+# leaf frame ที่แปลว่า thread ว่าง (รองาน) — ไม่ใช่ CPU ที่เราสนใจ
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("profiler.py", "_run"),
+}
+
+_BUSY = threading.Lock()
+_LABELS: Dict[Any, str] = {}  # code object -> "pkg/file.py:func"
+_RESULTS: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_RESULTS_LOCK = threading.Lock()
+
+
+def _label(code: Any) -> str:
+    lab = _LABELS.get(code)
+    if lab is None:
+        parts = code.co_filename.replace("\\", "/").rsplit("/", 2)
+        lab = _LABELS[code] = f"{'/'.join(parts[-2:])}:{code.co_name}"
+    return lab
+
+
+def _thread_group(name: str) -> str:
+    # ThreadPoolExecutor-0_3 / AnyIO worker thread -> รวมเป็นกลุ่มเดียว ไม่แตกตาม thread
+    return re.sub(r"[-_]?\d+(_\d+)?$", "", name or "thread") or "thread"
+
+
+class Sampler:
+    """thread เบื้องหลังที่อ่าน stack ทุก interval แล้วนับ collapsed stack"""
+
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS, include_idle: bool = False) -> None:
+        self.interval = max(1.0, float(interval_ms)) / 1000.0
+        self.include_idle = include_idle
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self.started = 0.0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="shd-profiler", daemon=True)
+
+    def start(self) -> "Sampler":
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self) -> "Sampler":
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+        return self
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        names: Dict[int, str] = {}
+        names_t = 0.0
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            if now - names_t > 1.0:
+                names = {t.ident: _thread_group(t.name) for t in threading.enumerate() if t.ident}
+                names_t = now
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                code = frame.f_code
+                if not self.include_idle and (code.co_filename.rsplit("/", 1)[-1], code.co_name) in _IDLE_LEAVES:
+                    continue
+                stack: List[str] = []
+                f: Any = frame
+                while f is not None and len(stack) < PROFILE_MAX_DEPTH:
+                    stack.append(_label(f.f_code))
+                    f = f.f_back
+                stack.append(names.get(tid, "thread"))
+                stack.reverse()
+                self.counts[";".join(stack)] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{s} {n}\n" for s, n in self.counts.most_common())
+
+    def summary(self, top: int = 30) -> Dict[str, Any]:
+        self_time: Counter = Counter()
+        for s, n in self.counts.items():
+            self_time[s.rsplit(";", 1)[-1]] += n
+        total = sum(self.counts.values()) or 1
+        return {
+            "samples": self.samples,
+            "interval_ms": round(self.interval * 1000, 2),
+            "elapsed_sec": round(self.elapsed, 3),
+            "stacks": len(self.counts),
+            "top_self": [
+                {"frame": fr, "samples": n, "pct": round(100.0 * n / total, 1)} for fr, n in self_time.most_common(top)
+            ],
+        }
+
+
+def busy() -> bool:
+    return _BUSY.locked()
+
+
+async def profile_for(seconds: float, interval_ms: float = PROFILE_INTERVAL_MS, include_idle: bool = False) -> Optional[Sampler]:
+    """สุ่มเป็นเวลา seconds (event loop ว่างระหว่างรอ) — คืน None ถ้ามี profile อื่นรันอยู่"""
+    if not _BUSY.acquire(blocking=False):
+        return None
+    sampler = Sampler(interval_ms, include_idle).start()
+    try:
+        await asyncio.sleep(max(0.1, min(float(seconds), PROFILE_MAX_SEC)))
+    finally:
+        sampler.stop()
+        _BUSY.release()
+    return sampler
+
+
+def _keep(rid: str, sampler: Sampler, meta: Dict[str, Any]) -> None:
+    with _RESULTS_LOCK:
+        _RESULTS[rid] = {"meta": {**meta, **sampler.summary(top=10)}, "collapsed": sampler.collapsed()}
+        _RESULTS.move_to_end(rid)
+        while len(_RESULTS) > PROFILE_KEEP:
+            _RESULTS.popitem(last=False)
+
+
+def recent() -> List[Dict[str, Any]]:
+    with _RESULTS_LOCK:
+        return [{"id": rid, **r["meta"]} for rid, r in reversed(_RESULTS.items())]
+
+
+def get_result(rid: str) -> Optional[Dict[str, Any]]:
+    with _RESULTS_LOCK:
+        return _RESULTS.get(rid)
+
+
+# ---------------------------
+# ASGI middleware — profile ต่อ request (X-Profile: 1)
+# ---------------------------
+class ProfileMiddleware:
+    """authorize(headers) -> bool ตัดสินว่าใครสั่ง profile ได้ (main.py ส่ง token แอดมินเข้ามาตรวจ)
+    request_id() ให้ id เดียวกับ X-Request-ID ของ timing.py"""
+
+    def __init__(self, app: Any, authorize: Callable[[Dict[str, str]], bool], request_id: Callable[[], str]) -> None:
+        self.app = app
+        self.authorize = authorize
+        self.request_id = request_id
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers: Dict[str, str] = {}
+        for k, v in scope.get("headers") or []:
+            if k in (b"x-profile", b"authorization"):
+                headers[k.decode("latin-1")] = v.decode("latin-1")
+        flag = headers.get("x-profile", "").strip().lower()
+        if flag not in ("1", "true", "yes") or not self.authorize(headers):
+            await self.app(scope, receive, send)
+            return
+        if not _BUSY.acquire(blocking=False):
+            await self.app(scope, receive, _with_header(send, b"x-profile", b"busy"))
+            return
+
+        rid = self.request_id() or f"p{int(time.time() * 1000)}"
+        sampler = Sampler().start()
+        status = [500]
+
+        async def send_status(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _with_header(send_status, b"x-profile-id", rid.encode("latin-1")))
+        finally:
+            sampler.stop()
+            _BUSY.release()
+            _keep(rid, sampler, {
+                "method": scope.get("method"),
+                "path": scope.get("path"),
+                "status": status[0],
+                "at": time.time(),
+            })
+
+
+def _with_header(send: Any, name: bytes, value: bytes) -> Any:
+    async def wrapped(message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            message = {**message, "headers": list(message.get("headers") or []) + [(name, value)]}
+        await send(message)
+
+    return wrapped
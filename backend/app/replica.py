@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""
+SHD Careers — Local read replica (Phase 5)
+==========================================
+สำเนา jobs / site_content / applications (เฉพาะคอลัมน์หน้า list) ไว้ใน SQLite ข้าง process
+-> หน้าอ่านอย่างเดียว (public jobs/content, แอดมิน list ใบสมัคร/job options) ไม่ต้องข้ามเน็ตไป Supabase
+
+  - ใช้ LocalClient (store.py) -> query ด้วย builder เดียวกับ Supabase ได้ทันที
+  - refresh แบบ incremental ตาม watermark: jobs/site_content.updated_at,
+    applications.created_at (ใบใหม่) + reviewed_at (เปลี่ยนสถานะ), sync_tombstones.deleted_at (ถูกลบ)
+    อ่านย้อนหลัง REPLICA_OVERLAP_SEC ทุกรอบ กันแถวที่ commit ช้ากว่า timestamp ของตัวเอง
+  - แอดมินเขียน -> pull() ดึงแถวนั้นมาทับทันที (write-through); ไม่รู้ว่าแถวไหน -> mark_stale()
+  - reader() คืน replica เฉพาะเมื่อ refresh สำเร็จล่าสุดไม่เกิน READ_REPLICA_MAX_STALENESS_SEC
+    ไม่งั้นคืน None -> ผู้เรียกใช้ Supabase ตามปกติ
+  - ค้นหาใบสมัครด้วย FTS5 trigram (substring ไม่สนตัวพิมพ์ = ผลเดียวกับ ilike *x*)
+
+โมดูลนี้ไม่รู้จัก FastAPI — main.py เป็นคน configure(primary) และรัน loop
+"""
+from __future__ import annotations
+
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from app.store import LocalClient, keyset_after, use_local  # type: ignore
+    from app.timing import instrument  # type: ignore
+    from app import metrics  # type: ignore
+except Exception:
+    from store import LocalClient, keyset_after, use_local  # type: ignore
+    from timing import instrument  # type: ignore
+    import metrics  # type: ignore
+
+logger = logging.getLogger("shd-careers.replica")
+
+READ_REPLICA_ENABLED = os.getenv("READ_REPLICA_ENABLED", "false").strip().lower() in ("1", "true", "yes")
+READ_REPLICA_PATH = os.getenv("READ_REPLICA_PATH", "./data/replica.db").strip()
+READ_REPLICA_REFRESH_SEC = max(1, int(os.getenv("READ_REPLICA_REFRESH_SEC", "15")))
+READ_REPLICA_MAX_STALENESS_SEC = max(1, int(os.getenv("READ_REPLICA_MAX_STALENESS_SEC", "60")))
+REPLICA_OVERLAP_SEC = 5
+PAGE = 1000
+# write-through: key ต่อ query (in_) / เกินกี่ key ต่อครั้งให้ refresh เบื้องหลังตามทันแทน (ไม่ถ่วง request)
+PULL_CHUNK = 200
+READ_REPLICA_PULL_MAX = max(1, int(os.getenv("READ_REPLICA_PULL_MAX", "1000")))
+
+# คอลัมน์ใบสมัครที่หน้า list ใช้ (ไม่เก็บที่อยู่/ไฟล์/โน้ต)
+APP_LIST_COLS = (
+    "id,job_id,first_name,last_name,email,phone,country,department,level,"
+    "status,source_channel,created_at,reviewed_at"
+)
+
+# ตาราง -> คอลัมน์ที่ copy, key, คอลัมน์ watermark (แต่ละคอลัมน์เป็น stream แยก)
+TABLES: Dict[str, Dict[str, Any]] = {
+    "jobs": {"cols": "*", "key": ["job_id"], "ts": ["updated_at"]},
+    "site_content": {"cols": "*", "key": ["key", "lang"], "ts": ["updated_at"]},
+    "applications": {"cols": APP_LIST_COLS, "key": ["id"], "ts": ["created_at", "reviewed_at"]},
+}
+_TOMBSTONE_TABLE = {"job": ("jobs", ["job_id"]), "content": ("site_content", ["key", "lang"])}
+
+REPLICA_SQL = """
+-- replica เก็บ updated_at ตามต้นฉบับ -> ไม่ต้องให้ trigger ประทับเวลาใหม่
+drop trigger if exists trg_jobs_touch_updated_at;
+drop trigger if exists trg_site_content_touch_updated_at;
+-- trg_jobs_projection_* คงไว้: pub_* ของ replica คำนวณเองได้ แม้ต้นฉบับยังไม่ได้รัน migration 006
+
+create table if not exists replica_state (
+  name  text primary key,
+  value text not null
+);
+
+create index if not exists idx_applications_job_created on applications (job_id, created_at);
+create index if not exists idx_applications_status_created on applications (status, created_at);
+
+create virtual table if not exists applications_fts using fts5(
+  first_name, last_name, email, phone,
+  content='applications', content_rowid='rowid', tokenize='trigram'
+);
+create trigger if not exists applications_fts_ai after insert on applications begin
+  insert into applications_fts (rowid, first_name, last_name, email, phone)
+  values (new.rowid, new.first_name, new.last_name, new.email, new.phone);
+end;
+create trigger if not exists applications_fts_ad after delete on applications begin
+  insert into applications_fts (applications_fts, rowid, first_name, last_name, email, phone)
+  values ('delete', old.rowid, old.first_name, old.last_name, old.email, old.phone);
+end;
+create trigger if not exists applications_fts_au after update on applications begin
+  insert into applications_fts (applications_fts, rowid, first_name, last_name, email, phone)
+  values ('delete', old.rowid, old.first_name, old.last_name, old.email, old.phone);
+  insert into applications_fts (rowid, first_name, last_name, email, phone)
+  values (new.rowid, new.first_name, new.last_name, new.email, new.phone);
+end;
+"""
+
+_STATE: Dict[str, Any] = {
+    "runs": 0,
+    "last_ok": 0.0,          # เวลาเริ่มของรอบที่สำเร็จล่าสุด (ข้อมูลใหม่กว่านี้อาจยังไม่มี)
+    "last_run_at": None,
+    "last_error": None,
+    "last_stats": None,
+    "wake": False,
+}
+_PRIMARY: Dict[str, Callable[[], Any]] = {}
+_CLIENT: Dict[str, LocalClient] = {}
+_REFRESH_LOCK = threading.Lock()
+_INIT_LOCK = threading.Lock()
+
+
+def enabled() -> bool:
+    return READ_REPLICA_ENABLED and not use_local() and "primary" in _PRIMARY
+
+
+def configure(primary: Callable[[], Any]) -> None:
+    """primary = factory ของ client ตัวจริง (main.supabase_client)"""
+    _PRIMARY["primary"] = primary
+
+
+def client() -> LocalClient:
+    c = _CLIENT.get("c")
+    if c is None:
+        with _INIT_LOCK:
+            c = _CLIENT.get("c")
+            if c is None:
+                c = _CLIENT["c"] = LocalClient(READ_REPLICA_PATH, extra_sql=REPLICA_SQL)
+    return c
+
+
+def staleness() -> Optional[float]:
+    last = _STATE["last_ok"]
+    return (time.time() - last) if last else None
+
+
+def reader() -> Any:
+    """replica ถ้ายังสดพอ ไม่งั้น None (ผู้เรียก fallback ไป Supabase)"""
+    if not enabled():
+        return None
+    if not _fresh():
+        metrics.cache_event("read_replica", "stale")  # fallback ไป Supabase
+        return None
+    metrics.cache_event("read_replica", "hit")
+    return instrument(client(), "replica")
+
+
+def _fresh() -> bool:
+    age = staleness()
+    return age is not None and age <= READ_REPLICA_MAX_STALENESS_SEC
+
+
+def mark_stale() -> None:
+    """มีการเขียนที่ไม่รู้ว่าแถวไหน -> เลิกอ่าน replica จนกว่า refresh รอบถัดไปจะเสร็จ"""
+    _STATE["last_ok"] = 0.0
+    _STATE["wake"] = True
+
+
+def due() -> bool:
+    if _STATE["wake"]:
+        return True
+    last = _STATE["last_ok"]
+    return not last or time.time() - last >= READ_REPLICA_REFRESH_SEC
+
+
+# ---------------------------
+# Watermarks
+# ---------------------------
+def _get_cursor(rep: LocalClient, name: str) -> Optional[List[Any]]:
+    rows = rep.table("replica_state").select("value").eq("name", name).execute().data
+    return json.loads(rows[0]["value"]) if rows else None
+
+
+def _set_cursor(rep: LocalClient, name: str, cursor: List[Any]) -> None:
+    rep.table("replica_state").upsert({"name": name, "value": json.dumps(cursor)}, on_conflict="name").execute()
+
+
+_EPOCH = ["1970-01-01T00:00:00+00:00"]  # รอบแรก: ts > epoch = ทุกแถวที่ ts ไม่เป็น null
+
+
+def _rewind(cursor: Optional[List[Any]]) -> List[Any]:
+    """ถอย watermark REPLICA_OVERLAP_SEC (เทียบเฉพาะ ts — แถวที่อ่านซ้ำ upsert ทับได้)"""
+    if not cursor:
+        return _EPOCH
+    try:
+        ts = datetime.fromisoformat(str(cursor[0])) - timedelta(seconds=REPLICA_OVERLAP_SEC)
+        return [ts.isoformat()]
+    except ValueError:
+        return cursor
+
+
+# ---------------------------
+# Refresh
+# ---------------------------
+def _pull_stream(sb: Any, rep: LocalClient, table: str, ts_col: str) -> int:
+    spec = TABLES[table]
+    keys: List[str] = spec["key"]
+    name = f"{table}.{ts_col}"
+    cursor = _rewind(_get_cursor(rep, name))
+    n = 0
+    while True:
+        query = sb.table(table).select(spec["cols"]).or_(keyset_after(ts_col, keys, cursor)).order(ts_col)
+        for k in keys:
+            query = query.order(k)
+        rows = query.limit(PAGE).execute().data or []
+        if rows:
+            rep.table(table).upsert(rows, on_conflict=",".join(keys)).execute()
+            n += len(rows)
+            last = rows[-1]
+            cursor = [last[ts_col]] + [last[k] for k in keys]
+            _set_cursor(rep, name, cursor)
+        if len(rows) < PAGE:
+            return n
+
+
+def _pull_tombstones(sb: Any, rep: LocalClient) -> int:
+    keys = ["entity", "entity_key", "lang"]
+    cursor = _rewind(_get_cursor(rep, "sync_tombstones.deleted_at"))
+    n = 0
+    while True:
+        query = sb.table("sync_tombstones").select("entity,entity_key,lang,deleted_at")
+        query = query.or_(keyset_after("deleted_at", keys, cursor))
+        query = query.order("deleted_at").order("entity").order("entity_key").order("lang")
+        rows = query.limit(PAGE).execute().data or []
+        for r in rows:
+            target = _TOMBSTONE_TABLE.get(r.get("entity"))
+            if not target:
+                continue
+            table, cols = target
+            q = rep.table(table).delete()
+            q = q.eq(cols[0], r["entity_key"])
+            if len(cols) > 1:
+                q = q.eq(cols[1], r.get("lang") or "")
+            n += len(q.execute().data or [])
+        if rows:
+            last = rows[-1]
+            cursor = [last["deleted_at"]] + [last[k] for k in keys]
+            _set_cursor(rep, "sync_tombstones.deleted_at", cursor)
+        if len(rows) < PAGE:
+            return n
+
+
+def refresh() -> Dict[str, Any]:
+    """ดึงเฉพาะส่วนที่เปลี่ยนจาก Supabase (รอบแรก = โหลดทั้งหมด) — รันได้ทีละรอบ"""
+    if not enabled():
+        return {"ok": False, "detail": "read replica disabled"}
+    with _REFRESH_LOCK:
+        t0 = time.time()
+        _STATE["runs"] += 1
+        _STATE["wake"] = False
+        _STATE["last_run_at"] = datetime.now(timezone.utc).isoformat()
+        stats: Dict[str, int] = {}
+        try:
+            sb = _PRIMARY["primary"]()
+            rep = client()
+            for table, spec in TABLES.items():
+                for ts_col in spec["ts"]:
+                    stats[f"{table}.{ts_col}"] = _pull_stream(sb, rep, table, ts_col)
+            try:
+                stats["deleted"] = _pull_tombstones(sb, rep)
+            except Exception as e:
+                # ยังไม่รัน migration 005 -> ไม่รู้เรื่องแถวที่ถูกลบ: เลิกใช้ replica ดีกว่าคืนงานที่ไม่มีแล้ว
+                raise RuntimeError(f"sync_tombstones unavailable (run migration 005): {e}")
+        except Exception as e:
+            _STATE["last_error"] = {"at": _STATE["last_run_at"], "detail": str(e)[:500]}
+            logger.warning("read replica refresh failed: %s", e)
+            return {"ok": False, "detail": str(e)}
+        if not _STATE["wake"]:
+            _STATE["last_ok"] = t0
+        stats["elapsed_ms"] = int((time.time() - t0) * 1000)
+        _STATE["last_stats"] = stats
+        return {"ok": True, **stats}
+
+
+def pull(table: str, keys: List[Dict[str, Any]]) -> None:
+    """write-through: อ่านแถวที่เพิ่งเขียนจาก Supabase มาทับใน replica (ไม่พบ = ถูกลบ)
+    key เดียว -> ทีละ PULL_CHUNK key ต่อ query; เกิน READ_REPLICA_PULL_MAX -> mark_stale() ให้ refresh ตามทัน"""
+    if not enabled() or not keys:
+        return
+    if len(keys) > READ_REPLICA_PULL_MAX:
+        mark_stale()
+        return
+    spec = TABLES[table]
+    key_cols = spec["key"]
+    try:
+        sb = _PRIMARY["primary"]()
+        rep = client()
+        if len(key_cols) == 1:
+            col = key_cols[0]
+            ids = list(dict.fromkeys(str(kv[col]) for kv in keys))
+            for i in range(0, len(ids), PULL_CHUNK):
+                chunk = ids[i:i + PULL_CHUNK]
+                rows = sb.table(table).select(spec["cols"]).in_(col, chunk).execute().data or []
+                if rows:
+                    rep.table(table).upsert(rows, on_conflict=col).execute()
+                found = {str(r[col]) for r in rows}
+                gone = [k for k in chunk if k not in found]
+                if gone:
+                    rep.table(table).delete().in_(col, gone).execute()
+            return
+        for kv in keys:
+            q = sb.table(table).select(spec["cols"])
+            for k in key_cols:
+                q = q.eq(k, kv[k])
+            rows = q.limit(1).execute().data or []
+            if rows:
+                rep.table(table).upsert(rows, on_conflict=",".join(key_cols)).execute()
+            else:
+                d = rep.table(table).delete()
+                for k in key_cols:
+                    d = d.eq(k, kv[k])
+                d.execute()
+    except Exception as e:
+        logger.warning("read replica write-through %s failed: %s", table, e)
+        mark_stale()
+
+
+def status() -> Dict[str, Any]:
+    age = staleness()
+    return {
+        "enabled": enabled(),
+        "path": READ_REPLICA_PATH,
+        "refresh_sec": READ_REPLICA_REFRESH_SEC,
+        "max_staleness_sec": READ_REPLICA_MAX_STALENESS_SEC,
+        "staleness_sec": (round(age, 1) if age is not None else None),
+        "serving": enabled() and _fresh(),
+        **{k: v for k, v in _STATE.items() if k not in ("last_ok", "wake")},
+    }
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+SHD Careers — Static snapshot (Phase 5)
+=======================================
+pre-render ข้อมูลสาธารณะ (รายการงาน / รายละเอียดงาน / facet / CMS content)
+เป็นไฟล์ JSON ชื่อมี hash ของเนื้อหา -> วางบน CDN แล้ว cache ได้ถาวร (immutable)
+
+  manifest.json                         <- ไฟล์เดียวที่ชื่อคงที่ (cache สั้น) ชี้ไปไฟล์ hash ล่าสุด
+  jobs/{lang}.{hash}.json               <- เหมือน GET /jobs?lang=
+  jobs/{lang}/{job_id}.{hash}.json      <- เหมือน GET /jobs/{job_id}?lang=
+  facets/{lang}.{hash}.json             <- department/level/country -> job_ids + count
+  content/{lang}.{hash}.json            <- เหมือน GET /content?lang=&merged=1
+
+เขียนแบบ incremental: เทียบ hash กับ manifest เดิม เขียนเฉพาะไฟล์ที่เปลี่ยน
+ไฟล์รุ่นเก่ายังเก็บไว้ 1 รุ่น (client ที่ถือ manifest เก่าอยู่ยังโหลดได้)
+
+โมดูลนี้ไม่รู้จัก FastAPI/Supabase query — main.py เป็นคนเตรียมข้อมูลส่งเข้ามา
+"""
+from __future__ import annotations
+
+import os
+import json
+import time
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("shd-careers.snapshot")
+
+MANIFEST = "manifest.json"
+FACET_KEYS = ("department", "level", "country")
+
+
+def _dump(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def hashed_name(logical: str, data: bytes) -> str:
+    """'jobs/th.json' -> 'jobs/th.<hash>.json'"""
+    base, ext = os.path.splitext(logical)
+    return f"{base}.{_digest(data)}{ext}"
+
+
+def _safe_segment(s: str) -> str:
+    keep = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._-"
+    return "".join(c if c in keep else "_" for c in s) or "_"
+
+
+def build_facets(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for key in FACET_KEYS:
+        idx: Dict[str, List[str]] = {}
+        for r in rows:
+            v = str(r.get(key) or "").strip()
+            if v:
+                idx.setdefault(v, []).append(str(r.get("job_id")))
+        out[key] = {v: {"count": len(ids), "job_ids": ids} for v, ids in sorted(idx.items())}
+    return out
+
+
+def build_snapshot_files(
+    jobs_by_lang: Dict[str, Tuple[str, List[Dict[str, Any]]]],
+    content_by_lang: Dict[str, Tuple[Dict[str, Any], str]],
+) -> Dict[str, bytes]:
+    """logical path -> เนื้อหา (bytes)
+    jobs_by_lang:    {lang: (version, rows ที่ shape แล้ว)}
+    content_by_lang: {lang: (items ที่ merge แล้ว, version)}"""
+    files: Dict[str, bytes] = {}
+    for lang, (version, rows) in jobs_by_lang.items():
+        files[f"jobs/{lang}.json"] = _dump({"ok": True, "version": version, "rows": rows, "total": len(rows)})
+        files[f"facets/{lang}.json"] = _dump({"ok": True, "lang": lang, "facets": build_facets(rows)})
+        for r in rows:
+            jid = str(r.get("job_id") or "").strip()
+            if jid:
+                files[f"jobs/{lang}/{_safe_segment(jid)}.json"] = _dump({"ok": True, "job": r})
+    for lang, (items, version) in content_by_lang.items():
+        files[f"content/{lang}.json"] = _dump(
+            {"ok": True, "lang": lang, "items": items, "merged": True, "version": version}
+        )
+    return files
+
+
+# ---------------------------
+# Sinks — ที่เก็บไฟล์ปลายทาง
+# ---------------------------
+class LocalSink:
+    """เขียนลงโฟลเดอร์ (เช่น frontend/public/snapshot ตอน build, หรือโฟลเดอร์ที่ nginx/CDN เสิร์ฟ)"""
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, *name.split("/"))
+
+    def read(self, name: str) -> Optional[bytes]:
+        try:
+            with open(self._path(name), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def write(self, name: str, data: bytes, immutable: bool) -> None:
+        path = self._path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)  # manifest ต้องไม่ถูกอ่านตอนเขียนได้ครึ่งไฟล์
+
+    def delete(self, names: List[str]) -> None:
+        for n in names:
+            try:
+                os.remove(self._path(n))
+            except FileNotFoundError:
+                pass
+
+
+class StorageSink:
+    """อัปโหลดขึ้น Supabase Storage (bucket public = เสิร์ฟผ่าน CDN ของ Supabase)"""
+
+    def __init__(self, sb: Any, bucket: str, prefix: str = "snapshot") -> None:
+        self.bucket = sb.storage.from_(bucket)
+        self.prefix = prefix.strip("/")
+
+    def _key(self, name: str) -> str:
+        return f"{self.prefix}/{name}" if self.prefix else name
+
+    def read(self, name: str) -> Optional[bytes]:
+        try:
+            return self.bucket.download(self._key(name))
+        except Exception:
+            return None
+
+    def write(self, name: str, data: bytes, immutable: bool) -> None:
+        self.bucket.upload(
+            self._key(name),
+            data,
+            file_options={
+                "content-type": "application/json; charset=utf-8",
+                "cache-control": "31536000" if immutable else "60",
+                "upsert": "true",
+            },
+        )
+
+    def delete(self, names: List[str]) -> None:
+        if names:
+            self.bucket.remove([self._key(n) for n in names])
+
+
+def sync_snapshot(files: Dict[str, bytes], sink: Any) -> Dict[str, Any]:
+    """เขียนเฉพาะไฟล์ที่ hash เปลี่ยนจาก manifest เดิม แล้วค่อยเขียน manifest ใหม่ (สุดท้ายเสมอ)
+    ไฟล์ hash ที่ไม่ถูกอ้างถึงแล้วจะถูกลบในรอบถัดไป (เก็บไว้ 1 รุ่น)"""
+    t0 = time.time()
+    prev: Dict[str, Any] = {}
+    raw = sink.read(MANIFEST)
+    if raw:
+        try:
+            prev = json.loads(raw)
+        except Exception:
+            prev = {}
+    prev_files: Dict[str, str] = prev.get("files") or {}
+    prev_retired: List[str] = prev.get("retired") or []
+
+    cur_files: Dict[str, str] = {}
+    written = 0
+    for logical, data in sorted(files.items()):
+        name = hashed_name(logical, data)
+        cur_files[logical] = name
+        if prev_files.get(logical) != name:
+            sink.write(name, data, immutable=True)
+            written += 1
+
+    live = set(cur_files.values())
+    retired = sorted({n for n in prev_files.values() if n not in live})
+    # ลบรุ่นที่ retired ไปแล้วตั้งแต่รอบก่อน (ตอนนี้ไม่มี manifest ไหนชี้ถึงแล้ว)
+    sink.delete([n for n in prev_retired if n not in live])
+
+    manifest = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "files": cur_files,
+        "retired": retired,
+    }
+    sink.write(MANIFEST, _dump(manifest), immutable=False)
+
+    stats = {
+        "files": len(cur_files),
+        "written": written,
+        "unchanged": len(cur_files) - written,
+        "retired": len(retired),
+        "elapsed_ms": int((time.time() - t0) * 1000),
+    }
+    logger.info("snapshot synced: %s", stats)
+    return stats
@@ -0,0 +1,846 @@
+# -*- coding: utf-8 -*-
+"""
+SHD Careers — Storage backend (Phase 5)
+=======================================
+ทุก query ในแอปเขียนด้วย builder ของ supabase-py (postgrest + storage3):
+
+    sb.table("jobs").select("*", count="exact").eq(...).or_(...).order(...).range(a, b).execute()
+    sb.storage.from_(bucket).upload(...) / create_signed_urls(...) / remove(...)
+
+builder ชุดนี้คือ interface กลางของ persistence — supabase_client() (main) / _sb() (admin)
+คืน client ตาม STORAGE_BACKEND (ตัวเดียวใช้ร่วมทั้ง process — remote_client() / local_client()):
+
+  supabase (ค่าเริ่มต้น)  supabase-py ตัวจริง
+  local                   SQLite ไฟล์เดียว (DB_PATH) + โฟลเดอร์ไฟล์ (UPLOAD_DIR)
+                          -> รันเครื่องเดียว / dev offline / load test โดยไม่ต้องข้ามเน็ต
+
+LocalClient รองรับเฉพาะส่วนของ builder ที่แอปใช้จริง ด้วย semantics เดียวกับ PostgREST:
+  - filter eq/neq/gt/gte/lt/lte/like/ilike/in_/is_ และ or_("a.eq.1,and(b.gt.2,c.lt.\"x\"),d.not.is.null")
+  - order แบบ Postgres (asc = NULLS LAST, desc = NULLS FIRST), range/limit, max-rows 1000
+  - select(count="exact"), rename "title:pub_title_th", embedded select ของตารางลูก เช่น "*,application_skills(skill)"
+  - insert / upsert(on_conflict) / update / delete คืนแถวที่เปลี่ยน
+ตาราง / view / trigger สร้างเองตอนเปิดไฟล์ครั้งแรก (เทียบเท่า migrations/*.sql)
+"""
+from __future__ import annotations
+
+import os
+import hmac
+import json
+import time
+import uuid
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+try:
+    from app import boot  # type: ignore
+except Exception:
+    import boot  # type: ignore
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase").strip().lower()
+DB_PATH = os.getenv("DB_PATH", "./data/local.db").strip()
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "./uploads").strip()
+# URL ที่ browser ใช้เรียก API นี้ (ใช้ประกอบ signed URL ของไฟล์ใน local storage)
+LOCAL_PUBLIC_URL = os.getenv("LOCAL_PUBLIC_URL", "http://localhost:8000").strip().rstrip("/")
+
+
+def _sign_secret() -> bytes:
+    """key เซ็นลิงก์ไฟล์ local — ต้องเหมือนกันทุก worker/ทุกครั้งที่ restart (worker หนึ่งเซ็น อีกตัว verify)
+    ไม่ตั้ง LOCAL_STORAGE_SECRET -> derive จาก ADMIN_JWT_SECRET (ว่าง = ADMIN_PASSWORD เหมือน admin.py)
+    ผ่าน HMAC แยก key จาก token แอดมิน; ไม่มีสักตัว = b"" (_sign โยน error)"""
+    own = os.getenv("LOCAL_STORAGE_SECRET", "").strip()
+    if own:
+        return own.encode("utf-8")
+    base = os.getenv("ADMIN_JWT_SECRET", "").strip() or os.getenv("ADMIN_PASSWORD", "").strip()
+    if not base:
+        return b""
+    return hmac.new(base.encode("utf-8"), b"local-storage-sign", hashlib.sha256).digest()
+
+
+_SIGN_SECRET = _sign_secret()
+
+MAX_ROWS = 1000  # เท่ากับ max-rows ของ PostgREST บน Supabase -> โค้ดที่แบ่งหน้าทำงานเหมือนกัน
+
+_TS_DEFAULT = "(strftime('%Y-%m-%dT%H:%M:%f+00:00','now'))"
+
+# ✅ Public projection ของ jobs (migration 006) — resolve ภาษา + strip ตอนเขียน ไม่ใช่ทุกครั้งที่อ่าน
+#    pub_{field}_{lang} = ภาษานั้น -> en -> th -> zh (ค่าแรกที่ไม่ว่าง) เหมือน _job_public_shape ใน main.py
+#    Postgres: generated column / SQLite: trigger หลัง insert/update (replica ก็คำนวณเองได้)
+_JOB_TEXT_FIELDS = ("title", "location", "desc", "qual")
+_JOB_FACETS = ("department", "level", "country")
+_JOB_DATA_COLS = ", ".join(
+    ["job_id", "status", "country", "department", "level", "quantity", "created_at"]
+    + [f"{f}_{lang}" for f in _JOB_TEXT_FIELDS for lang in ("th", "en", "zh")]
+)
+
+
+def _trim_sql(col: str) -> str:
+    return f"nullif(trim({col}, ' ' || char(9, 10, 13)), '')"
+
+
+def job_projection_sql(src: str = "") -> Dict[str, str]:
+    """คอลัมน์ pub_* -> SQL expression (SQLite) ของแถว src ('new.' ใน trigger, '' ตอน backfill)"""
+    out: Dict[str, str] = {}
+    for field in _JOB_TEXT_FIELDS:
+        for lang in ("th", "en", "zh"):
+            order = [lang] + [x for x in ("en", "th", "zh") if x != lang]
+            out[f"pub_{field}_{lang}"] = "coalesce(" + ", ".join(_trim_sql(f"{src}{field}_{x}") for x in order) + ", '')"
+    for col in _JOB_FACETS:
+        out[f"pub_{col}"] = f"coalesce({_trim_sql(src + col)}, '')"
+    return out
+
+
+_JOB_PROJECTION_COLS = ",\n".join(f"  {c} text" for c in job_projection_sql())
+_JOB_PROJECTION_SET = ", ".join(f"{c} = {e}" for c, e in job_projection_sql("new.").items())
+
+SCHEMA = f"""
+create table if not exists jobs (
+  job_id      text primary key,
+  status      text default 'draft',
+  country     text,
+  department  text,
+  level       text,
+  quantity    integer,
+  title_th    text, title_en    text, title_zh    text,
+  location_th text, location_en text, location_zh text,
+  desc_th     text, desc_en     text, desc_zh     text,
+  qual_th     text, qual_en     text, qual_zh     text,
+  created_at  text default {_TS_DEFAULT},
+  updated_at  text default {_TS_DEFAULT},
+  feed_hash   text,
+{_JOB_PROJECTION_COLS}
+);
+create index if not exists idx_jobs_status     on jobs (status);
+create index if not exists idx_jobs_department on jobs (department);
+create index if not exists idx_jobs_level      on jobs (level);
+create index if not exists idx_jobs_country    on jobs (country);
+create index if not exists idx_jobs_updated_at on jobs (updated_at);
+create index if not exists idx_jobs_sync_cursor on jobs (updated_at, job_id);
+create index if not exists idx_jobs_published_updated on jobs (status, updated_at desc, job_id);
+
+create table if not exists applications (
+  id                   text primary key,
+  job_id               text,
+  country              text,
+  department           text,
+  level                text,
+  first_name           text,
+  last_name            text,
+  email                text,
+  phone                text,
+  address              text,
+  visa_required        integer default 0,
+  available_start_date text,
+  website_url          text,
+  source_channel       text,
+  terms_accepted       integer default 0,
+  resume_url           text,
+  transcript_url       text,
+  status               text default 'new',
+  admin_note           text,
+  reviewed_at          text,
+  created_at           text default {_TS_DEFAULT}
+);
+create index if not exists idx_applications_created_at on applications (created_at, id);
+create index if not exists idx_applications_status     on applications (status);
+create index if not exists idx_applications_job_status on applications (job_id, status);
+
+create table if not exists application_educations (
+  id text primary key,
+  application_id text references applications(id) on delete cascade,
+  degree_level text, institute text, program text,
+  start_month text, end_month text, degree_type text, gpa text
+);
+create table if not exists application_experiences (
+  id text primary key,
+  application_id text references applications(id) on delete cascade,
+  company text, role text, start_month text, end_month text
+);
+create table if not exists application_skills (
+  id text primary key,
+  application_id text references applications(id) on delete cascade,
+  skill text
+);
+create table if not exists application_attachments (
+  id text primary key,
+  application_id text references applications(id) on delete cascade,
+  file_name text, file_url text
+);
+create index if not exists idx_edu_app_id   on application_educations (application_id);
+create index if not exists idx_exp_app_id   on application_experiences (application_id);
+create index if not exists idx_skill_app_id on application_skills (application_id);
+create index if not exists idx_att_app_id   on application_attachments (application_id);
+
+create table if not exists site_content (
+  key        text not null,
+  lang       text not null,
+  value      text not null,
+  updated_at text default {_TS_DEFAULT},
+  updated_by text,
+  primary key (key, lang)
+);
+create index if not exists idx_site_content_sync_cursor on site_content (updated_at, key, lang);
+
+create table if not exists sync_tombstones (
+  entity     text not null,
+  entity_key text not null,
+  lang       text not null default '',
+  deleted_at text not null default {_TS_DEFAULT},
+  primary key (entity, entity_key, lang)
+);
+create index if not exists idx_sync_tombstones_cursor on sync_tombstones (entity, deleted_at, entity_key, lang);
+
+create view if not exists job_applicant_counts as
+select
+  job_id,
+  count(*)                                                        as total,
+  sum(case when coalesce(status, 'new') = 'new' then 1 else 0 end) as new,
+  sum(case when status = 'reviewing' then 1 else 0 end)            as reviewing,
+  sum(case when status = 'shortlisted' then 1 else 0 end)          as shortlisted,
+  sum(case when status = 'rejected' then 1 else 0 end)             as rejected,
+  sum(case when status = 'hired' then 1 else 0 end)                as hired
+from applications
+where job_id is not null
+group by job_id;
+
+create view if not exists job_option_values as
+select 'department' as kind, department as value from jobs where coalesce(department, '') <> '' group by department
+union all
+select 'level', level from jobs where coalesce(level, '') <> '' group by level
+union all
+select 'country', country from jobs where coalesce(country, '') <> '' group by country;
+
+create trigger if not exists trg_jobs_touch_updated_at
+  after update of {_JOB_DATA_COLS} on jobs for each row when new.updated_at is old.updated_at
+begin
+  update jobs set updated_at = {_TS_DEFAULT} where job_id = new.job_id;
+end;
+create trigger if not exists trg_jobs_projection_ai after insert on jobs for each row
+begin
+  update jobs set {_JOB_PROJECTION_SET} where job_id = new.job_id;
+end;
+create trigger if not exists trg_jobs_projection_au after update of {_JOB_DATA_COLS} on jobs for each row
+begin
+  update jobs set {_JOB_PROJECTION_SET} where job_id = new.job_id;
+end;
+create trigger if not exists trg_site_content_touch_updated_at
+  after update on site_content for each row when new.updated_at is old.updated_at
+begin
+  update site_content set updated_at = {_TS_DEFAULT} where key = new.key and lang = new.lang;
+end;
+create trigger if not exists trg_jobs_tombstone after delete on jobs for each row
+begin
+  insert or replace into sync_tombstones (entity, entity_key, lang) values ('job', old.job_id, '');
+end;
+create trigger if not exists trg_site_content_tombstone after delete on site_content for each row
+begin
+  insert or replace into sync_tombstones (entity, entity_key, lang) values ('content', old.key, old.lang);
+end;
+create trigger if not exists trg_jobs_clear_tombstone after insert on jobs for each row
+  when exists (select 1 from sync_tombstones where entity = 'job' and entity_key = new.job_id and lang = '')
+begin
+  delete from sync_tombstones where entity = 'job' and entity_key = new.job_id and lang = '';
+  update jobs set updated_at = {_TS_DEFAULT} where job_id = new.job_id;
+end;
+create trigger if not exists trg_site_content_clear_tombstone after insert on site_content for each row
+  when exists (select 1 from sync_tombstones where entity = 'content' and entity_key = new.key and lang = new.lang)
+begin
+  delete from sync_tombstones where entity = 'content' and entity_key = new.key and lang = new.lang;
+  update site_content set updated_at = {_TS_DEFAULT} where key = new.key and lang = new.lang;
+end;
+"""
+
+# คอลัมน์ที่ต้องแปลงชนิดกลับให้เหมือน Postgres
+_BOOL_COLS = {"visa_required", "terms_accepted"}
+_JSON_COLS = {"site_content": {"value"}}
+# ตารางที่ id เป็น uuid (Postgres: gen_random_uuid())
+_UUID_TABLES = {
+    "applications", "application_educations", "application_experiences",
+    "application_skills", "application_attachments",
+}
+_PRIMARY_KEYS = {"jobs": ["job_id"], "site_content": ["key", "lang"], "sync_tombstones": ["entity", "entity_key", "lang"]}
+# embedded select: ตารางลูก -> คอลัมน์ FK ที่ชี้ไป id ของแม่
+_CHILD_FK = {
+    "application_educations": "application_id",
+    "application_experiences": "application_id",
+    "application_skills": "application_id",
+    "application_attachments": "application_id",
+}
+_OPS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+
+def _ident(name: str) -> str:
+    name = name.strip()
+    if not name or not all(c.isalnum() or c == "_" for c in name):
+        raise ValueError(f"invalid identifier: {name!r}")
+    return f'"{name}"'
+
+
+def _enc(v: Any) -> Any:
+    if isinstance(v, bool):
+        return int(v)
+    if isinstance(v, (dict, list)):
+        return json.dumps(v, ensure_ascii=False)
+    return v
+
+
+def _split_top(s: str) -> List[str]:
+    """แยกด้วย ',' เฉพาะระดับบนสุด (ไม่แยกในวงเล็บ/ในเครื่องหมายคำพูด)"""
+    out: List[str] = []
+    cur: List[str] = []
+    depth, quoted, esc = 0, False, False
+    for ch in s:
+        if esc:
+            cur.append(ch)
+            esc = False
+            continue
+        if ch == "\\" and quoted:
+            cur.append(ch)
+            esc = True
+            continue
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0 and not quoted:
+            out.append("".join(cur))
+            cur = []
+        else:
+            cur.append(ch)
+    if cur:
+        out.append("".join(cur))
+    return [p.strip() for p in out if p.strip()]
+
+
+def _unquote(v: str) -> str:
+    v = v.strip()
+    if len(v) >= 2 and v[0] == '"' and v[-1] == '"':
+        v = v[1:-1]
+        out: List[str] = []
+        esc = False
+        for ch in v:
+            if esc:
+                out.append(ch)
+                esc = False
+            elif ch == "\\":
+                esc = True
+            else:
+                out.append(ch)
+        return "".join(out)
+    return v
+
+
+def _like_pattern(p: str) -> str:
+    return p.replace("*", "%")
+
+
+def _cond(col: str, op: str, value: Any) -> Tuple[str, List[Any]]:
+    c = _ident(col)
+    if op in _OPS:
+        return f"{c} {_OPS[op]} ?", [_enc(value)]
+    if op == "ilike":
+        return f"{c} like ?", [_like_pattern(str(value))]
+    if op == "like":
+        # LIKE ของ SQLite ไม่สนตัวพิมพ์ -> ใช้ GLOB ให้ตรงกับ like ของ Postgres
+        return f"{c} glob ?", [str(value).replace("%", "*").replace("_", "?")]
+    if op == "in":
+        vals = list(value)
+        if not vals:
+            return "0", []
+        return f"{c} in ({','.join('?' * len(vals))})", [_enc(v) for v in vals]
+    if op == "is":
+        v = str(value).lower() if value is not None else "null"
+        if v == "null":
+            return f"{c} is null", []
+        return f"{c} is ?", [1 if v == "true" else 0]
+    raise ValueError(f"unsupported filter op: {op}")
+
+
+def _logic(kind: str, body: str) -> Tuple[str, List[Any]]:
+    """PostgREST logic tree: or=(a.eq.1,and(b.gt.2,c.lt.3)) -> SQL"""
+    parts: List[str] = []
+    params: List[Any] = []
+    for item in _split_top(body):
+        for sub in ("and", "or"):
+            if item.startswith(f"{sub}(") and item.endswith(")"):
+                sql, p = _logic(sub, item[len(sub) + 1:-1])
+                break
+        else:
+            col, op, raw = item.split(".", 2)
+            negate = op == "not"
+            if negate:  # col.not.is.null
+                op, raw = raw.split(".", 1)
+            if op == "in":
+                value: Any = [_unquote(x) for x in _split_top(raw.strip()[1:-1])]
+            else:
+                value = _unquote(raw)
+            sql, p = _cond(col, op, value)
+            if negate:
+                sql = f"not ({sql})"
+        parts.append(f"({sql})")
+        params.extend(p)
+    return (f" {kind} ".join(parts) or "1"), params
+
+
+def _col_sql(item: str) -> str:
+    """'col' หรือ 'alias:col' (rename แบบ PostgREST)"""
+    if ":" in item:
+        alias, col = item.split(":", 1)
+        return f"{_ident(col)} as {_ident(alias)}"
+    return _ident(item)
+
+
+def _parse_select(cols: str) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """'a,b,child(x,y)' -> (['a','b'], [('child','x,y')])"""
+    plain: List[str] = []
+    embeds: List[Tuple[str, str]] = []
+    for item in _split_top(cols or "*"):
+        if item.endswith(")") and "(" in item:
+            name, sub = item[:-1].split("(", 1)
+            embeds.append((name.strip(), sub.strip() or "*"))
+        else:
+            plain.append(item)
+    return plain, embeds
+
+
+class LocalResult:
+    def __init__(self, data: List[Dict[str, Any]], count: Optional[int] = None) -> None:
+        self.data = data
+        self.count = count
+
+
+class LocalQuery:
+    """builder เลียน postgrest-py (SyncRequestBuilder) — คืนตัวเองทุก method แล้ว execute()"""
+
+    def __init__(self, client: "LocalClient", table: str) -> None:
+        self._client = client
+        self._table = table
+        self._op = "select"
+        self._cols = "*"
+        self._count: Optional[str] = None
+        self._payload: Any = None
+        self._on_conflict: Optional[str] = None
+        self._ignore_duplicates = False
+        self._where: List[Tuple[str, List[Any]]] = []
+        self._order: List[Tuple[str, bool]] = []
+        self._offset = 0
+        self._limit: Optional[int] = None
+
+    # --- operations ---
+    def select(self, cols: str = "*", count: Optional[str] = None) -> "LocalQuery":
+        self._cols, self._count = cols, count
+        return self
+
+    def insert(self, payload: Any, **_: Any) -> "LocalQuery":
+        self._op, self._payload = "insert", payload
+        return self
+
+    def upsert(
+        self, payload: Any, on_conflict: str = "", ignore_duplicates: bool = False, **_: Any
+    ) -> "LocalQuery":
+        self._op, self._payload, self._on_conflict = "upsert", payload, on_conflict
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, payload: Dict[str, Any], **_: Any) -> "LocalQuery":
+        self._op, self._payload = "update", payload
+        return self
+
+    def delete(self, **_: Any) -> "LocalQuery":
+        self._op = "delete"
+        return self
+
+    # --- filters ---
+    def _add(self, col: str, op: str, value: Any) -> "LocalQuery":
+        self._where.append(_cond(col, op, value))
+        return self
+
+    def eq(self, col: str, value: Any) -> "LocalQuery":
+        return self._add(col, "eq", value)
+
+    def neq(self, col: str, value: Any) -> "LocalQuery":
+        return self._add(col, "neq", value)
+
+    def gt(self, col: str, value: Any) -> "LocalQuery":
+        return self._add(col, "gt", value)
+
+    def gte(self, col: str, value: Any) -> "LocalQuery":
+        return self._add(col, "gte", value)
+
+    def lt(self, col: str, value: Any) -> "LocalQuery":
+        return self._add(col, "lt", value)
+
+    def lte(self, col: str, value: Any) -> "LocalQuery":
+        return self._add(col, "lte", value)
+
+    def like(self, col: str, pattern: str) -> "LocalQuery":
+        return self._add(col, "like", pattern)
+
+    def ilike(self, col: str, pattern: str) -> "LocalQuery":
+        return self._add(col, "ilike", pattern)
+
+    def in_(self, col: str, values: Any) -> "LocalQuery":
+        return self._add(col, "in", values)
+
+    def is_(self, col: str, value: Any) -> "LocalQuery":
+        return self._add(col, "is", value)
+
+    def or_(self, filters: str, reference_table: Optional[str] = None) -> "LocalQuery":
+        self._where.append(_logic("or", filters))
+        return self
+
+    def filter(self, column: str, operator: str, criteria: str) -> "LocalQuery":
+        """filter แบบ raw ของ PostgREST (col=op.criteria) — ใช้โดย stub ใน bench/stubs.py"""
+        if "fts" in operator:
+            return self.text_search(column, criteria)
+        self._where.append(_logic("and", f"{column}.{operator}.{criteria}"))
+        return self
+
+    def text_search(self, column: str, query: str, **_: Any) -> "LocalQuery":
+        """column = ตาราง FTS5 แบบ external content ของตารางนี้ (เช่น replica สร้าง applications_fts)
+        query ถูกค้นเป็น phrase เดียว"""
+        phrase = '"' + str(query).replace('"', '""') + '"'
+        self._where.append((f"rowid in (select rowid from {_ident(column)} where {_ident(column)} match ?)", [phrase]))
+        return self
+
+    def order(self, col: str, desc: bool = False, **_: Any) -> "LocalQuery":
+        self._order.append((col, desc))
+        return self
+
+    def range(self, start: int, end: int) -> "LocalQuery":
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    def limit(self, n: int) -> "LocalQuery":
+        self._limit = n
+        return self
+
+    # --- execute ---
+    def _where_sql(self) -> Tuple[str, List[Any]]:
+        if not self._where:
+            return "", []
+        params: List[Any] = []
+        for _, p in self._where:
+            params.extend(p)
+        return " where " + " and ".join(f"({s})" for s, _ in self._where), params
+
+    def execute(self) -> LocalResult:
+        db = self._client.conn()
+        if self._op == "select":
+            return self._run_select(db)
+        if self._op in ("insert", "upsert"):
+            return self._run_insert(db)
+        return self._run_modify(db)
+
+    def _run_select(self, db: sqlite3.Connection) -> LocalResult:
+        plain, embeds = _parse_select(self._cols)
+        star = "*" in plain
+        cols = ["*"] if star else list(plain)
+        if embeds and not star and "id" not in cols:
+            cols.append("id")
+        col_sql = ", ".join(c if c == "*" else _col_sql(c) for c in cols) or "*"
+        where, params = self._where_sql()
+        t = _ident(self._table)
+
+        total: Optional[int] = None
+        if self._count:
+            total = db.execute(f"select count(*) from {t}{where}", params).fetchone()[0]
+
+        sql = f"select {col_sql} from {t}{where}"
+        if self._order:
+            # Postgres: asc = NULLS LAST, desc = NULLS FIRST
+            # (คีย์หลักไม่มี NULL -> ไม่ต้องระบุ ให้ SQLite ใช้ index เรียงได้โดยไม่ต้อง sort ทั้งแถว)
+            keys = _PRIMARY_KEYS.get(self._table, ["id"])
+            sql += " order by " + ", ".join(
+                f"{_ident(c)} {'desc' if d else 'asc'}" + ("" if c in keys else " nulls first" if d else " nulls last")
+                for c, d in self._order
+            )
+        limit = MAX_ROWS if self._limit is None else min(self._limit, MAX_ROWS)
+        sql += " limit ? offset ?"
+        rows = [self._client.decode(self._table, r) for r in db.execute(sql, params + [limit, self._offset])]
+
+        for child, sub in embeds:
+            self._embed(db, rows, child, sub)
+        if embeds and not star and "id" not in plain:
+            for r in rows:
+                r.pop("id", None)
+        return LocalResult(rows, total)
+
+    def _embed(self, db: sqlite3.Connection, rows: List[Dict[str, Any]], child: str, sub: str) -> None:
+        fk = _CHILD_FK.get(child)
+        if fk is None:
+            raise ValueError(f"no relationship for embedded table: {child}")
+        ids = [r["id"] for r in rows if r.get("id") is not None]
+        by_parent: Dict[Any, List[Dict[str, Any]]] = {}
+        sub_cols = [c.strip() for c in sub.split(",") if c.strip()]
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            q = f"select * from {_ident(child)} where {_ident(fk)} in ({','.join('?' * len(chunk))})"
+            for r in db.execute(q, chunk):
+                d = self._client.decode(child, r)
+                by_parent.setdefault(d.get(fk), []).append(
+                    d if sub_cols == ["*"] else {c: d.get(c) for c in sub_cols}
+                )
+        for r in rows:
+            r[child] = by_parent.get(r.get("id"), [])
+
+    def _run_insert(self, db: sqlite3.Connection) -> LocalResult:
+        items = self._payload if isinstance(self._payload, list) else [self._payload]
+        t = _ident(self._table)
+        keys = [k.strip() for k in (self._on_conflict or "").split(",") if k.strip()]
+        keys = keys or _PRIMARY_KEYS.get(self._table, ["id"])
+        out: List[Dict[str, Any]] = []
+        db.execute("begin")
+        try:
+            for it in items:
+                row = dict(it)
+                if self._table in _UUID_TABLES and not row.get("id"):
+                    row["id"] = str(uuid.uuid4())
+                cols = list(row)
+                sql = (
+                    f"insert into {t} ({', '.join(_ident(c) for c in cols)}) "
+                    f"values ({', '.join('?' * len(cols))})"
+                )
+                if self._op == "upsert":
+                    upd = [c for c in cols if c not in keys]
+                    conflict = f" on conflict ({', '.join(_ident(k) for k in keys)}) do "
+                    if upd:
+                        conflict += "update set " + ", ".join(f"{_ident(c)} = excluded.{_ident(c)}" for c in upd)
+                    else:
+                        conflict += "nothing"
+                    sql += conflict
+                # RETURNING ของ SQLite ได้ค่าก่อน AFTER trigger เติม pub_* -> select ซ้ำด้วย rowid (update ก็เช่นกัน)
+                for (rid,) in db.execute(sql + " returning rowid", [_enc(row[c]) for c in cols]).fetchall():
+                    r = db.execute(f"select * from {t} where rowid = ?", (rid,)).fetchone()
+                    out.append(self._client.decode(self._table, r))
+            db.execute("commit")
+        except Exception:
+            db.execute("rollback")
+            raise
+        return LocalResult(out)
+
+    def _run_modify(self, db: sqlite3.Connection) -> LocalResult:
+        t = _ident(self._table)
+        where, params = self._where_sql()
+        if self._op == "update":
+            patch = dict(self._payload or {})
+            if not patch:
+                return LocalResult([])
+            sets = ", ".join(f"{_ident(c)} = ?" for c in patch)
+            sql = f"update {t} set {sets}{where} returning rowid"
+            params = [_enc(v) for v in patch.values()] + params
+            rids = [rid for (rid,) in db.execute(sql, params).fetchall()]
+            rows = [db.execute(f"select * from {t} where rowid = ?", (rid,)).fetchone() for rid in rids]
+            return LocalResult([self._client.decode(self._table, r) for r in rows])
+        else:
+            sql = f"delete from {t}{where} returning *"
+        rows = db.execute(sql, params).fetchall()
+        return LocalResult([self._client.decode(self._table, r) for r in rows])
+
+
+def pg_quote(v: Any) -> str:
+    return '"' + str(v).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def keyset_after(ts_col: str, key_cols: List[str], cursor: List[Any]) -> str:
+    """PostgREST or-filter สำหรับ (ts, k1, k2, ...) > cursor"""
+    ts, keys = cursor[0], cursor[1:]
+    conds = [f"{ts_col}.gt.{pg_quote(ts)}"]
+    for i in range(len(keys)):
+        eqs = [f"{ts_col}.eq.{pg_quote(ts)}"] + [f"{key_cols[j]}.eq.{pg_quote(keys[j])}" for j in range(i)]
+        conds.append("and(" + ",".join(eqs + [f"{key_cols[i]}.gt.{pg_quote(keys[i])}"]) + ")")
+    return ",".join(conds)
+
+
+# ---------------------------
+# Local file storage (แทน Supabase Storage)
+# ---------------------------
+def _sign(bucket: str, path: str, exp: int) -> str:
+    if not _SIGN_SECRET:
+        raise RuntimeError("STORAGE_BACKEND=local needs LOCAL_STORAGE_SECRET or ADMIN_JWT_SECRET to sign file URLs")
+    msg = f"{bucket}/{path}:{exp}".encode("utf-8")
+    return hmac.new(_SIGN_SECRET, msg, hashlib.sha256).hexdigest()[:32]
+
+
+def verify_signed(bucket: str, path: str, exp: int, sig: str) -> bool:
+    return bool(_SIGN_SECRET) and exp >= int(time.time()) and hmac.compare_digest(_sign(bucket, path, exp), sig or "")
+
+
+def local_file_path(bucket: str, path: str) -> str:
+    parts = [p for p in f"{bucket}/{path}".split("/") if p]
+    if not parts or any(p in (".", "..") for p in parts):
+        raise ValueError(f"invalid storage path: {path!r}")
+    return os.path.join(UPLOAD_DIR, *parts)
+
+
+class LocalBucket:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def upload(self, path: str, file: bytes, file_options: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        dest = local_file_path(self.name, path)
+        upsert = str((file_options or {}).get("upsert", "false")).lower() == "true"
+        if os.path.exists(dest) and not upsert:
+            raise Exception(f"The resource already exists: {path}")
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp = f"{dest}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(file)
+        os.replace(tmp, dest)
+        return {"path": path, "Key": f"{self.name}/{path}"}
+
+    def download(self, path: str) -> bytes:
+        with open(local_file_path(self.name, path), "rb") as f:
+            return f.read()
+
+    def remove(self, paths: List[str]) -> List[Dict[str, str]]:
+        out = []
+        for p in paths:
+            try:
+                os.remove(local_file_path(self.name, p))
+                out.append({"name": p})
+            except FileNotFoundError:
+                pass
+        return out
+
+    def get_public_url(self, path: str) -> Optional[str]:
+        # ไม่มี public bucket ใน local -> None แล้ว apply จะเก็บเป็น storage:path ให้แอดมินเซ็นเอง
+        return None
+
+    def _signed(self, path: str, expires_in: int) -> Optional[str]:
+        if not os.path.exists(local_file_path(self.name, path)):
+            return None
+        exp = int(time.time()) + int(expires_in)
+        return (
+            f"{LOCAL_PUBLIC_URL}/storage/local/{quote(self.name)}/{quote(path)}"
+            f"?exp={exp}&sig={_sign(self.name, path, exp)}"
+        )
+
+    def create_signed_url(self, path: str, expires_in: int, options: Any = None) -> Dict[str, Any]:
+        url = self._signed(path, expires_in)
+        if url is None:
+            raise Exception(f"Object not found: {path}")
+        return {"signedURL": url, "signedUrl": url}
+
+    def create_signed_urls(self, paths: List[str], expires_in: int, options: Any = None) -> List[Dict[str, Any]]:
+        out = []
+        for p in paths:
+            url = self._signed(p, expires_in)
+            out.append({"path": p, "signedURL": url, "signedUrl": url, "error": None if url else "Object not found"})
+        return out
+
+
+class LocalStorage:
+    def from_(self, bucket: str) -> LocalBucket:
+        return LocalBucket(bucket)
+
+
+# ---------------------------
+# Local client
+# ---------------------------
+class LocalClient:
+    """แทน supabase.Client — 1 connection ต่อ thread (FastAPI threadpool), WAL ให้อ่านขนานกับเขียนได้"""
+
+    def __init__(self, path: str, extra_sql: str = "") -> None:
+        self.path = path
+        self.storage = LocalStorage()
+        self._local = threading.local()
+        d = os.path.dirname(os.path.abspath(path))
+        os.makedirs(d, exist_ok=True)
+        db = self.conn()
+        legacy = [r[1] for r in db.execute("pragma table_info(jobs)")]
+        if legacy and "title_th" not in legacy:
+            raise RuntimeError(
+                f"{path} uses the old single-language schema — point DB_PATH at a new file for STORAGE_BACKEND=local"
+            )
+        if legacy and "pub_title_th" not in legacy:
+            # ไฟล์จากก่อน migration 006 -> เพิ่มคอลัมน์ projection + backfill
+            # (drop touch trigger เดิมก่อน ไม่งั้น backfill ขยับ updated_at ทุกแถว — SCHEMA สร้างตัวใหม่ให้)
+            proj = job_projection_sql()
+            db.executescript(
+                "drop trigger if exists trg_jobs_touch_updated_at;\n"
+                + "".join(f"alter table jobs add column {c} text;\n" for c in proj)
+                + "update jobs set " + ", ".join(f"{c} = {e}" for c, e in proj.items()) + ";\n"
+            )
+        if legacy and "feed_hash" not in legacy:
+            db.execute("alter table jobs add column feed_hash text")  # migration 008
+        db.executescript(SCHEMA + extra_sql)
+
+    def conn(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            db.row_factory = sqlite3.Row
+            db.execute("pragma journal_mode=wal")
+            db.execute("pragma synchronous=normal")
+            db.execute("pragma foreign_keys=on")
+            self._local.db = db
+        return db
+
+    def decode(self, table: str, row: sqlite3.Row) -> Dict[str, Any]:
+        d = dict(row)
+        for c in _BOOL_COLS.intersection(d):
+            if d[c] is not None:
+                d[c] = bool(d[c])
+        for c in _JSON_COLS.get(table, ()):
+            if isinstance(d.get(c), str):
+                try:
+                    d[c] = json.loads(d[c])
+                except ValueError:
+                    pass
+        return d
+
+    def table(self, name: str) -> LocalQuery:
+        return LocalQuery(self, name)
+
+    def from_(self, name: str) -> LocalQuery:
+        return LocalQuery(self, name)
+
+
+_LOCAL: Dict[str, LocalClient] = {}
+_LOCAL_LOCK = threading.Lock()
+
+
+def use_local() -> bool:
+    return STORAGE_BACKEND == "local"
+
+
+def local_client() -> LocalClient:
+    c = _LOCAL.get("c")
+    if c is None:
+        with _LOCAL_LOCK:
+            c = _LOCAL.get("c")
+            if c is None:
+                c = _LOCAL["c"] = LocalClient(DB_PATH)
+    return c
+
+
+# ✅ supabase-py: import ตอนใช้ครั้งแรก (ทั้งแพ็กเกจ ~100+ ms) และสร้าง client ครั้งเดียวต่อ process
+#    (create_client สร้าง httpx client + SSL context ใหม่ทุกครั้ง ~30 ms) — session ของ httpx ใช้ข้าม thread ได้
+_REMOTE: Dict[Tuple[str, str], Any] = {}
+
+
+def supabase_factory() -> Any:
+    """create_client ของ supabase-py หรือ None ถ้าไม่ได้ติดตั้ง"""
+    try:
+        return boot.lazy_import("supabase").create_client
+    except Exception:
+        return None
+
+
+def remote_client(url: str, key: str) -> Any:
+    c = _REMOTE.get((url, key))
+    if c is None:
+        factory = supabase_factory()
+        if factory is None:
+            return None
+        with _LOCAL_LOCK:
+            c = _REMOTE.get((url, key))
+            if c is None:
+                with boot.phase("supabase client"):
+                    c = _REMOTE[(url, key)] = factory(url, key)
+    return c
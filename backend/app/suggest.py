@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+SHD Careers — Typeahead (Phase 5)
+=================================
+index สำหรับ GET /jobs/suggest — เดาคำจากสิ่งที่พิมพ์ไปแล้วบางส่วน (ต่อภาษา 1 index)
+
+  term   = (field, ข้อความ) ของ title / department / location / country ในภาษานั้น
+  key    = ข้อความ lower ทั้งคำ + ทุกตำแหน่งที่ขึ้นคำใหม่ (หลังช่องว่าง)
+           -> "eng" เจอทั้ง "Engineering" และ "Senior Software Engineer"
+           ไทย/จีนไม่มีช่องว่าง -> ทุกตำแหน่งที่ shingle ของ textvec เริ่ม ("วิศว" เจอ "นักวิศวกรซอฟต์แวร์")
+  count  = จำนวนงาน published ที่มี term นี้ (= ความนิยม ใช้จัดอันดับ)
+
+keys เก็บเป็น list เรียงแล้ว -> prefix หนึ่งคือช่วงต่อเนื่อง หาได้ด้วย bisect 2 ครั้ง
+prefix สั้นที่ช่วงกว้างมาก (เช่นตัวอักษรเดียว) จำผลอันดับต้นไว้ ไม่ต้องไล่ทั้งช่วงซ้ำ
+
+sync() รับงานชุดใหม่ทั้งหมด แต่แก้ index เฉพาะงานที่ term เปลี่ยน (เพิ่ม/ลบ key ทีละตัวด้วย insort)
+โมดูลนี้ไม่รู้จัก FastAPI/Supabase — main.py ส่ง public shape เข้ามา
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from app import textvec  # type: ignore
+except Exception:
+    import textvec  # type: ignore
+
+FIELDS = ("title", "department", "location", "country")
+LIMIT_MAX = 20
+_SCAN_MAX = 256   # ช่วงกว้างกว่านี้ -> จำผลของ prefix ไว้
+_MEMO_MAX = 2048
+_END = "\U0010ffff"
+
+Term = Tuple[str, str]  # (field, text)
+
+
+def job_terms(job: Dict[str, Any]) -> Tuple[Term, ...]:
+    return tuple((f, job[f]) for f in FIELDS if job.get(f))
+
+
+def term_keys(text: str) -> List[str]:
+    low = text.lower()
+    starts = {0}
+    for i, ch in enumerate(low):
+        if ch == " " and i + 1 < len(low) and low[i + 1] != " ":
+            starts.add(i + 1)
+    # ไทย/จีนไม่เว้นวรรคระหว่างคำ -> ทุกตำแหน่ง shingle (3/2 ตัวอักษรแบบ textvec) ก็เป็นจุดขึ้นคำได้
+    starts.update(textvec.shingle_starts(low))
+    return [low[i:] for i in sorted(starts)]
+
+
+class SuggestIndex:
+    def __init__(self) -> None:
+        self.version: Optional[str] = None
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Tuple[Term, ...]] = {}  # job_id -> terms
+        self._count: Dict[Term, int] = {}
+        self._keys: List[Tuple[str, Term]] = []  # (key, term) เรียงแล้ว
+        self._memo: Dict[str, List[Term]] = {}
+        self.stats = {"syncs": 0, "jobs_changed": 0, "keys_added": 0, "keys_removed": 0}
+
+    def __len__(self) -> int:
+        return len(self._count)
+
+    # --- update ---
+    def _add_term(self, t: Term) -> None:
+        n = self._count.get(t, 0)
+        self._count[t] = n + 1
+        if n == 0:
+            for k in term_keys(t[1]):
+                bisect.insort(self._keys, (k, t))
+                self.stats["keys_added"] += 1
+
+    def _drop_term(self, t: Term) -> None:
+        n = self._count.get(t, 0) - 1
+        if n > 0:
+            self._count[t] = n
+            return
+        self._count.pop(t, None)
+        for k in term_keys(t[1]):
+            i = bisect.bisect_left(self._keys, (k, t))
+            if i < len(self._keys) and self._keys[i] == (k, t):
+                del self._keys[i]
+                self.stats["keys_removed"] += 1
+
+    def sync(self, version: str, jobs: Iterable[Dict[str, Any]]) -> int:
+        """ให้ index ตรงกับงานชุดนี้ -> คืนจำนวนงานที่ term เปลี่ยน (0 = ไม่ต้องแก้อะไร)"""
+        with self._lock:
+            if version == self.version:
+                return 0
+            fresh = {j["job_id"]: job_terms(j) for j in jobs}
+            changed = 0
+            for jid, old in list(self._jobs.items()):
+                new = fresh.get(jid)
+                if new == old:
+                    continue
+                changed += 1
+                for t in old:
+                    self._drop_term(t)
+                if new is None:
+                    del self._jobs[jid]
+            for jid, new in fresh.items():
+                old = self._jobs.get(jid)
+                if old == new:
+                    continue
+                if old is None:
+                    changed += 1
+                for t in new:
+                    self._add_term(t)
+                self._jobs[jid] = new
+            if changed:
+                self._memo = {}
+            self.version = version
+            self.stats["syncs"] += 1
+            self.stats["jobs_changed"] += changed
+            return changed
+
+    # --- read ---
+    def _rank(self, lo: int, hi: int) -> List[Term]:
+        seen = {t for _, t in self._keys[lo:hi]}
+        count = self._count  # sync อาจลบ term ระหว่างอ่าน -> .get
+        return sorted(seen, key=lambda t: (-count.get(t, 0), t[1].lower(), t[0]))[:LIMIT_MAX]
+
+    def query(self, prefix: str, limit: int = 8) -> List[Dict[str, Any]]:
+        p = " ".join(prefix.lower().split())
+        if not p:
+            return []
+        limit = max(1, min(LIMIT_MAX, limit))
+        keys, count = self._keys, self._count
+        lo = bisect.bisect_left(keys, (p,))
+        hi = bisect.bisect_left(keys, (p + _END,), lo)
+        if hi - lo > _SCAN_MAX:
+            top = self._memo.get(p)
+            if top is None:
+                top = self._rank(lo, hi)
+                if len(self._memo) >= _MEMO_MAX:
+                    self._memo = {}
+                self._memo[p] = top
+        else:
+            top = self._rank(lo, hi)
+        return [{"text": t[1], "field": t[0], "count": count.get(t, 0)} for t in top[:limit]]
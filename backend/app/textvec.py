@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+SHD Careers — Text vectors (Phase 5)
+====================================
+TF-IDF แบบ sparse (dict term -> weight) ด้วย stdlib ล้วน (ไม่ต้องลง numpy/scikit-learn)
+ข้อมูลหลักพัน-หมื่นแถว + คำต่อแถวไม่กี่สิบ -> dict + inverted index เร็วพอและไม่ต้องพก dependency หนัก
+
+  tokens("Senior วิศวกรซอฟต์แวร์ 软件工程师")
+      ภาษาที่เว้นวรรค (อังกฤษ/ตัวเลข) -> ทีละคำ
+      ไทย (ไม่เว้นวรรค) -> shingle 3 ตัวอักษร, จีน -> 2 ตัวอักษร (ไม่ต้องตัดคำ)
+  Vectorizer().fit(docs) -> transform(doc) = {term: tf-idf} (L2 = 1 -> dot = cosine)
+  neighbours(vecs, k)    -> top-k ต่อแถว ผ่าน inverted index (คิดเฉพาะ candidate ที่มี term หนักร่วมกัน)
+  scores(query, vecs)    -> cosine ของ query กับทุกแถวในรอบเดียว (sparse matrix × vector)
+
+doc = list ของ (ข้อความ, น้ำหนัก) เช่น [(title, 3.0), (desc, 1.0)] — field สำคัญนับซ้ำหลายเท่า
+"""
+from __future__ import annotations
+
+import re
+import math
+import heapq
+from collections import Counter
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+Doc = Sequence[Tuple[str, float]]
+Vec = Dict[str, float]
+
+_RUN = re.compile(r"[a-z0-9][a-z0-9+#.]*|[\u0e00-\u0e7f]+|[\u3400-\u9fff]+", re.IGNORECASE)
+_STOP = frozenset(
+    "a an and are as at be by for from in is of on or the to with will our you your we "
+    "their this that have has years year experience".split()
+)
+
+
+def _shingle_n(c: str) -> int:
+    if "\u0e00" <= c <= "\u0e7f":  # ไทย
+        return 3
+    if "\u3400" <= c <= "\u9fff":  # จีน
+        return 2
+    return 0
+
+
+def shingle_starts(text: str) -> List[int]:
+    """ตำแหน่งเริ่มของทุก shingle ไทย/จีนใน text (ตรงกับที่ tokens ตัด) — suggest ใช้เป็นจุดขึ้นคำ"""
+    out: List[int] = []
+    for m in _RUN.finditer(text):
+        n = _shingle_n(m.group()[0])
+        if n:
+            out += range(m.start(), m.start() + max(1, len(m.group()) - n + 1))
+    return out
+
+
+def tokens(text: str) -> List[str]:
+    out: List[str] = []
+    for run in _RUN.findall((text or "").lower()):
+        n = _shingle_n(run[0])
+        if not n:
+            run = run.rstrip(".")
+            if len(run) > 1 and run not in _STOP:
+                out.append(run)
+            continue
+        if len(run) <= n:
+            out.append(run)
+        else:
+            out += [run[i:i + n] for i in range(len(run) - n + 1)]
+    return out
+
+
+def term_freq(doc: Doc, max_chars: int = 0) -> Dict[str, float]:
+    """max_chars > 0 -> ใช้แค่ต้นข้อความ (คำอธิบายยาวๆ ท้ายมักเป็น boilerplate)"""
+    tf: Dict[str, float] = {}
+    for text, weight in doc:
+        if max_chars:
+            text = (text or "")[:max_chars]
+        for t, c in Counter(tokens(text)).items():
+            tf[t] = tf.get(t, 0.0) + c * weight
+    return tf
+
+
+class Vectorizer:
+    """idf = log((1 + N) / (1 + df)) + 1 (smooth แบบ scikit-learn), tf = 1 + log(tf)"""
+
+    def __init__(self, max_terms: int = 0) -> None:
+        self.max_terms = max_terms  # > 0 -> เก็บแค่ term น้ำหนักสูงสุดต่อแถว (ตัด noise + เร็วขึ้น)
+        self.n_docs = 0
+        self.df: Dict[str, int] = {}
+
+    def fit(self, tfs: Iterable[Dict[str, float]]) -> "Vectorizer":
+        self.n_docs, self.df = 0, {}
+        for tf in tfs:
+            self.add(tf)
+        return self
+
+    def add(self, tf: Dict[str, float]) -> None:
+        """นับ document frequency เพิ่มทีละแถว (ให้ idf ตามข้อมูลที่เข้ามาใหม่ได้โดยไม่ fit ใหม่ทั้งก้อน)"""
+        self.n_docs += 1
+        df = self.df
+        for t in tf:
+            df[t] = df.get(t, 0) + 1
+
+    def remove(self, tf: Dict[str, float]) -> None:
+        """กลับด้านของ add (แถวที่ถูกลบ/ข้อความเปลี่ยน)"""
+        self.n_docs = max(0, self.n_docs - 1)
+        df = self.df
+        for t in tf:
+            n = df.get(t, 0) - 1
+            if n > 0:
+                df[t] = n
+            else:
+                df.pop(t, None)
+
+    def idf(self, term: str) -> float:
+        return math.log((1 + self.n_docs) / (1 + self.df.get(term, 0))) + 1.0
+
+    def transform(self, tf: Dict[str, float]) -> Vec:
+        vec = {t: (1.0 + math.log(f)) * self.idf(t) for t, f in tf.items() if f > 0}
+        if self.max_terms and len(vec) > self.max_terms:
+            vec = dict(heapq.nlargest(self.max_terms, vec.items(), key=lambda kv: kv[1]))
+        return normalize(vec)
+
+
+def normalize(vec: Vec) -> Vec:
+    norm = math.sqrt(sum(w * w for w in vec.values()))
+    return {t: w / norm for t, w in vec.items()} if norm else {}
+
+
+def dot(a: Vec, b: Vec) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(w * b.get(t, 0.0) for t, w in a.items())
+
+
+def scores(query: Vec, vecs: Dict[str, Vec]) -> Dict[str, float]:
+    """cosine ของ query กับทุกแถว (แถวที่ไม่มี term ร่วม = 0) — ไล่ตาม postings ของ term ใน query เท่านั้น"""
+    postings: Dict[str, List[Tuple[str, float]]] = {t: [] for t in query}
+    for key, vec in vecs.items():
+        for t, w in vec.items():
+            p = postings.get(t)
+            if p is not None:
+                p.append((key, w))
+    out = dict.fromkeys(vecs, 0.0)
+    for t, wq in query.items():
+        for key, w in postings[t]:
+            out[key] += wq * w
+    return out
+
+
+def neighbours(
+    vecs: Dict[str, Vec], k: int, min_score: float = 0.0, probe_terms: int = 12, probe_postings: int = 64
+) -> Dict[str, List[Tuple[str, float]]]:
+    """top-k (id, cosine) ต่อแถว เรียงมากไปน้อย — ประมาณแบบ inverted index แล้วคิด cosine เต็มเฉพาะ candidate
+    candidate = แถวที่น้ำหนักสูงสุด probe_postings อันดับแรกของ term ที่หนักสุด probe_terms ตัวของแถวนี้
+    (term ที่เจอแทบทุกแถวมี postings ยาวแต่ไม่ช่วยแยก -> ไม่ต้องไล่ทั้งหมด) => O(แถว × probe_terms × probe_postings)"""
+    postings: Dict[str, List[Tuple[float, str]]] = {}
+    for key, vec in vecs.items():
+        for t, w in vec.items():
+            postings.setdefault(t, []).append((w, key))
+    for t, p in postings.items():
+        if len(p) > probe_postings:
+            postings[t] = heapq.nlargest(probe_postings, p)
+
+    out: Dict[str, List[Tuple[str, float]]] = {}
+    for key, vec in vecs.items():
+        acc: Dict[str, float] = {}
+        for t, w in heapq.nlargest(probe_terms, vec.items(), key=lambda kv: kv[1]):
+            for w2, other in postings[t]:
+                if other != key:
+                    acc[other] = acc.get(other, 0.0) + w * w2
+        cand = heapq.nlargest(k * 3, acc, key=acc.__getitem__)
+        top = heapq.nlargest(k, ((o, dot(vec, vecs[o])) for o in cand), key=lambda kv: (kv[1], kv[0]))
+        out[key] = [(o, round(s, 4)) for o, s in top if s > min_score]
+    return out
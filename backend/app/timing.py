@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+SHD Careers — Request timing (Phase 5)
+======================================
+จับเวลาทุก upstream call ต่อ request แล้วรวมตามหมวด:
+
+  db       Supabase PostgREST (table().…execute())
+  storage  Supabase Storage (upload / remove / download)
+  sign     ออก signed URL (create_signed_url / create_signed_urls)
+  replica  read replica ใน SQLite (ดู replica.py)
+  feed     Google Apps Script jobs feed
+  sheets   push ใบสมัครเข้า Google Sheet
+
+ผลลัพธ์:
+  - header  Server-Timing: db;dur=41.2;desc="3 calls", sign;dur=80.0;desc="1 calls", total;dur=130.5
+  - header  X-Request-ID (รับจาก client ได้ ถ้าไม่มีจะสร้างให้)
+  - log 1 บรรทัด/request (JSON) ที่ logger "shd-careers.timing" พร้อม request id เดียวกัน
+
+Server-Timing ส่งพร้อม header (ตอนเริ่มตอบ) — response แบบ streaming (export) จะเห็นเฉพาะเวลาก่อนเริ่มส่ง
+ส่วน log บรรทัดสุดท้ายเขียนหลังส่ง body ครบ จึงรวมทุก call
+"""
+from __future__ import annotations
+
+import os
+import re
+import json
+import time
+import uuid
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger("shd-careers.timing")
+
+# log เฉพาะ request ที่ช้ากว่านี้ (ms) — 0 = log ทุก request
+TIMING_LOG_MIN_MS = float(os.getenv("TIMING_LOG_MIN_MS", "0"))
+
+_CURRENT: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar("shd_request_timing", default=None)
+_REQUEST_ID: ContextVar[str] = ContextVar("shd_request_id", default="")
+_RID_RE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+def request_id() -> str:
+    return _REQUEST_ID.get()
+
+
+# observer ได้ทุก call (ทั้งใน/นอก request) — fn(category, seconds, failed) เช่น metrics.observe_upstream
+_OBSERVERS: List[Callable[[str, float, bool], None]] = []
+
+
+def add_observer(fn: Callable[[str, float, bool], None]) -> None:
+    if fn not in _OBSERVERS:
+        _OBSERVERS.append(fn)
+
+
+@contextmanager
+def span(category: str) -> Iterator[None]:
+    """จับเวลาช่วงหนึ่งแล้วบวกเข้าหมวดของ request ปัจจุบัน + แจ้ง observer"""
+    acc = _CURRENT.get()
+    if acc is None and not _OBSERVERS:
+        yield
+        return
+    t0 = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        dt = time.perf_counter() - t0
+        if acc is not None:
+            ent = acc.setdefault(category, [0.0, 0])
+            ent[0] += dt * 1000
+            ent[1] += 1
+        for fn in _OBSERVERS:
+            fn(category, dt, failed)
+
+
+# ---------------------------
+# Client proxies — ห่อ client ของ Supabase / LocalClient ให้จับเวลาเองทุก call
+# ---------------------------
+class _TimedQuery:
+    """ห่อ request builder: method ที่คืน builder ต่อ -> ห่อต่อ, execute() -> จับเวลา"""
+
+    __slots__ = ("_q", "_cat")
+
+    def __init__(self, q: Any, cat: str) -> None:
+        self._q = q
+        self._cat = cat
+
+    def execute(self, *a: Any, **kw: Any) -> Any:
+        with span(self._cat):
+            return self._q.execute(*a, **kw)
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._q, name)
+        if not callable(attr):
+            return _TimedQuery(attr, self._cat) if hasattr(attr, "execute") else attr
+        cat = self._cat
+
+        def call(*a: Any, **kw: Any) -> Any:
+            res = attr(*a, **kw)
+            return _TimedQuery(res, cat) if hasattr(res, "execute") else res
+
+        return call
+
+
+class _TimedBucket:
+    __slots__ = ("_b",)
+
+    def __init__(self, bucket: Any) -> None:
+        self._b = bucket
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._b, name)
+        if not callable(attr):
+            return attr
+        cat = "sign" if name.startswith("create_signed") else "storage"
+
+        def call(*a: Any, **kw: Any) -> Any:
+            with span(cat):
+                return attr(*a, **kw)
+
+        return call
+
+
+class _TimedStorage:
+    __slots__ = ("_s",)
+
+    def __init__(self, storage: Any) -> None:
+        self._s = storage
+
+    def from_(self, bucket: str) -> _TimedBucket:
+        return _TimedBucket(self._s.from_(bucket))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._s, name)
+
+
+class TimedClient:
+    __slots__ = ("_c", "_cat")
+
+    def __init__(self, client: Any, cat: str = "db") -> None:
+        self._c = client
+        self._cat = cat
+
+    def table(self, name: str) -> _TimedQuery:
+        return _TimedQuery(self._c.table(name), self._cat)
+
+    def from_(self, name: str) -> _TimedQuery:
+        return self.table(name)
+
+    def rpc(self, *a: Any, **kw: Any) -> _TimedQuery:
+        return _TimedQuery(self._c.rpc(*a, **kw), self._cat)
+
+    @property
+    def storage(self) -> _TimedStorage:
+        return _TimedStorage(self._c.storage)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._c, name)
+
+
+def instrument(client: Any, cat: str = "db") -> Any:
+    if client is None or isinstance(client, TimedClient):
+        return client
+    return TimedClient(client, cat)
+
+
+def unwrap(client: Any) -> Any:
+    """client จริงใต้ TimedClient — instrument() สร้าง wrapper ใหม่ทุกครั้ง ใช้ตัวนี้เป็น key ของ cache ต่อ DB"""
+    return client._c if isinstance(client, TimedClient) else client
+
+
+# ---------------------------
+# ASGI middleware
+# ---------------------------
+def server_timing(acc: Dict[str, List[float]], total_ms: float) -> str:
+    parts = [f'{cat};dur={ms:.1f};desc="{n} calls"' for cat, (ms, n) in sorted(acc.items())]
+    parts.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(parts)
+
+
+class TimingMiddleware:
+    """ASGI middleware (ไม่ใช้ BaseHTTPMiddleware -> ไม่สร้าง task เพิ่ม, streaming ไม่สะดุด)"""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rid = ""
+        for k, v in scope.get("headers") or []:
+            if k == b"x-request-id":
+                rid = v.decode("latin-1").strip()
+                break
+        if not _RID_RE.match(rid):
+            rid = uuid.uuid4().hex[:16]
+
+        acc: Dict[str, List[float]] = {}
+        tok_acc = _CURRENT.set(acc)
+        tok_rid = _REQUEST_ID.set(rid)
+        t0 = time.perf_counter()
+        status = [500]
+
+        async def send_timed(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                total = (time.perf_counter() - t0) * 1000
+                headers = list(message.get("headers") or [])
+                headers.append((b"server-timing", server_timing(acc, total).encode("latin-1")))
+                headers.append((b"x-request-id", rid.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            total = (time.perf_counter() - t0) * 1000
+            _CURRENT.reset(tok_acc)
+            _REQUEST_ID.reset(tok_rid)
+            if total >= TIMING_LOG_MIN_MS:
+                logger.info(
+                    json.dumps(
+                        {
+                            "rid": rid,
+                            "method": scope.get("method"),
+                            "path": scope.get("path"),
+                            "status": status[0],
+                            "ms": round(total, 1),
+                            "upstream": {c: {"ms": round(ms, 1), "n": n} for c, (ms, n) in sorted(acc.items())},
+                        },
+                        separators=(",", ":"),
+                    )
+                )
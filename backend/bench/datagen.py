@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+สร้างข้อมูลสังเคราะห์ (deterministic) สำหรับ benchmark / load test
+
+  jobs           3 ภาษา (th/en/zh) — ชื่อตำแหน่ง สถานที่ รายละเอียด คุณสมบัติ
+  applications   ชื่อไทย/อังกฤษ, สถานะ/ช่องทางกระจายแบบของจริง, created_at ย้อนหลัง --days วัน
+  ตารางลูก       application_educations / experiences / skills / attachments (จำนวนสุ่มต่อใบสมัคร)
+
+เขียนผ่าน builder ของ supabase-py -> ใช้ได้ทั้ง LocalClient (STORAGE_BACKEND=local / stub ใน bench/stubs.py)
+และ Supabase โปรเจกต์ทดสอบ ส่งเป็นก้อนๆ (--batch) ใช้ memory คงที่แม้สร้าง 200k ใบสมัคร
+id ผูกกับลำดับ (index) -> รันต่อจากของเดิมได้ด้วย --start (เช่นขยาย 5k -> 50k)
+
+วิธีใช้ (รันจากโฟลเดอร์ backend):
+  python3 bench/datagen.py --db ./data/local.db --jobs 300 --applications 50000
+  python3 bench/datagen.py --db ./data/local.db --applications 200000 --start 50000 --no-jobs
+  python3 bench/datagen.py --supabase --applications 5000      # SUPABASE_URL/KEY จาก env — ใช้กับโปรเจกต์ทดสอบเท่านั้น
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import datetime as _dt
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# (en, th, zh)
+DEPARTMENTS = ["Engineering", "Sales", "Marketing", "Finance", "Operations", "Human Resources", "Customer Service", "R&D"]
+LEVELS = ["Intern", "Junior", "Mid", "Senior", "Lead", "Manager"]
+COUNTRIES = ["Thailand", "China", "Vietnam", "Malaysia", "Singapore"]
+ROLES = [
+    ("Backend Engineer", "วิศวกรซอฟต์แวร์ฝั่งระบบ", "后端工程师"),
+    ("Frontend Engineer", "วิศวกรซอฟต์แวร์ฝั่งหน้าเว็บ", "前端工程师"),
+    ("Data Analyst", "นักวิเคราะห์ข้อมูล", "数据分析师"),
+    ("Sales Executive", "เจ้าหน้าที่ฝ่ายขาย", "销售专员"),
+    ("Key Account Manager", "ผู้จัดการฝ่ายลูกค้าองค์กร", "大客户经理"),
+    ("Marketing Specialist", "ผู้เชี่ยวชาญด้านการตลาด", "市场专员"),
+    ("Accountant", "นักบัญชี", "会计"),
+    ("Financial Analyst", "นักวิเคราะห์การเงิน", "财务分析师"),
+    ("Warehouse Supervisor", "หัวหน้าคลังสินค้า", "仓库主管"),
+    ("Logistics Coordinator", "เจ้าหน้าที่ประสานงานโลจิสติกส์", "物流协调员"),
+    ("HR Business Partner", "พันธมิตรธุรกิจฝ่ายบุคคล", "人力资源业务伙伴"),
+    ("Recruiter", "เจ้าหน้าที่สรรหาบุคลากร", "招聘专员"),
+    ("Customer Support Agent", "เจ้าหน้าที่บริการลูกค้า", "客户支持专员"),
+    ("Battery Test Engineer", "วิศวกรทดสอบแบตเตอรี่", "电池测试工程师"),
+    ("Charging Station Technician", "ช่างเทคนิคสถานีชาร์จ", "充电站技术员"),
+    ("Quality Engineer", "วิศวกรควบคุมคุณภาพ", "质量工程师"),
+    ("Product Manager", "ผู้จัดการผลิตภัณฑ์", "产品经理"),
+    ("Graphic Designer", "นักออกแบบกราฟิก", "平面设计师"),
+]
+LOCATIONS = [
+    ("Bangkok", "กรุงเทพมหานคร", "曼谷"),
+    ("Chonburi", "ชลบุรี", "春武里"),
+    ("Rayong", "ระยอง", "罗勇"),
+    ("Chiang Mai", "เชียงใหม่", "清迈"),
+    ("Shenzhen", "เซินเจิ้น", "深圳"),
+    ("Ho Chi Minh City", "โฮจิมินห์", "胡志明市"),
+]
+DESC = {
+    "en": ["Own day-to-day delivery for the {role} function.", "Work closely with regional teams in {loc}.",
+           "Improve processes, reporting and customer experience.", "Support product launches across Southeast Asia."],
+    "th": ["รับผิดชอบงานประจำวันของตำแหน่ง {role}", "ทำงานร่วมกับทีมภูมิภาคที่ {loc}",
+           "ปรับปรุงกระบวนการ รายงาน และประสบการณ์ลูกค้า", "สนับสนุนการเปิดตัวผลิตภัณฑ์ในเอเชียตะวันออกเฉียงใต้"],
+    "zh": ["负责{role}岗位的日常工作。", "与{loc}的区域团队紧密合作。", "优化流程、报表和客户体验。", "支持东南亚地区的产品发布。"],
+}
+QUAL = {
+    "en": ["Bachelor's degree or higher", "{years}+ years of relevant experience", "Good command of English",
+           "Chinese is a plus", "Strong communication skills"],
+    "th": ["ปริญญาตรีขึ้นไป", "มีประสบการณ์ที่เกี่ยวข้อง {years} ปีขึ้นไป", "สื่อสารภาษาอังกฤษได้ดี",
+           "สื่อสารภาษาจีนได้จะพิจารณาเป็นพิเศษ", "มีทักษะการสื่อสารที่ดี"],
+    "zh": ["本科及以上学历", "{years}年以上相关经验", "英语沟通良好", "会中文优先", "沟通能力强"],
+}
+
+FIRST_NAMES = ["Somchai", "Somsak", "Suda", "Malee", "Niran", "Kanya", "Anan", "Ploy", "Nattapong", "Siriporn",
+               "Wei", "Li", "Minh", "Linh", "John", "Emily", "Arthit", "Pimchanok", "Thanakorn", "Chutima",
+               "สมชาย", "สุดา", "มาลี", "ณัฐพงษ์", "ศิริพร"]
+LAST_NAMES = ["Srisuk", "Wongsawat", "Chaiyaporn", "Rattanakorn", "Saetang", "Boonmee", "Kittisak", "Zhang",
+              "Nguyen", "Tran", "Smith", "Lee", "ศรีสุข", "วงศ์สวัสดิ์", "บุญมี"]
+INSTITUTES = ["Chulalongkorn University", "Mahidol University", "Kasetsart University", "Thammasat University",
+              "KMUTT", "Chiang Mai University", "มหาวิทยาลัยขอนแก่น", "Tsinghua University"]
+PROGRAMS = ["Computer Engineering", "Business Administration", "Accounting", "Electrical Engineering",
+            "Marketing", "Logistics Management", "Economics", "Industrial Engineering"]
+COMPANIES = ["PTT", "SCG", "CP All", "Central Group", "True Corporation", "AIS", "Kerry Express", "Lazada",
+             "Shopee", "Delta Electronics", "Huawei", "BYD"]
+SKILLS = ["python", "sql", "excel", "power bi", "sap", "autocad", "react", "docker", "negotiation", "english",
+          "chinese", "ภาษาอังกฤษ", "การขาย", "บัญชี", "project management", "customer service", "figma", "aws"]
+# น้ำหนักใกล้เคียงของจริง: ส่วนใหญ่ยังไม่ได้ดู
+STATUS_WEIGHTS = [("new", 55), ("reviewing", 18), ("shortlisted", 10), ("rejected", 14), ("hired", 3)]
+SOURCE_WEIGHTS = [("linkedin", 30), ("jobsdb", 25), ("website", 20), ("referral", 10), ("facebook", 10), ("", 5)]
+ATTACH_NAMES = ["portfolio.pdf", "certificate.pdf", "transcript.pdf", "photo.jpg", "recommendation.docx"]
+
+
+def _weighted(rnd, pairs):
+    vals, weights = zip(*pairs)
+    return rnd.choices(vals, weights=weights, k=1)[0]
+
+
+def app_id(n):
+    return f"00000000-0000-4000-8000-{n:012d}"
+
+
+def job_id(i):
+    return f"J{i:05d}"
+
+
+def gen_jobs(count, seed=42):
+    rnd = random.Random(seed)
+    for i in range(count):
+        role = rnd.choice(ROLES)
+        loc = rnd.choice(LOCATIONS)
+        years = rnd.randint(0, 8)
+        row = {
+            "job_id": job_id(i),
+            "status": _weighted(rnd, [("published", 80), ("draft", 8), ("closed", 12)]),
+            "country": rnd.choice(COUNTRIES),
+            "department": rnd.choice(DEPARTMENTS),
+            "level": rnd.choice(LEVELS),
+            "quantity": rnd.randint(1, 5),
+        }
+        for k, lang in enumerate(("en", "th", "zh")):
+            row[f"title_{lang}"] = role[k]
+            row[f"location_{lang}"] = loc[k]
+            row[f"desc_{lang}"] = "\n".join(
+                s.format(role=role[k], loc=loc[k]) for s in rnd.sample(DESC[lang], rnd.randint(2, 4))
+            )
+            row[f"qual_{lang}"] = "\n".join(
+                s.format(years=years) for s in rnd.sample(QUAL[lang], rnd.randint(2, 5))
+            )
+        yield row
+
+
+def gen_application(n, jobs, now, days, seed=42):
+    """1 ใบสมัคร + ตารางลูก (สุ่มจาก seed + n -> ได้ผลเดิมทุกครั้งไม่ว่าสร้างเป็นก้อนไหน)"""
+    rnd = random.Random(seed * 1_000_003 + n)
+    job = rnd.choice(jobs)
+    aid = app_id(n)
+    first, last = rnd.choice(FIRST_NAMES), rnd.choice(LAST_NAMES)
+    created = now - _dt.timedelta(seconds=rnd.randint(0, days * 86400))
+    status = _weighted(rnd, STATUS_WEIGHTS)
+    app = {
+        "id": aid,
+        "job_id": job["job_id"],
+        "country": job["country"],
+        "department": job["department"],
+        "level": job["level"],
+        "first_name": first,
+        "last_name": last,
+        "email": f"{first.lower() if first.isascii() else 'user'}.{n}@example.com",
+        "phone": f"0{rnd.choice('689')}{rnd.randint(0, 99_999_999):08d}",
+        "address": rnd.choice(LOCATIONS)[rnd.randint(0, 1)],
+        "visa_required": rnd.random() < 0.15,
+        "available_start_date": (created + _dt.timedelta(days=rnd.randint(7, 90))).date().isoformat(),
+        "website_url": f"https://linkedin.com/in/cand{n}" if rnd.random() < 0.3 else "",
+        "source_channel": _weighted(rnd, SOURCE_WEIGHTS),
+        "terms_accepted": True,
+        "resume_url": f"storage:applications/{aid}/resume_cv.pdf",
+        "transcript_url": f"storage:applications/{aid}/transcript_transcript.pdf" if rnd.random() < 0.3 else None,
+        "status": status,
+        "admin_note": "โทรนัดสัมภาษณ์แล้ว" if status in ("shortlisted", "hired") and rnd.random() < 0.5 else "",
+        "reviewed_at": created.isoformat() if status != "new" else None,
+        "created_at": created.isoformat(),
+    }
+    edus = [{
+        "application_id": aid,
+        "degree_level": rnd.choice(["bachelor", "master", "diploma", "doctorate"]),
+        "institute": rnd.choice(INSTITUTES),
+        "program": rnd.choice(PROGRAMS),
+        "start_month": f"{2005 + k * 4 + rnd.randint(0, 6)}-0{rnd.randint(1, 9)}",
+        "end_month": f"{2009 + k * 4 + rnd.randint(0, 6)}-0{rnd.randint(1, 9)}",
+        "degree_type": rnd.choice(["full-time", "part-time"]),
+        "gpa": f"{rnd.uniform(2.2, 4.0):.2f}",
+    } for k in range(rnd.randint(1, 3))]
+    exps = [{
+        "application_id": aid,
+        "company": rnd.choice(COMPANIES),
+        "role": rnd.choice(ROLES)[rnd.randint(0, 1)],
+        "start_month": f"{2012 + k * 2}-0{rnd.randint(1, 9)}",
+        "end_month": f"{2014 + k * 2}-0{rnd.randint(1, 9)}",
+    } for k in range(rnd.randint(0, 4))]
+    skills = [{"application_id": aid, "skill": s} for s in rnd.sample(SKILLS, rnd.randint(2, 8))]
+    atts = [{
+        "application_id": aid,
+        "file_name": name,
+        "file_url": f"storage:applications/{aid}/att_{name}",
+    } for name in rnd.sample(ATTACH_NAMES, rnd.randint(0, 3))]
+    return app, edus, exps, skills, atts
+
+
+CHILD_TABLES = ("application_educations", "application_experiences", "application_skills", "application_attachments")
+
+
+def load_jobs(client, count, seed=42, batch=500):
+    rows = list(gen_jobs(count, seed))
+    for i in range(0, len(rows), batch):
+        client.table("jobs").upsert(rows[i:i + batch], on_conflict="job_id").execute()
+    return rows
+
+
+def load_applications(client, jobs, count, start=0, seed=42, batch=1000, days=365, progress=None):
+    """สร้างใบสมัคร index [start, start+count) เป็นก้อนละ batch -> คืนจำนวนแถวต่อตาราง"""
+    now = _dt.datetime.now(_dt.timezone.utc)
+    totals = {"applications": 0, **{t: 0 for t in CHILD_TABLES}}
+    end = start + count
+    for lo in range(start, end, batch):
+        apps = []
+        children = {t: [] for t in CHILD_TABLES}
+        for n in range(lo, min(end, lo + batch)):
+            app, *kids = gen_application(n, jobs, now, days, seed)
+            apps.append(app)
+            for t, rows in zip(CHILD_TABLES, kids):
+                children[t].extend(rows)
+        client.table("applications").upsert(apps, on_conflict="id").execute()
+        totals["applications"] += len(apps)
+        for t, rows in children.items():
+            for i in range(0, len(rows), batch):
+                client.table(t).insert(rows[i:i + batch]).execute()
+            totals[t] += len(rows)
+        if progress:
+            progress(min(end, lo + batch) - start, count)
+    return totals
+
+
+def load(client, jobs=200, applications=2000, start=0, seed=42, batch=1000, days=365, with_jobs=True):
+    """jobs + applications ในคำสั่งเดียว -> (job rows, totals)"""
+    job_rows = load_jobs(client, jobs, seed) if with_jobs else list(gen_jobs(jobs, seed))
+    totals = load_applications(client, job_rows, applications, start, seed, batch, days)
+    return job_rows, totals
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Synthetic jobs/applications generator")
+    tgt = ap.add_mutually_exclusive_group(required=True)
+    tgt.add_argument("--db", help="ไฟล์ SQLite ของ STORAGE_BACKEND=local (สร้าง schema ให้ถ้ายังไม่มี)")
+    tgt.add_argument("--supabase", action="store_true", help="เขียนเข้า Supabase ตาม SUPABASE_URL/SUPABASE_SERVICE_ROLE_KEY")
+    ap.add_argument("--jobs", type=int, default=300)
+    ap.add_argument("--applications", type=int, default=5000)
+    ap.add_argument("--start", type=int, default=0, help="index ใบสมัครแรก (ต่อจากชุดเดิมได้)")
+    ap.add_argument("--no-jobs", action="store_true", help="ไม่เขียน jobs (มีอยู่แล้วจากรอบก่อน)")
+    ap.add_argument("--days", type=int, default=365, help="กระจาย created_at ย้อนหลังกี่วัน")
+    ap.add_argument("--batch", type=int, default=1000)
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    if args.db:
+        from app.store import LocalClient
+
+        client = LocalClient(args.db)
+        target = args.db
+    else:
+        from supabase import create_client
+
+        url = os.getenv("SUPABASE_URL", "").strip()
+        key = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "").strip()
+        if not url or not key:
+            print("❌ ไม่พบ SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY")
+            sys.exit(1)
+        client = create_client(url, key)
+        target = url
+
+    t0 = time.time()
+    print(f"เขียนลง {target}")
+    job_rows = load_jobs(client, args.jobs, args.seed) if not args.no_jobs else list(gen_jobs(args.jobs, args.seed))
+
+    def progress(done, total):
+        print(f"\r  applications {done}/{total} ({done / max(time.time() - t0, 1e-6):.0f}/s)", end="", flush=True)
+
+    totals = load_applications(client, job_rows, args.applications, args.start, args.seed, args.batch, args.days,
+                               progress)
+    print()
+    print(f"✅ jobs {0 if args.no_jobs else len(job_rows)} | " + " | ".join(f"{k} {v}" for k, v in totals.items())
+          + f" | {time.time() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
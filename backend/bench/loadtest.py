@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Load test แบบ end-to-end โดยไม่แตะ Supabase / Apps Script ตัวจริง
+
+  1) เปิด stub (bench/stubs.py) แทน PostgREST + Storage + jobs feed + Sheets แล้ว seed ข้อมูล
+  2) รัน API จริง (uvicorn app.main:app) ชี้ไปที่ stub
+  3) ยิง scenario ตาม concurrency ที่กำหนด แล้วสรุปต่อ scenario:
+       requests / errors / RPS / p50 / p95 / p99 (ms) / peak RSS ของ process API (MB)
+
+Scenarios:
+  browse   GET /jobs?lang=… -> GET /jobs/{id} -> GET /content
+  search   GET /jobs?q=…&department=…
+  apply    POST /apply/{id} พร้อม resume + ไฟล์แนบ (ขนาดตาม --upload-kb)
+  admin    GET /admin/applications (filter/ค้นหา/แบ่งหน้า) -> GET รายละเอียด -> PATCH status -> GET /admin/stats
+
+วิธีใช้ (รันจากโฟลเดอร์ backend):
+  python3 bench/loadtest.py
+  python3 bench/loadtest.py --scenarios browse,admin --concurrency 32 --duration 20 --db-ms 15 --storage-ms 40
+  python3 bench/loadtest.py --inproc            # ไม่ต้องมี uvicorn (ยิงผ่าน ASGI ใน process เดียว — ตัวเลขใช้เทียบกันเองเท่านั้น)
+  python3 bench/loadtest.py --target http://127.0.0.1:8000 --admin-password …   # ยิงเซิร์ฟเวอร์ที่รันอยู่แล้ว (ไม่เปิด stub)
+  python3 bench/loadtest.py --json results.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import tempfile
+import threading
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import httpx  # noqa: E402
+
+from bench import datagen, stubs  # noqa: E402
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SEARCH_TERMS = ["engineer", "sales", "data", "battery", "manager", "analyst", "วิศวกร", "บัญชี"]
+
+
+# ---------------------------
+# Measurement
+# ---------------------------
+def percentile(sorted_vals, p):
+    if not sorted_vals:
+        return 0.0
+    k = (len(sorted_vals) - 1) * p / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_vals) - 1)
+    return sorted_vals[lo] + (sorted_vals[hi] - sorted_vals[lo]) * (k - lo)
+
+
+def rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return 0.0
+
+
+class RssSampler:
+    """อ่าน VmRSS ทุก 50ms ระหว่าง scenario -> peak (Linux; ที่อื่นได้ 0)"""
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.peak = 0.0
+        self._stop = threading.Event()
+        self._t = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, rss_mb(self.pid))
+            self._stop.wait(0.05)
+
+    def __enter__(self):
+        self._t.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._t.join()
+        self.peak = max(self.peak, rss_mb(self.pid))
+
+
+class Recorder:
+    def __init__(self):
+        self.lat = []  # ms
+        self.by_step = {}
+        self.errors = 0
+        self.codes = {}
+
+    async def call(self, client, step, method, url, ok=(200,), **kw):
+        t0 = time.perf_counter()
+        try:
+            r = await client.request(method, url, **kw)
+            code = r.status_code
+        except httpx.HTTPError:
+            r, code = None, 0
+        ms = (time.perf_counter() - t0) * 1000
+        self.lat.append(ms)
+        self.by_step.setdefault(step, []).append(ms)
+        self.codes[code] = self.codes.get(code, 0) + 1
+        if code not in ok:
+            self.errors += 1
+            return None
+        return r
+
+
+# ---------------------------
+# Scenarios
+# ---------------------------
+class Context:
+    def __init__(self, job_ids, app_ids, token, upload_kb, rnd_seed):
+        self.job_ids = job_ids
+        self.app_ids = app_ids
+        self.token = token
+        self.upload = os.urandom(max(1, upload_kb) * 1024)
+        self.rnd = random.Random(rnd_seed)
+
+    @property
+    def admin_headers(self):
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+async def browse(ctx, c, rec):
+    lang = ctx.rnd.choice(["th", "en", "zh"])
+    await rec.call(c, "list", "GET", "/jobs", params={"lang": lang})
+    await rec.call(c, "detail", "GET", f"/jobs/{ctx.rnd.choice(ctx.job_ids)}", params={"lang": lang})
+    await rec.call(c, "content", "GET", "/content", params={"lang": lang})
+
+
+async def search(ctx, c, rec):
+    params = {"lang": ctx.rnd.choice(["th", "en"]), "q": ctx.rnd.choice(SEARCH_TERMS)}
+    if ctx.rnd.random() < 0.5:
+        params["department"] = ctx.rnd.choice(datagen.DEPARTMENTS)
+    await rec.call(c, "search", "GET", "/jobs", params=params)
+
+
+async def apply(ctx, c, rec):
+    n = ctx.rnd.randint(0, 10 ** 9)
+    data = {
+        "first_name": f"Load{n}", "last_name": "Test", "email": f"load{n}@example.com", "phone": "0800000000",
+        "skills": "python, sql", "education_json": json.dumps([{"degree_level": "bachelor", "institute": "KU"}]),
+        "experience_json": json.dumps([{"company": "Acme", "role": "Engineer"}]),
+    }
+    files = [
+        ("resume", ("cv.pdf", ctx.upload, "application/pdf")),
+        ("attachments", ("portfolio.pdf", ctx.upload, "application/pdf")),
+        ("attachments", ("cert.png", ctx.upload[: len(ctx.upload) // 2], "image/png")),
+    ]
+    await rec.call(c, "apply", "POST", f"/apply/{ctx.rnd.choice(ctx.job_ids)}", data=data, files=files)
+
+
+async def admin(ctx, c, rec):
+    h = ctx.admin_headers
+    params = {"page": ctx.rnd.randint(1, 5), "page_size": 20}
+    roll = ctx.rnd.random()
+    if roll < 0.3:
+        params["status"] = ctx.rnd.choice(["new", "reviewing", "shortlisted"])
+    elif roll < 0.5:
+        params["q"] = ctx.rnd.choice(datagen.FIRST_NAMES)
+    r = await rec.call(c, "list", "GET", "/admin/applications", headers=h, params=params)
+    rows = (r.json().get("rows") or []) if r is not None else []
+    aid = (ctx.rnd.choice(rows).get("id") if rows else None) or (ctx.rnd.choice(ctx.app_ids) if ctx.app_ids else None)
+    if aid:
+        await rec.call(c, "detail", "GET", f"/admin/applications/{aid}", headers=h)
+        await rec.call(c, "status", "PATCH", f"/admin/applications/{aid}", headers=h,
+                       json={"status": ctx.rnd.choice(["reviewing", "shortlisted", "new"])})
+    await rec.call(c, "stats", "GET", "/admin/stats", headers=h)
+
+
+SCENARIOS = {"browse": browse, "search": search, "apply": apply, "admin": admin}
+
+
+async def run_scenario(name, make_client, ctx, concurrency, duration, max_iterations, pid):
+    fn = SCENARIOS[name]
+    rec = Recorder()
+    deadline = [0.0]
+    budget = [max_iterations or 0]
+
+    async def worker(c):
+        while time.perf_counter() < deadline[0]:
+            if max_iterations:
+                if budget[0] <= 0:
+                    return
+                budget[0] -= 1
+            await fn(ctx, c, rec)
+
+    async with make_client() as c:
+        await fn(ctx, c, Recorder())  # warm-up 1 รอบ (cache / connection) ไม่นับ
+        with RssSampler(pid) as rss:
+            t0 = time.perf_counter()
+            deadline[0] = t0 + duration
+            await asyncio.gather(*(worker(c) for _ in range(concurrency)))
+            wall = time.perf_counter() - t0
+    lat = sorted(rec.lat)
+    return {
+        "scenario": name,
+        "concurrency": concurrency,
+        "requests": len(lat),
+        "errors": rec.errors,
+        "status_codes": {str(k): v for k, v in sorted(rec.codes.items())},
+        "wall_sec": round(wall, 3),
+        "rps": round(len(lat) / wall, 1) if wall else 0.0,
+        "p50_ms": round(percentile(lat, 50), 2),
+        "p95_ms": round(percentile(lat, 95), 2),
+        "p99_ms": round(percentile(lat, 99), 2),
+        "peak_rss_mb": round(rss.peak, 1),
+        "steps": {
+            s: {"n": len(v), "p50_ms": round(percentile(sorted(v), 50), 2), "p95_ms": round(percentile(sorted(v), 95), 2)}
+            for s, v in rec.by_step.items()
+        },
+    }
+
+
+# ---------------------------
+# API process
+# ---------------------------
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def app_env(stub_base, admin_password):
+    return {
+        "APP_ENV": "bench",
+        "METRICS_TOKEN": "bench-metrics",  # นอก local/dev ไม่มี token = ปิด metrics -> วัดต่างจาก production
+        "STORAGE_BACKEND": "supabase",
+        "SUPABASE_URL": stub_base,
+        "SUPABASE_SERVICE_ROLE_KEY": stubs.FAKE_SERVICE_KEY,
+        "SUPABASE_BUCKET": "careers",
+        "GOOGLE_JOBS_FEED_URL": f"{stub_base}/feed",
+        "APPS_SCRIPT_APPLY_SHEET_URL": f"{stub_base}/sheets",
+        "APPLY_SHEET_API_KEY": "bench",
+        "ADMIN_PASSWORD": admin_password,
+        "ADMIN_JWT_SECRET": "bench-secret",
+        "READ_REPLICA_ENABLED": "false",
+        "SNAPSHOT_DIR": "",
+        "SNAPSHOT_BUCKET": "",
+        "TIMING_LOG_MIN_MS": "60000",  # ไม่ให้ log ต่อ request ไปกวนตัวเลข
+        "LOG_LEVEL": "WARNING",
+    }
+
+
+def start_uvicorn(env, port, workers):
+    cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+           "--log-level", "warning", "--no-access-log", "--workers", str(workers)]
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, env={**os.environ, **env})
+    base = f"http://127.0.0.1:{port}"
+    for _ in range(300):
+        if proc.poll() is not None:
+            raise SystemExit(f"❌ uvicorn exited with code {proc.returncode} (ติดตั้ง requirements.txt แล้วหรือยัง? ลอง --inproc)")
+        try:
+            if httpx.get(f"{base}/health", timeout=1.0).status_code == 200:
+                return proc, base
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    proc.terminate()
+    raise SystemExit("❌ API did not become healthy within 30s")
+
+
+async def fetch_ids(make_client, admin_password):
+    async with make_client() as c:
+        r = await c.post("/admin/login", json={"password": admin_password})
+        token = r.json().get("token") if r.status_code == 200 else ""
+        jobs = (await c.get("/jobs", params={"lang": "en"})).json().get("rows") or []
+        app_ids = []
+        if token:
+            r = await c.get("/admin/applications", params={"page_size": 100},
+                            headers={"Authorization": f"Bearer {token}"})
+            app_ids = [x["id"] for x in (r.json().get("rows") or [])]
+    return [j["job_id"] for j in jobs], app_ids, token
+
+
+def print_table(results):
+    cols = ("scenario", "concurrency", "requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms", "peak_rss_mb")
+    print("  ".join(f"{c:>12}" for c in cols))
+    for r in results:
+        print("  ".join(f"{r[c]:>12}" for c in cols))
+
+
+async def main_async(args):
+    names = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    bad = [s for s in names if s not in SCENARIOS]
+    if bad:
+        raise SystemExit(f"❌ unknown scenario: {', '.join(bad)} (มี {', '.join(SCENARIOS)})")
+
+    proc = None
+    stub_srv = None
+    shutdown = None
+    try:
+        if args.target:
+            base, pid, transport = args.target.rstrip("/"), None, None
+        else:
+            tmp = tempfile.mkdtemp(prefix="shd-bench-")
+            stub_srv, state = stubs.serve(0, os.path.join(tmp, "stub.db"), args.db_ms, args.storage_ms,
+                                          args.feed_ms, args.sheets_ms)
+            t0 = time.perf_counter()
+            stubs.seed(state.client, args.jobs, args.applications)
+            print(f"seeded {args.jobs} jobs / {args.applications} applications in {time.perf_counter() - t0:.1f}s")
+            env = app_env(f"http://127.0.0.1:{stub_srv.server_address[1]}", args.admin_password)
+            if args.inproc:
+                os.environ.update(env)
+                from app import main as api  # import หลังตั้ง env
+
+                await api.app.router.startup()
+                shutdown = api.app.router.shutdown
+                base, pid, transport = "http://bench", os.getpid(), httpx.ASGITransport(app=api.app)
+            else:
+                proc, base = start_uvicorn(env, _free_port(), args.workers)
+                pid, transport = proc.pid, None
+
+        def make_client():
+            return httpx.AsyncClient(
+                base_url=base, transport=transport, timeout=args.timeout,
+                limits=httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency),
+            )
+
+        job_ids, app_ids, token = await fetch_ids(make_client, args.admin_password)
+        if not job_ids:
+            raise SystemExit("❌ /jobs returned no rows — feed sync / seed ยังไม่เสร็จ?")
+        if "admin" in names and not token:
+            raise SystemExit("❌ admin login failed (ตรวจ --admin-password)")
+
+        results = []
+        for name in names:
+            ctx = Context(job_ids, app_ids, token, args.upload_kb, args.seed)
+            res = await run_scenario(name, make_client, ctx, args.concurrency, args.duration, args.iterations,
+                                     pid or 0)
+            results.append(res)
+            print(f"✅ {name}: {res['requests']} req, {res['rps']} rps, p95 {res['p95_ms']} ms")
+        print()
+        print_table(results)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump({"args": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+            print(f"\nเขียนผลลง {args.json}")
+        if any(r["errors"] for r in results):
+            return 1
+        return 0
+    finally:
+        if shutdown is not None:
+            await shutdown()
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        if stub_srv is not None:
+            stub_srv.shutdown()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="End-to-end load test against local stand-ins")
+    ap.add_argument("--scenarios", default=",".join(SCENARIOS), help="คั่นด้วย , (default: ทั้งหมด)")
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--duration", type=float, default=10, help="วินาทีต่อ scenario")
+    ap.add_argument("--iterations", type=int, default=0, help="จำกัดจำนวนรอบต่อ scenario (0 = ตาม --duration)")
+    ap.add_argument("--jobs", type=int, default=200, help="จำนวนงานที่ seed ลง stub")
+    ap.add_argument("--applications", type=int, default=2000, help="จำนวนใบสมัครที่ seed ลง stub")
+    ap.add_argument("--upload-kb", type=int, default=300, help="ขนาดไฟล์ที่แนบตอน apply (KB, resume ต้อง <= 2048)")
+    ap.add_argument("--db-ms", type=float, default=0, help="latency ของ PostgREST stub ต่อ request")
+    ap.add_argument("--storage-ms", type=float, default=0, help="latency ของ Storage stub ต่อ request")
+    ap.add_argument("--feed-ms", type=float, default=0)
+    ap.add_argument("--sheets-ms", type=float, default=0)
+    ap.add_argument("--workers", type=int, default=1, help="uvicorn --workers (peak RSS วัดเฉพาะ process หลัก)")
+    ap.add_argument("--inproc", action="store_true", help="รัน API ใน process เดียวกันผ่าน ASGI (ไม่ใช้ uvicorn)")
+    ap.add_argument("--target", default="", help="ยิงเซิร์ฟเวอร์ที่รันอยู่แล้ว (ไม่เปิด stub / ไม่วัด RSS)")
+    ap.add_argument("--admin-password", default="bench")
+    ap.add_argument("--timeout", type=float, default=30)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--json", default="", help="เขียนผลเป็น JSON")
+    args = ap.parse_args()
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
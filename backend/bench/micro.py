@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark ของ helper บนเส้นทาง request — เทียบกับ baseline ที่เก็บไว้ แล้ว fail ถ้าช้าลงเกิน threshold
+
+Cases (ข้อมูลจาก bench/datagen.py, ขนาดคูณ --scale ได้):
+  shape_catalog     _job_public_shape ทั้ง catalog 5k งาน (คำอธิบายภาษาไทยยาว) ต่อ 1 ภาษา (ทางสำรองของ DB ที่ไม่มี pub_*)
+  catalog_jobs      โหลด catalog ใหม่ทั้งก้อนจาก SQLite (projection pub_* ทั้ง 3 ภาษา)
+  search_th         fetch_jobs_db(q=ไทย) — haystack scan ของ list_jobs (ล้าง bitmap ของคำค้นที่จำไว้ทุกรอบ)
+  search_en         fetch_jobs_db(q=อังกฤษ) + filter department
+  filter_facets     fetch_jobs_db(country, department, level) ไม่มี q
+  facet_counts      facet_search: งานที่ตรง + count ทุก facet (country+department, ไม่มี q)
+  suggest           typeahead ไทย/อังกฤษ ทีละตัวอักษร (prefix 1-5 ตัว, ต่อ 1 คำขอ)
+  safe_filename     ชื่อไฟล์ 1,000 ชื่อ (ไทย/ยาว/อักขระแปลก)
+  get_ext           นามสกุลไฟล์ 1,000 ชื่อ
+  parse_skills      skills แบบ JSON และแบบคั่น comma/บรรทัด (1,000 ฟอร์ม)
+  parse_json_list   education_json/experience_json (1,000 ฟอร์ม)
+  verify_token      ตรวจ JWT แอดมิน 1,000 ครั้ง
+  export_csv        _export_record + _stream_csv 100k แถว (รวมตารางลูกทั้งหมด)
+
+ผลต่อ case = เวลาดีที่สุดต่อ 1 op จาก --repeat รอบ (best_us, ใช้กับ --no-calibrate)
+และ norm = median ของ (เวลารอบนั้น / workload อ้างอิงที่วัดประกบก่อน-หลังรอบ) — calibration สลับกับทุกรอบ
+-> เครื่องช้า/เร็วขึ้นชั่วคราว (CPU ถูกแย่ง, turbo) กระทบทั้งสองฝั่งพร้อมกัน และ baseline
+   ที่เก็บจากเครื่องหนึ่งยังพอใช้เทียบบนเครื่องที่เร็ว/ช้ากว่าได้
+--save เขียนทุก case จากรอบเดียวกัน (ไม่ merge กับ baseline เก่า, ห้ามใช้กับ -k)
+
+วิธีใช้ (รันจากโฟลเดอร์ backend):
+  python3 bench/micro.py                         # รันแล้วเทียบกับ bench/baselines/micro.json (exit 1 ถ้าช้าลงเกิน threshold)
+  python3 bench/micro.py --save                  # บันทึก/อัปเดต baseline (ทำหลังตั้งใจเปลี่ยน performance แล้ว)
+  python3 bench/micro.py -k search,export --threshold 0.15
+  python3 bench/micro.py --scale 0.1             # ข้อมูลเล็กลง (ลองเร็วๆ — อย่าเทียบกับ baseline ขนาดเต็ม)
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import gc
+import platform
+import tempfile
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+from bench import datagen  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "micro.json")
+DEFAULT_THRESHOLD = 0.25  # ช้าลงเกิน 25% = regression
+
+_LONG_TH = (
+    "รับผิดชอบงานวิเคราะห์ข้อมูลการขายและการตลาด จัดทำรายงานประจำสัปดาห์และประจำเดือนให้ผู้บริหาร "
+    "ประสานงานกับทีมภูมิภาคเพื่อวางแผนการเปิดตัวผลิตภัณฑ์ใหม่ ดูแลความถูกต้องของข้อมูลในระบบ "
+    "พัฒนากระบวนการทำงานให้มีประสิทธิภาพ และสนับสนุนทีมขายในการนำเสนอลูกค้าองค์กร "
+)
+
+
+# ---------------------------
+# Fixtures
+# ---------------------------
+def _env(tmp):
+    # ตั้งก่อน import แอป — catalog ไม่หมดอายุระหว่างวัด, ไม่ต่อ Supabase/feed จริง
+    os.environ.update({
+        "APP_ENV": "bench",
+        "METRICS_TOKEN": "bench-metrics",
+        "STORAGE_BACKEND": "local",
+        "DB_PATH": os.path.join(tmp, "local.db"),
+        "UPLOAD_DIR": os.path.join(tmp, "uploads"),
+        "ADMIN_PASSWORD": "bench-admin",
+        "ADMIN_JWT_SECRET": "bench-secret",
+        "JOBS_CACHE_TTL_SEC": str(10 ** 9),
+        "READ_REPLICA_ENABLED": "false",
+        "FEED_SYNC_ENABLED": "false",
+        "METRICS_ENABLED": "false",
+        "LOG_LEVEL": "WARNING",
+    })
+
+
+def job_rows(count, seed=42):
+    """งานจาก datagen + คำอธิบายไทยยาว (~3-4 KB) แบบประกาศจริง, บางภาษาเว้นว่างให้ fallback ทำงาน"""
+    rnd = random.Random(seed)
+    rows = []
+    for i, r in enumerate(datagen.gen_jobs(count, seed)):
+        r["desc_th"] = (r["desc_th"] + "\n") + _LONG_TH * rnd.randint(4, 10)
+        r["qual_th"] = (r["qual_th"] + "\n") * rnd.randint(2, 4)
+        if i % 7 == 0:
+            r["title_zh"] = r["desc_zh"] = ""
+        if i % 11 == 0:
+            r["location_en"] = "  "
+        r["status"] = "published"
+        r["updated_at"] = f"2026-{1 + i % 9:02d}-{1 + i % 28:02d}T{i % 24:02d}:00:00+00:00"
+        rows.append(r)
+    return rows
+
+
+def export_rows(count, jobs, seed=42):
+    """แถวรูปเดียวกับผล embedded select ของ export (applications + ตารางลูก)"""
+    now = datagen._dt.datetime.now(datagen._dt.timezone.utc)
+    out = []
+    for n in range(count):
+        app, edus, exps, skills, atts = datagen.gen_application(n, jobs, now, 365, seed)
+        app["application_educations"] = edus
+        app["application_experiences"] = exps
+        app["application_skills"] = skills
+        app["application_attachments"] = atts
+        out.append(app)
+    return out
+
+
+def file_names(count, seed=42):
+    rnd = random.Random(seed)
+    pool = [
+        "Resume_2026.pdf", "ประวัติส่วนตัว สมชาย.pdf", "CV (final) v3.docx", "transcript.PDF",
+        "../../etc/passwd", "photo 001.JPG", "ใบรับรอง<script>.png", "a" * 300 + ".pdf",
+        "portfolio\tdesign\n2026.zip", "no_extension", "เอกสารแนบ.tar.gz", "简历.docx",
+    ]
+    return [rnd.choice(pool) for _ in range(count)]
+
+
+def skill_forms(count, seed=42):
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(count):
+        picked = rnd.sample(datagen.SKILLS, rnd.randint(2, 10))
+        out.append(json.dumps(picked, ensure_ascii=False) if rnd.random() < 0.5 else rnd.choice([", ", "\n", ";"]).join(picked))
+    return out
+
+
+def json_list_forms(count, seed=42):
+    now = datagen._dt.datetime.now(datagen._dt.timezone.utc)
+    jobs = [{"job_id": "J0", "country": "", "department": "", "level": ""}]
+    out = []
+    for n in range(count):
+        _, edus, exps, _, _ = datagen.gen_application(n, jobs, now, 365, seed)
+        out.append(json.dumps(edus if n % 2 else exps, ensure_ascii=False))
+    return out
+
+
+# ---------------------------
+# Cases
+# ---------------------------
+def build_cases(scale):
+    """-> {name: (fn, ops_per_call)} — ops ใช้คำนวณเวลา/ op (เช่นต่อชื่อไฟล์ 1 ชื่อ)"""
+    from app import main as api
+    from app import admin
+    from app.store import local_client
+
+    n_jobs = max(50, int(5000 * scale))
+    n_export = max(500, int(100_000 * scale))
+    n_small = 1000
+
+    rows = job_rows(n_jobs)
+    db = local_client()
+    for i in range(0, len(rows), 500):
+        db.table("jobs").upsert(rows[i:i + 500], on_conflict="job_id").execute()
+
+    def catalog_cold():
+        api.invalidate_catalog()
+        api.catalog()
+
+    catalog_cold()
+    for lang in api.JOB_LANGS:
+        api.catalog_index(lang)  # cache อุ่นไว้สำหรับ case ค้นหา (เหมือนหลัง warm_caches)
+
+    def search(**kw):
+        api.catalog_index(kw.get("lang", "th"))["qmask"].clear()  # วัด scan จริง ไม่ใช่ cache ของคำเดิม
+        return api.fetch_jobs_db(**kw)
+
+    prefixes = [(lang, w[:i]) for lang, w in (("th", "วิศวกร"), ("en", "engineer"), ("en", "bangkok")) for i in range(1, 6)]
+    for lang in api.JOB_LANGS:
+        api.suggest_index(api.catalog(), lang)
+
+    def suggest():
+        cat = api.catalog()
+        for lang, p in prefixes:
+            api.suggest_index(cat, lang).query(p)
+
+    names = file_names(n_small)
+    skills = skill_forms(n_small)
+    lists = json_list_forms(n_small)
+    token = admin.make_token()
+    include = list(admin.EXPORT_CHILDREN)
+    header = admin.EXPORT_COLS + include
+    exp_rows = export_rows(n_export, [{"job_id": r["job_id"], "country": r["country"],
+                                       "department": r["department"], "level": r["level"]} for r in rows])
+    page = admin.EXPORT_PAGE_SIZE
+
+    def export_csv():
+        pages = ([admin._export_record(r, include) for r in exp_rows[i:i + page]]
+                 for i in range(0, len(exp_rows), page))
+        for _ in admin._stream_csv(header, pages):
+            pass
+
+    return {
+        "shape_catalog": (lambda: [api._job_public_shape(r, "th") for r in rows], 1),
+        "catalog_jobs": (catalog_cold, 1),
+        "search_th": (lambda: search(lang="th", q="วิศวกร"), 1),
+        "search_en": (lambda: search(lang="en", q="engineer", department="Engineering"), 1),
+        "filter_facets": (lambda: api.fetch_jobs_db(lang="th", country="Thailand", department="Sales", level="Senior"), 1),
+        "facet_counts": (lambda: api.facet_search(api.catalog(), "th", {"country": "Thailand", "department": "Sales"}), 1),
+        "suggest": (suggest, len(prefixes)),
+        "safe_filename": (lambda: [api.safe_filename(x) for x in names], n_small),
+        "get_ext": (lambda: [api.get_ext(x) for x in names], n_small),
+        "parse_skills": (lambda: [api.parse_skills(x) for x in skills], n_small),
+        "parse_json_list": (lambda: [api.parse_json_list(x, "education_json") for x in lists], n_small),
+        "verify_token": (lambda: [admin.verify_token(token) for _ in range(n_small)], n_small),
+        "export_csv": (export_csv, 1),
+    }
+
+
+def _calibrate(rounds=3):
+    """workload อ้างอิง (dict/str/sort ล้วนๆ แบบเดียวกับ helper) -> วินาทีที่ดีที่สุด"""
+    data = [{"k": f"row-{i}", "v": str(i * 7919 % 10007)} for i in range(20000)]
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        out = sorted((d["v"].strip() + " " + d["k"]).lower() for d in data)
+        _ = "|".join(out).encode("utf-8")
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _median(xs):
+    xs = sorted(xs)
+    n = len(xs)
+    return xs[n // 2] if n % 2 else (xs[n // 2 - 1] + xs[n // 2]) / 2
+
+
+def run_case(fn, ops, repeat, min_time):
+    """-> best/median µs ต่อ op + norm = median ของ (รอบ / calibration ที่ประกบรอบนั้น)"""
+    fn()  # warm-up (regex cache, lazy import ฯลฯ)
+    t0 = time.perf_counter()
+    fn()
+    once = max(time.perf_counter() - t0, 1e-9)
+    number = max(1, int(min_time / once))
+    samples, ratios, refs = [], [], []
+    gc.collect()
+    gc.disable()  # แบบเดียวกับ timeit — ไม่ให้ GC รอบใหญ่ตกลงใน case ใด case หนึ่งแบบสุ่ม
+    try:
+        before = _calibrate()
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            for _ in range(number):
+                fn()
+            sample = (time.perf_counter() - t0) / (number * ops)
+            after = _calibrate()
+            ref = (before + after) / 2  # ประกบทั้งก่อนและหลัง — case ที่รอบละหลายวินาทีก็ยังตามทัน
+            samples.append(sample)
+            refs.append(ref)
+            ratios.append(sample / ref)
+            before = after
+    finally:
+        gc.enable()
+    samples.sort()
+    return {
+        "best_us": samples[0] * 1e6,
+        "median_us": samples[len(samples) // 2] * 1e6,
+        "norm": _median(ratios),
+        "ref_us": _median(refs) * 1e6,
+        "loops": number,
+    }
+
+
+def compare(results, baseline, threshold, calibrated):
+    """-> [(name, ratio|None, verdict)] — ratio = ปัจจุบัน/baseline (>1 = ช้าลง)"""
+    base_cases = (baseline or {}).get("cases", {})
+    out = []
+    for name, res in results.items():
+        b = base_cases.get(name)
+        if not b:
+            out.append((name, None, "new"))
+            continue
+        key = "norm" if calibrated and "norm" in b else "best_us"
+        limit = 1.0 + float(b.get("threshold", threshold))
+        ratio = res[key] / b[key] if b[key] else None
+        if ratio is None:
+            out.append((name, None, "new"))
+        elif ratio > limit:
+            out.append((name, ratio, "REGRESSION"))
+        elif ratio < 1.0 / limit:
+            out.append((name, ratio, "faster"))
+        else:
+            out.append((name, ratio, "ok"))
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Micro-benchmarks for request-path helpers")
+    ap.add_argument("-k", "--cases", default="", help="เลือกเฉพาะ case ที่ชื่อมีคำเหล่านี้ (คั่นด้วย comma)")
+    ap.add_argument("--repeat", type=int, default=7)
+    ap.add_argument("--min-time", type=float, default=0.2, help="เวลาขั้นต่ำต่อรอบ (วินาที)")
+    ap.add_argument("--scale", type=float, default=1.0, help="คูณขนาดข้อมูล (5k งาน / 100k แถว export)")
+    ap.add_argument("--baseline", default=DEFAULT_BASELINE)
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="สัดส่วนที่ยอมให้ช้าลง (0.25 = 25%%)")
+    ap.add_argument("--no-calibrate", action="store_true", help="เทียบเวลาดิบ (เครื่องเดียวกับตอนเก็บ baseline)")
+    ap.add_argument("--save", action="store_true", help="เขียนผลรอบนี้เป็น baseline (ทุก case, คง threshold ที่ตั้งเอง)")
+    ap.add_argument("--json", help="บันทึกผลรอบนี้เป็น JSON")
+    args = ap.parse_args()
+    if args.save and args.cases:
+        ap.error("--save ต้องรันครบทุก case ในรอบเดียว (ไม่ใช้กับ -k)")
+
+    _env(tempfile.mkdtemp(prefix="shd-micro-"))
+    t0 = time.time()
+    cases = build_cases(args.scale)
+    wanted = [w.strip() for w in args.cases.split(",") if w.strip()]
+    if wanted:
+        cases = {k: v for k, v in cases.items() if any(w in k for w in wanted)}
+    print(f"fixtures {time.time() - t0:.1f}s — {len(cases)} cases, scale {args.scale}", flush=True)
+
+    results = {}
+    for name, (fn, ops) in cases.items():
+        res = run_case(fn, ops, max(1, args.repeat), args.min_time)
+        results[name] = res
+        print(f"  {name:<16} best {res['best_us']:>12.2f} µs   median {res['median_us']:>12.2f} µs   "
+              f"(x{res['loops']}, ref {res['ref_us']:.0f} µs)", flush=True)
+    ref = _median([r["ref_us"] for r in results.values()]) / 1e6 if results else 0.0
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    meta = {
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}",
+        "scale": args.scale,
+        "ref_us": round(ref * 1e6, 1),
+        "at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+    failed = False
+    if baseline and not args.save:
+        if baseline.get("scale") != args.scale:
+            print(f"⚠️  baseline เก็บที่ scale {baseline.get('scale')} แต่รอบนี้ {args.scale} — ตัวเลขเทียบกันไม่ได้")
+        calibrated = not args.no_calibrate
+        print(f"\n{'case':<16} {'baseline µs':>13} {'now µs':>13} {'ratio':>7}  verdict "
+              f"({'calibrated' if calibrated else 'raw'}, threshold {args.threshold:.0%})")
+        for name, ratio, verdict in compare(results, baseline, args.threshold, calibrated):
+            b = baseline.get("cases", {}).get(name, {})
+            print(f"{name:<16} {b.get('best_us', float('nan')):>13.2f} {results[name]['best_us']:>13.2f} "
+                  f"{'' if ratio is None else f'{ratio:.2f}':>7}  {verdict}")
+            failed = failed or verdict == "REGRESSION"
+    elif not args.save:
+        print(f"\n(ยังไม่มี baseline ที่ {args.baseline} — รันด้วย --save เพื่อสร้าง)")
+
+    if args.save:
+        old_cases = (baseline or {}).get("cases", {})
+        cases_out = {}
+        for name, res in results.items():
+            old = old_cases.get(name, {})
+            cases_out[name] = {"best_us": round(res["best_us"], 3), "norm": round(res["norm"], 6)}
+            if "threshold" in old:  # threshold เฉพาะ case ที่ตั้งไว้ด้วยมือ -> คงไว้
+                cases_out[name]["threshold"] = old["threshold"]
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({**meta, "cases": dict(sorted(cases_out.items()))}, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"\n✅ บันทึก baseline ที่ {args.baseline}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({**meta, "results": results}, f, ensure_ascii=False, indent=2)
+
+    if failed:
+        print("\n❌ มี case ที่ช้าลงเกิน threshold")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Scaling benchmark ของ endpoint แอดมิน — latency/หน่วยความจำเมื่อจำนวนใบสมัครโตขึ้น
+
+ขยายข้อมูลทีละขั้น (bench/datagen.py, id ต่อเนื่อง ไม่สร้างใหม่ทั้งก้อน) ตาม --sizes แล้ววัดต่อขนาด:
+  stats          GET /admin/stats
+  analytics      GET /admin/analytics
+  list_p1        GET /admin/applications (หน้าแรก)
+  list_deep      GET /admin/applications (หน้าสุดท้าย, page_size=100)
+  list_status    GET /admin/applications?status=shortlisted
+  list_q         GET /admin/applications?q=<ชื่อ>
+  export         GET /admin/applications/export (อ่าน stream จนจบ, include ตาม --export-include)
+  detail         GET /admin/applications/{id} (สุ่ม id)
+
+ต่อ endpoint: p50 / p95 (ms) จาก --repeat รอบ, ขนาด response, peak ของ Python heap (tracemalloc,
+รันแยกอีกรอบหนึ่งเพื่อไม่ให้ไปถ่วงตัวเลข latency) และ RSS ของ process หลังวัด
+
+Backend:
+  local   STORAGE_BACKEND=local (SQLite ใน temp dir) — ค่าเริ่มต้น
+  stub    ผ่าน supabase-py -> bench/stubs.py (PostgREST/Storage ปลอม, หน่วงด้วย --db-ms ได้)
+
+วิธีใช้ (รันจากโฟลเดอร์ backend):
+  python3 bench/scaling.py
+  python3 bench/scaling.py --sizes 1000,10000,100000 --repeat 10 --json scaling.json
+  python3 bench/scaling.py --backend stub --db-ms 5 --sizes 500,5000
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+from bench import datagen  # noqa: E402
+
+ADMIN_PASSWORD = "bench-admin"
+ENDPOINTS = ["stats", "analytics", "list_p1", "list_deep", "list_status", "list_q", "export", "detail"]
+
+
+def _rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    import resource  # ไม่มี /proc (macOS) -> ใช้ peak แทน
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024.0 * 1024.0)
+
+
+def _pct(values, p):
+    s = sorted(values)
+    return s[min(len(s) - 1, int(round(p / 100.0 * (len(s) - 1))))]
+
+
+def requests_for(name, size, rnd, export_include):
+    """คืน (path, params) ของ endpoint ที่ขนาดข้อมูล size"""
+    if name == "stats":
+        return "/admin/stats", {}
+    if name == "analytics":
+        return "/admin/analytics", {}
+    if name == "list_p1":
+        return "/admin/applications", {"page": 1, "page_size": 20}
+    if name == "list_deep":
+        return "/admin/applications", {"page": max(1, (size + 99) // 100), "page_size": 100}
+    if name == "list_status":
+        return "/admin/applications", {"status": "shortlisted", "page": 1, "page_size": 20}
+    if name == "list_q":
+        return "/admin/applications", {"q": rnd.choice(datagen.FIRST_NAMES), "page": 1, "page_size": 20}
+    if name == "export":
+        params = {"format": "csv"}
+        if export_include:
+            params["include"] = export_include
+        return "/admin/applications/export", params
+    if name == "detail":
+        return f"/admin/applications/{datagen.app_id(rnd.randrange(size))}", {}
+    raise ValueError(name)
+
+
+def measure(client, headers, name, size, repeat, rnd, export_include):
+    times, nbytes = [], 0
+    for _ in range(repeat):
+        path, params = requests_for(name, size, rnd, export_include)
+        t0 = time.perf_counter()
+        r = client.get(path, params=params, headers=headers)
+        body = r.content  # export เป็น stream -> อ่านจนจบก่อนหยุดเวลา
+        times.append((time.perf_counter() - t0) * 1000.0)
+        if r.status_code != 200:
+            raise SystemExit(f"❌ {name} @ {size}: HTTP {r.status_code} {body[:200]!r}")
+        nbytes = len(body)
+
+    path, params = requests_for(name, size, rnd, export_include)
+    tracemalloc.start()
+    client.get(path, params=params, headers=headers).content
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "endpoint": name,
+        "size": size,
+        "n": repeat,
+        "p50_ms": round(statistics.median(times), 2),
+        "p95_ms": round(_pct(times, 95), 2),
+        "max_ms": round(max(times), 2),
+        "bytes": nbytes,
+        "heap_peak_mb": round(peak / (1024.0 * 1024.0), 2),
+        "rss_mb": round(_rss_mb(), 1),
+    }
+
+
+def print_table(rows):
+    print(f"\n{'endpoint':<12} {'size':>8} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'resp KB':>9} "
+          f"{'heap MB':>8} {'RSS MB':>8}")
+    for r in rows:
+        print(f"{r['endpoint']:<12} {r['size']:>8} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['max_ms']:>9.1f} "
+              f"{r['bytes'] / 1024.0:>9.1f} {r['heap_peak_mb']:>8.1f} {r['rss_mb']:>8.1f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Admin endpoint scaling benchmark")
+    ap.add_argument("--sizes", default="500,5000,50000", help="จำนวนใบสมัครแต่ละขั้น (เรียงน้อยไปมาก)")
+    ap.add_argument("--jobs", type=int, default=300)
+    ap.add_argument("--repeat", type=int, default=7, help="จำนวนรอบต่อ endpoint ต่อขนาด")
+    ap.add_argument("--export-repeat", type=int, default=3, help="export หนักกว่าตัวอื่น -> รอบน้อยกว่า")
+    ap.add_argument("--export-include", default="educations,experiences,skills,attachments")
+    ap.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    ap.add_argument("--backend", choices=["local", "stub"], default="local")
+    ap.add_argument("--db-ms", type=float, default=0.0, help="(stub) หน่วงเวลาต่อคำสั่ง DB")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--json", help="บันทึกผลเป็น JSON")
+    args = ap.parse_args()
+
+    sizes = sorted({int(s) for s in args.sizes.split(",") if s.strip()})
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        raise SystemExit(f"❌ unknown endpoint(s): {', '.join(sorted(unknown))}")
+
+    tmp = tempfile.mkdtemp(prefix="shd-scaling-")
+    # ต้องตั้ง env ก่อน import อะไรที่แตะ app.* (ค่า config อ่านตอน import — stubs.py ก็ import app.store)
+    os.environ.update({
+        "APP_ENV": "bench",
+        "METRICS_TOKEN": "bench-metrics",
+        "STORAGE_BACKEND": "local" if args.backend == "local" else "supabase",
+        "DB_PATH": os.path.join(tmp, "local.db"),
+        "UPLOAD_DIR": os.path.join(tmp, "uploads"),
+        "ADMIN_PASSWORD": ADMIN_PASSWORD,
+        "ADMIN_JWT_SECRET": "bench-secret",
+        "READ_REPLICA_ENABLED": "false",
+        "SNAPSHOT_DIR": "",
+        "SNAPSHOT_BUCKET": "",
+        "GOOGLE_JOBS_FEED_URL": "",
+        "TIMING_LOG_MIN_MS": "60000",
+        "LOG_LEVEL": "WARNING",
+    })
+    from bench import stubs
+
+    stub_srv = data_client = None
+    if args.backend == "stub":
+        stub_srv, state = stubs.serve(0, os.path.join(tmp, "stub.db"), db_ms=args.db_ms)
+        os.environ["SUPABASE_URL"] = f"http://127.0.0.1:{stub_srv.server_address[1]}"
+        os.environ["SUPABASE_SERVICE_ROLE_KEY"] = stubs.FAKE_SERVICE_KEY
+        data_client = state.client
+
+    from fastapi.testclient import TestClient
+
+    from app import main as api
+
+    if data_client is None:
+        from app.store import local_client
+
+        data_client = local_client()
+
+    rnd = random.Random(args.seed)
+    rows = []
+    try:
+        with TestClient(api.app) as client:
+            r = client.post("/admin/login", json={"password": ADMIN_PASSWORD})
+            if r.status_code != 200:
+                raise SystemExit(f"❌ admin login failed: HTTP {r.status_code} {r.text[:200]}")
+            headers = {"Authorization": f"Bearer {r.json()['token']}"}
+
+            job_rows = datagen.load_jobs(data_client, args.jobs, args.seed)
+            have = 0
+            for size in sizes:
+                t0 = time.time()
+                datagen.load_applications(data_client, job_rows, size - have, start=have, seed=args.seed)
+                have = size
+                print(f"== {size} applications (load {time.time() - t0:.1f}s)", flush=True)
+                for name in endpoints:
+                    n = args.export_repeat if name == "export" else args.repeat
+                    res = measure(client, headers, name, size, max(1, n), rnd, args.export_include)
+                    rows.append(res)
+                    print(f"   {name:<12} p50 {res['p50_ms']:>9.1f} ms   p95 {res['p95_ms']:>9.1f} ms", flush=True)
+    finally:
+        if stub_srv is not None:
+            stub_srv.shutdown()
+
+    print_table(rows)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "backend": args.backend,
+                "sizes": sizes,
+                "repeat": args.repeat,
+                "db_ms": args.db_ms,
+                "at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "results": rows,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"\nบันทึกผลที่ {args.json}")
+
+
+if __name__ == "__main__":
+    main()
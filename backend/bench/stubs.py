@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fake upstreams สำหรับ load test — HTTP server ตัวเดียว (stdlib) แทนทุกอย่างที่แอปเรียกออกไป:
+
+  /rest/v1/<table>             PostgREST (select/filter/or/order/offset/limit/count, insert/upsert/update/delete)
+                               ใช้ LocalQuery ของ app/store.py -> semantics เดียวกับ STORAGE_BACKEND=local
+  /storage/v1/object/...       Supabase Storage (upload / remove / sign / sign หลายไฟล์ / download)
+  /feed?lang=th                Apps Script jobs feed (สร้างจากตาราง jobs ใน stub)
+  /sheets                      Apps Script รับใบสมัคร -> {"ok": true}
+
+หน่วงเวลาแยกต่อบริการได้ (--db-ms / --storage-ms / --feed-ms / --sheets-ms) เพื่อจำลอง latency ข้ามเน็ต
+
+วิธีใช้ (รันจากโฟลเดอร์ backend):
+  python3 bench/stubs.py --port 54321 --jobs 300 --applications 5000
+  แล้วตั้ง SUPABASE_URL=http://127.0.0.1:54321  GOOGLE_JOBS_FEED_URL=http://127.0.0.1:54321/feed
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.store import LocalClient  # noqa: E402
+
+try:
+    from bench import datagen  # noqa: E402
+except Exception:
+    import datagen  # noqa: E402
+
+# เลียน JWT ให้ผ่าน validation ของ supabase-py (ไม่ได้ตรวจลายเซ็นจริง)
+FAKE_SERVICE_KEY = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.bench"
+
+_FEED_FIELDS = {"title": "title", "location": "location", "description": "desc", "qualifications": "qual"}
+
+
+# ---------------------------
+# Seed data (deterministic) — ใช้ตัวสร้างเดียวกับ bench/datagen.py
+# ---------------------------
+def seed(client, jobs=200, applications=2000, rnd_seed=42):
+    """สร้างงาน + ใบสมัคร (พร้อมตารางลูก) ลง DB ของ stub — คืน list ของ job_id"""
+    job_rows, _ = datagen.load(client, jobs, applications, seed=rnd_seed)
+    return [r["job_id"] for r in job_rows]
+
+
+# ---------------------------
+# HTTP handler
+# ---------------------------
+_RESERVED = {"select", "order", "offset", "limit", "on_conflict", "columns"}
+
+
+class StubState:
+    def __init__(self, client, db_ms=0.0, storage_ms=0.0, feed_ms=0.0, sheets_ms=0.0):
+        self.client = client
+        self.delay = {"db": db_ms / 1000.0, "storage": storage_ms / 1000.0,
+                      "feed": feed_ms / 1000.0, "sheets": sheets_ms / 1000.0}
+        self.objects = {}  # "bucket/path" -> ขนาด (เก็บแค่ขนาด ไม่กิน RAM ตอน apply เยอะๆ)
+        self.lock = threading.Lock()
+        self.calls = {"db": 0, "storage": 0, "feed": 0, "sheets": 0}
+
+    def hit(self, kind):
+        with self.lock:
+            self.calls[kind] += 1
+        if self.delay[kind]:
+            time.sleep(self.delay[kind])
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state: StubState = None  # ตั้งตอนสร้าง server
+
+    def log_message(self, *a):
+        pass
+
+    # --- helpers ---
+    def _body(self):
+        return self._raw
+
+    def _send(self, code, payload=None, headers=None, raw=None):
+        data = raw if raw is not None else (b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode())
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json" if raw is None else "application/octet-stream")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _route(self, method):
+        url = urllib.parse.urlsplit(self.path)
+        path = urllib.parse.unquote(url.path)
+        # อ่าน body ทุก request เสมอ (postgrest-py ส่ง "{}" มากับ GET ด้วย — ค้างไว้จะพัง keep-alive)
+        n = int(self.headers.get("Content-Length") or 0)
+        self._raw = self.rfile.read(n) if n else b""
+        try:
+            if path.startswith("/rest/v1/"):
+                self.state.hit("db")
+                return self._rest(method, path[len("/rest/v1/"):], url.query)
+            if path.startswith("/storage/v1/"):
+                self.state.hit("storage")
+                return self._storage(method, path[len("/storage/v1/"):])
+            if path == "/feed":
+                self.state.hit("feed")
+                return self._feed(urllib.parse.parse_qs(url.query).get("lang", ["th"])[0])
+            if path == "/sheets":
+                self.state.hit("sheets")
+                return self._send(200, {"ok": True})
+            self._send(404, {"message": "not found"})
+        except ValueError as e:
+            self._send(400, {"message": str(e)})
+        except Exception as e:  # sqlite IntegrityError ฯลฯ -> ตอบแบบ PostgREST
+            self._send(409 if "constraint" in str(e).lower() else 500, {"message": str(e)})
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_POST(self):
+        self._route("POST")
+
+    def do_PATCH(self):
+        self._route("PATCH")
+
+    def do_PUT(self):
+        self._route("PUT")
+
+    def do_DELETE(self):
+        self._route("DELETE")
+
+    # --- PostgREST ---
+    def _rest(self, method, table, query):
+        params = urllib.parse.parse_qsl(query, keep_blank_values=True)
+        opts = {k: v for k, v in params if k in _RESERVED}
+        prefer = self.headers.get("Prefer", "")
+        q = self.state.client.table(table)
+        body = json.loads(self._body() or b"null") if method in ("POST", "PATCH") else None
+
+        if method == "GET":
+            q = q.select(opts.get("select", "*"), count="exact" if "count=" in prefer else None)
+        elif method == "POST":
+            if "resolution=" in prefer:
+                q = q.upsert(body, on_conflict=opts.get("on_conflict", ""))
+            else:
+                q = q.insert(body)
+        elif method == "PATCH":
+            q = q.update(body or {})
+        elif method == "DELETE":
+            q = q.delete()
+        else:
+            raise ValueError(f"method not allowed: {method}")
+
+        for k, v in params:
+            if k in _RESERVED:
+                continue
+            if k == "or":
+                q = q.or_(v[1:-1])
+                continue
+            if k == "and":
+                raise ValueError("top-level and= is not supported by the stub")
+            op, _, criteria = v.partition(".")
+            if op == "not":
+                raise ValueError("not.* filters are not supported by the stub")
+            q = q.filter(k, op, criteria)
+        for part in filter(None, opts.get("order", "").split(",")):
+            bits = part.split(".")
+            q = q.order(bits[0], desc="desc" in bits[1:])
+        if "limit" in opts:
+            off = int(opts.get("offset") or 0)
+            q = q.range(off, off + int(opts["limit"]) - 1)
+
+        res = q.execute()
+        rows = res.data or []
+        headers = {}
+        if res.count is not None:
+            off = int(opts.get("offset") or 0)
+            headers["Content-Range"] = f"{off}-{off + len(rows) - 1}/{res.count}" if rows else f"*/{res.count}"
+        code = 201 if method == "POST" else 200
+        if "return=minimal" in prefer:
+            return self._send(code if method == "POST" else 204, None, headers)
+        return self._send(code, rows, headers)
+
+    # --- Storage ---
+    def _storage(self, method, path):
+        st = self.state
+        if path.startswith("object/sign/"):
+            rest = path[len("object/sign/"):]
+            body = json.loads(self._body() or b"{}")
+            if "paths" in body:  # create_signed_urls -> rest = bucket
+                return self._send(200, [
+                    {"path": p, "signedURL": f"/object/sign/{rest}/{urllib.parse.quote(p)}?token=bench", "error": None}
+                    for p in body["paths"]
+                ])
+            return self._send(200, {"signedURL": f"/object/sign/{urllib.parse.quote(rest)}?token=bench"})
+        if path.startswith("object/") and method in ("POST", "PUT"):
+            key = path[len("object/"):]
+            size = len(self._body())
+            with st.lock:
+                st.objects[key] = size
+            return self._send(200, {"Key": key})
+        if path.startswith("object/") and method == "DELETE":
+            bucket = path[len("object/"):]
+            body = json.loads(self._body() or b"{}")
+            with st.lock:
+                for p in body.get("prefixes") or []:
+                    st.objects.pop(f"{bucket}/{p}", None)
+            return self._send(200, [{"name": p} for p in body.get("prefixes") or []])
+        if path.startswith(("object/", "object/authenticated/")) and method == "GET":
+            key = path.split("object/", 1)[1].replace("authenticated/", "", 1)
+            size = st.objects.get(key)
+            if size is None:
+                return self._send(404, {"message": "Object not found"})
+            return self._send(200, raw=b"\0" * size)
+        self._send(404, {"message": "not found"})
+
+    # --- Apps Script feed ---
+    def _feed(self, lang):
+        rows = self.state.client.table("jobs").select("*").range(0, 100000).execute().data
+        out = []
+        for r in rows:
+            x = {k: r.get(k) for k in ("job_id", "status", "country", "department", "level", "quantity")}
+            for field, col in _FEED_FIELDS.items():
+                x[field] = r.get(f"{col}_{lang}") or ""
+            out.append(x)
+        self._send(200, {"ok": True, "version": f"bench-{len(out)}", "rows": out})
+
+
+def serve(port=0, db_path="", db_ms=0.0, storage_ms=0.0, feed_ms=0.0, sheets_ms=0.0):
+    """เปิด stub ใน thread เบื้องหลัง -> (server, state) — port=0 ให้ระบบเลือก port ว่าง"""
+    client = LocalClient(db_path)
+    state = StubState(client, db_ms, storage_ms, feed_ms, sheets_ms)
+    handler = type("BoundStubHandler", (StubHandler,), {"state": state})
+    srv = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, name="bench-stub", daemon=True).start()
+    return srv, state
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Fake Supabase/Storage/Apps Script for load tests")
+    ap.add_argument("--port", type=int, default=54321)
+    ap.add_argument("--db", default="./data/bench-stub.db", help="ไฟล์ SQLite ของ stub (ลบทิ้งได้)")
+    ap.add_argument("--jobs", type=int, default=200)
+    ap.add_argument("--applications", type=int, default=2000)
+    ap.add_argument("--db-ms", type=float, default=0)
+    ap.add_argument("--storage-ms", type=float, default=0)
+    ap.add_argument("--feed-ms", type=float, default=0)
+    ap.add_argument("--sheets-ms", type=float, default=0)
+    args = ap.parse_args()
+
+    fresh = not os.path.exists(args.db)
+    srv, state = serve(args.port, args.db, args.db_ms, args.storage_ms, args.feed_ms, args.sheets_ms)
+    if fresh:
+        seed(state.client, args.jobs, args.applications)
+    base = f"http://127.0.0.1:{srv.server_address[1]}"
+    print(f"stub ready at {base}")
+    print(f"  SUPABASE_URL={base}")
+    print(f"  SUPABASE_SERVICE_ROLE_KEY={FAKE_SERVICE_KEY}")
+    print(f"  GOOGLE_JOBS_FEED_URL={base}/feed")
+    print(f"  APPS_SCRIPT_APPLY_SHEET_URL={base}/sheets")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        srv.shutdown()
+
+
+if __name__ == "__main__":
+    main()
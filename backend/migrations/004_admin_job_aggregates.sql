@@ -0,0 +1,38 @@
+-- =====================================================================
+-- SHD Careers — Phase 4: ตัวเลขสรุปสำหรับหน้า "จัดการงาน" ในแอดมิน
+-- รันใน Supabase: Dashboard -> SQL Editor -> วางทั้งไฟล์ -> Run
+-- ปลอดภัย/รันซ้ำได้
+--
+-- ให้ Postgres นับ/รวมกลุ่มเอง แทนที่ backend ต้องดึง applications.job_id
+-- ทั้งหมดมานับใน Python (เดิมโดนตัดที่ 1000 แถว -> ตัวเลขผิด)
+-- ถ้ายังไม่รันไฟล์นี้ backend จะ fallback ไปนับแบบเดิม (ช้ากว่า แต่ไม่พัง)
+-- =====================================================================
+
+-- จำนวนผู้สมัครต่องาน + แยกตามสถานะ (1 แถวต่อ job_id)
+create or replace view job_applicant_counts as
+select
+  job_id,
+  count(*)                                                   as total,
+  count(*) filter (where coalesce(status, 'new') = 'new')    as new,
+  count(*) filter (where status = 'reviewing')               as reviewing,
+  count(*) filter (where status = 'shortlisted')             as shortlisted,
+  count(*) filter (where status = 'rejected')                as rejected,
+  count(*) filter (where status = 'hired')                   as hired
+from applications
+where job_id is not null
+group by job_id;
+
+-- ค่า department/level/country ที่มีอยู่จริง (distinct) สำหรับ autocomplete
+create or replace view job_option_values as
+select 'department'::text as kind, department as value from jobs where coalesce(department, '') <> '' group by department
+union all
+select 'level', level from jobs where coalesce(level, '') <> '' group by level
+union all
+select 'country', country from jobs where coalesce(country, '') <> '' group by country;
+
+-- view ทำงานด้วยสิทธิ์ของผู้เรียก (service_role) -> ไม่เปิดให้ anon อ่าน
+alter view job_applicant_counts set (security_invoker = true);
+alter view job_option_values    set (security_invoker = true);
+
+create index if not exists idx_applications_job_status on applications (job_id, status);
+create index if not exists idx_jobs_updated_at         on jobs (updated_at desc);
@@ -0,0 +1,75 @@
+-- =====================================================================
+-- SHD Careers — Phase 5: delta sync (/sync/jobs, /sync/content)
+-- รันใน Supabase: Dashboard -> SQL Editor -> วางทั้งไฟล์ -> Run
+-- ปลอดภัย/รันซ้ำได้
+--
+-- หลักการ: ผู้ใช้ปลายทางส่ง sync token (watermark ของ updated_at) มา
+-- backend คืนเฉพาะแถวที่ถูกสร้าง/แก้/ปิด/ลบหลังจากนั้น
+--   - updated_at ต้องขยับทุกครั้งที่แถวเปลี่ยน -> trigger (กันกรณี import CSV ที่ upsert ไม่ได้ส่ง updated_at)
+--   - แถวที่ถูกลบจะหายไปจากตาราง -> trigger เขียน tombstone ไว้ให้ sync รู้
+-- =====================================================================
+
+create table if not exists sync_tombstones (
+  entity     text not null,                 -- 'job' | 'content'
+  entity_key text not null,                 -- job_id หรือ key ของ site_content
+  lang       text not null default '',      -- เฉพาะ content ('' สำหรับ job)
+  deleted_at timestamptz not null default now(),
+  primary key (entity, entity_key, lang)
+);
+
+create index if not exists idx_sync_tombstones_cursor on sync_tombstones (entity, deleted_at, entity_key, lang);
+
+-- keyset index ตรงกับลำดับที่ /sync ใช้อ่าน
+create index if not exists idx_jobs_sync_cursor         on jobs (updated_at, job_id);
+create index if not exists idx_site_content_sync_cursor on site_content (updated_at, key, lang);
+
+-- ---------------------------------------------------------------------
+-- updated_at = now() ทุกครั้งที่ update
+-- ---------------------------------------------------------------------
+create or replace function sync_touch_updated_at() returns trigger
+language plpgsql as $$
+begin
+  new.updated_at := now();
+  return new;
+end $$;
+
+drop trigger if exists trg_jobs_touch_updated_at on jobs;
+create trigger trg_jobs_touch_updated_at
+  before update on jobs
+  for each row execute function sync_touch_updated_at();
+
+drop trigger if exists trg_site_content_touch_updated_at on site_content;
+create trigger trg_site_content_touch_updated_at
+  before update on site_content
+  for each row execute function sync_touch_updated_at();
+
+-- ---------------------------------------------------------------------
+-- tombstone เมื่อมีการลบ (admin_delete_job / admin_delete_content / SQL ตรงๆ)
+-- ---------------------------------------------------------------------
+create or replace function sync_record_tombstone() returns trigger
+language plpgsql as $$
+begin
+  if tg_table_name = 'jobs' then
+    insert into sync_tombstones (entity, entity_key, lang)
+    values ('job', old.job_id, '')
+    on conflict (entity, entity_key, lang) do update set deleted_at = now();
+  else
+    insert into sync_tombstones (entity, entity_key, lang)
+    values ('content', old.key, old.lang)
+    on conflict (entity, entity_key, lang) do update set deleted_at = now();
+  end if;
+  return old;
+end $$;
+
+drop trigger if exists trg_jobs_tombstone on jobs;
+create trigger trg_jobs_tombstone
+  after delete on jobs
+  for each row execute function sync_record_tombstone();
+
+drop trigger if exists trg_site_content_tombstone on site_content;
+create trigger trg_site_content_tombstone
+  after delete on site_content
+  for each row execute function sync_record_tombstone();
+
+-- อ่านผ่าน backend (service_role) เท่านั้น
+alter table sync_tombstones enable row level security;
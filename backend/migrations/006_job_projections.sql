@@ -0,0 +1,34 @@
+-- =====================================================================
+-- SHD Careers — Phase 5: public projection ของ jobs (resolve ภาษาไว้ตอนเขียน)
+-- รันใน Supabase: Dashboard -> SQL Editor -> วางทั้งไฟล์ -> Run
+-- ปลอดภัย/รันซ้ำได้ (ครั้งแรก Postgres เขียนตารางใหม่ทั้งตาราง — jobs เล็ก ใช้เวลาไม่กี่วินาที)
+--
+-- เดิม backend resolve title/location/desc/qual ทุกแถวทุกครั้งที่อ่าน (_job_public_shape):
+--   ภาษาที่ขอ -> en -> th -> zh (ค่าแรกที่ไม่ว่างหลัง strip)
+-- ตอนนี้ Postgres คำนวณเก็บไว้เป็น generated column ทุกครั้งที่ insert/update
+-- (admin_create_job / admin_update_job / import_jobs_from_csv.py / feed sync / SQL ตรงๆ)
+-- -> /jobs อ่าน pub_*_{lang} ด้วย alias เป็น shape สาธารณะได้ตรงๆ ไม่ต้องแปลงต่อแถวใน Python
+--
+-- ห้ามส่ง pub_* ใน insert/upsert (generated column เขียนไม่ได้)
+-- backend ที่ยังไม่เจอคอลัมน์เหล่านี้จะ fallback ไป shape ใน Python แบบเดิม
+-- =====================================================================
+
+alter table jobs
+  add column if not exists pub_title_th text generated always as (coalesce(nullif(btrim(title_th, E' \t\r\n'), ''), nullif(btrim(title_en, E' \t\r\n'), ''), nullif(btrim(title_zh, E' \t\r\n'), ''), '')) stored,
+  add column if not exists pub_title_en text generated always as (coalesce(nullif(btrim(title_en, E' \t\r\n'), ''), nullif(btrim(title_th, E' \t\r\n'), ''), nullif(btrim(title_zh, E' \t\r\n'), ''), '')) stored,
+  add column if not exists pub_title_zh text generated always as (coalesce(nullif(btrim(title_zh, E' \t\r\n'), ''), nullif(btrim(title_en, E' \t\r\n'), ''), nullif(btrim(title_th, E' \t\r\n'), ''), '')) stored,
+  add column if not exists pub_location_th text generated always as (coalesce(nullif(btrim(location_th, E' \t\r\n'), ''), nullif(btrim(location_en, E' \t\r\n'), ''), nullif(btrim(location_zh, E' \t\r\n'), ''), '')) stored,
+  add column if not exists pub_location_en text generated always as (coalesce(nullif(btrim(location_en, E' \t\r\n'), ''), nullif(btrim(location_th, E' \t\r\n'), ''), nullif(btrim(location_zh, E' \t\r\n'), ''), '')) stored,
+  add column if not exists pub_location_zh text generated always as (coalesce(nullif(btrim(location_zh, E' \t\r\n'), ''), nullif(btrim(location_en, E' \t\r\n'), ''), nullif(btrim(location_th, E' \t\r\n'), ''), '')) stored,
+  add column if not exists pub_desc_th text generated always as (coalesce(nullif(btrim(desc_th, E' \t\r\n'), ''), nullif(btrim(desc_en, E' \t\r\n'), ''), nullif(btrim(desc_zh, E' \t\r\n'), ''), '')) stored,
+  add column if not exists pub_desc_en text generated always as (coalesce(nullif(btrim(desc_en, E' \t\r\n'), ''), nullif(btrim(desc_th, E' \t\r\n'), ''), nullif(btrim(desc_zh, E' \t\r\n'), ''), '')) stored,
+  add column if not exists pub_desc_zh text generated always as (coalesce(nullif(btrim(desc_zh, E' \t\r\n'), ''), nullif(btrim(desc_en, E' \t\r\n'), ''), nullif(btrim(desc_th, E' \t\r\n'), ''), '')) stored,
+  add column if not exists pub_qual_th text generated always as (coalesce(nullif(btrim(qual_th, E' \t\r\n'), ''), nullif(btrim(qual_en, E' \t\r\n'), ''), nullif(btrim(qual_zh, E' \t\r\n'), ''), '')) stored,
+  add column if not exists pub_qual_en text generated always as (coalesce(nullif(btrim(qual_en, E' \t\r\n'), ''), nullif(btrim(qual_th, E' \t\r\n'), ''), nullif(btrim(qual_zh, E' \t\r\n'), ''), '')) stored,
+  add column if not exists pub_qual_zh text generated always as (coalesce(nullif(btrim(qual_zh, E' \t\r\n'), ''), nullif(btrim(qual_en, E' \t\r\n'), ''), nullif(btrim(qual_th, E' \t\r\n'), ''), '')) stored,
+  add column if not exists pub_department text generated always as (coalesce(nullif(btrim(department, E' \t\r\n'), ''), '')) stored,
+  add column if not exists pub_level text generated always as (coalesce(nullif(btrim(level, E' \t\r\n'), ''), '')) stored,
+  add column if not exists pub_country text generated always as (coalesce(nullif(btrim(country, E' \t\r\n'), ''), '')) stored;
+
+-- catalog อ่านงาน published เรียง updated_at ใหม่สุดก่อน (job_id เป็นลำดับรอง)
+create index if not exists idx_jobs_published_updated on jobs (status, updated_at desc, job_id);
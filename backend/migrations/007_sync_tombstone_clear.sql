@@ -0,0 +1,43 @@
+-- =====================================================================
+-- SHD Careers — Phase 5: ล้าง tombstone เมื่อ key เดิมถูกสร้างใหม่
+-- รันใน Supabase: Dashboard -> SQL Editor -> วางทั้งไฟล์ -> Run (หลัง 005)
+-- ปลอดภัย/รันซ้ำได้
+--
+-- เดิม: ลบงาน/ข้อความแล้วสร้าง key เดิมกลับมา -> tombstone ยังอยู่
+--   /sync/* คืน key เดียวกันทั้งใน upserts และ removed -> client ที่ apply removed ทีหลังลบแถวที่ยังใช้อยู่ทิ้ง
+-- ตอนนี้: insert ที่เจอ tombstone ของ key เดียวกัน -> ลบ tombstone และขยับ updated_at เป็น now()
+--   (แถวที่สร้างใหม่จึงเรียงหลังการลบเสมอ แม้ import จะส่ง updated_at เก่ามา)
+-- =====================================================================
+
+create or replace function sync_clear_tombstone() returns trigger
+language plpgsql as $$
+begin
+  if tg_table_name = 'jobs' then
+    delete from sync_tombstones where entity = 'job' and entity_key = new.job_id and lang = '';
+  else
+    delete from sync_tombstones where entity = 'content' and entity_key = new.key and lang = new.lang;
+  end if;
+  if found then
+    new.updated_at := now();
+  end if;
+  return new;
+end $$;
+
+drop trigger if exists trg_jobs_clear_tombstone on jobs;
+create trigger trg_jobs_clear_tombstone
+  before insert on jobs
+  for each row execute function sync_clear_tombstone();
+
+drop trigger if exists trg_site_content_clear_tombstone on site_content;
+create trigger trg_site_content_clear_tombstone
+  before insert on site_content
+  for each row execute function sync_clear_tombstone();
+
+-- tombstone ที่ค้างอยู่แล้วของ key ที่มีแถวอยู่ตอนนี้ (ถูกสร้างใหม่ก่อนรันไฟล์นี้)
+delete from sync_tombstones t
+using jobs j
+where t.entity = 'job' and t.entity_key = j.job_id and t.lang = '';
+
+delete from sync_tombstones t
+using site_content c
+where t.entity = 'content' and t.entity_key = c.key and t.lang = c.lang;
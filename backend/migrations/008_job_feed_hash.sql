@@ -0,0 +1,12 @@
+-- =====================================================================
+-- SHD Careers — Phase 5: เจ้าของแถวงานระหว่าง feed sync กับแอดมิน
+-- รันใน Supabase: Dashboard -> SQL Editor -> วางทั้งไฟล์ -> Run (หลัง 005)
+-- ปลอดภัย/รันซ้ำได้
+--
+-- feed_hash = hash เนื้อหา (ไม่รวม status) ที่ feed sync เขียนครั้งล่าสุด
+--   - เนื้อหาปัจจุบันไม่ตรง feed_hash -> แอดมินแก้หลัง sync -> sync ข้ามแถวนั้น
+--   - null = แถวที่ sync ยังไม่เคยเป็นเจ้าของ: sync รับเป็นของตัวเองเมื่อเนื้อหาตรง feed เท่านั้น
+-- ยังไม่รันไฟล์นี้: sync เพิ่มได้แค่งานใหม่ ไม่แก้แถวเดิม
+-- =====================================================================
+
+alter table jobs add column if not exists feed_hash text;
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Export ข้อมูลสาธารณะ (jobs list/detail, facets, CMS content) เป็นไฟล์ JSON แบบ hash
+สำหรับวางบน CDN — ใช้ logic เดียวกับ API (app/main.py + app/snapshot.py)
+
+วิธีใช้ (รันจากโฟลเดอร์ backend):
+  python3 scripts/export_static_snapshot.py ../frontend/public/snapshot
+  python3 scripts/export_static_snapshot.py --bucket careers-public
+
+รันซ้ำได้: เขียนเฉพาะไฟล์ที่เนื้อหาเปลี่ยน แล้วอัปเดต manifest.json เป็นขั้นสุดท้าย
+อ่าน env (SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY / GOOGLE_JOBS_FEED_URL) จาก backend/.env เหมือน API
+"""
+import os
+import sys
+import json
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import httpx  # noqa: E402
+
+from app import main as api  # noqa: E402
+
+
+async def run(out_dir: str, bucket: str) -> dict:
+    sinks = []
+    if out_dir:
+        sinks.append(("dir", api.LocalSink(out_dir)))
+    if bucket:
+        sinks.append(("storage", api.StorageSink(api.supabase_client(), bucket)))
+    # shared client ของแอป (ปกติสร้างตอน startup)
+    api.app.state.http = httpx.AsyncClient(timeout=api.HTTP_TIMEOUT, follow_redirects=True)
+    try:
+        return await api.export_snapshot(sinks)
+    finally:
+        await api.app.state.http.aclose()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Export static JSON snapshot for CDN hosting")
+    ap.add_argument("out_dir", nargs="?", default="", help="โฟลเดอร์ปลายทาง เช่น ../frontend/public/snapshot")
+    ap.add_argument("--bucket", default="", help="อัปโหลดขึ้น Supabase Storage bucket (public) แทน/เพิ่มจากโฟลเดอร์")
+    args = ap.parse_args()
+    if not args.out_dir and not args.bucket:
+        ap.error("ต้องระบุ out_dir หรือ --bucket อย่างน้อยหนึ่งอย่าง")
+
+    result = asyncio.run(run(args.out_dir, args.bucket))
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    if not result.get("ok"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,18 @@
 Import งานจากไฟล์ CSV (โครงสร้าง Google Sheet) เข้าตาราง jobs ใน Supabase
 ใช้ REST + service_role key (upsert ตาม job_id — รันซ้ำได้ ไม่สร้างซ้ำ)
 
+แบบ incremental:
+  1) ดึงงานที่มีอยู่แล้วจาก Supabase (ทีละหน้า) -> hash เนื้อหาต่อ job_id
+  2) อ่าน CSV ทีละแถว hash แบบเดียวกัน -> ส่งเฉพาะแถวใหม่/ที่เปลี่ยน
+  3) ส่งเป็นก้อน (--batch-size) หลาย request พร้อมกัน (--workers) + retry
+  4) (ถ้าสั่ง) ปิดงานที่ไม่มีใน CSV แล้ว (--close-missing)
+     กันไฟล์ว่าง/ขาด/ผิดไฟล์: CSV 0 แถว หรือจะปิดเกิน --close-max-ratio ของงานที่เปิดอยู่ -> ไม่ปิด (exit 1)
+     เว้นแต่ใส่ --force
+
 วิธีใช้:
   python3 scripts/import_jobs_from_csv.py "/path/to/Thailand - SHD Career - TH-Job.csv"
+  python3 scripts/import_jobs_from_csv.py jobs.csv --dry-run
+  python3 scripts/import_jobs_from_csv.py jobs.csv --batch-size 100 --workers 4 --close-missing
 
 อ่านค่า SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY จาก env ก่อน
 ถ้าไม่มี จะ parse จาก backend/.env ให้อัตโนมัติ
@@ -14,7 +24,14 @@ import os
 import sys
 import csv
 import json
+import time
+import hashlib
+import argparse
+import urllib.error
+import urllib.parse
 import urllib.request
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 JOB_COLS = [
     "job_id", "status", "country", "department", "level",
@@ -23,6 +40,8 @@ JOB_COLS = [
     "desc_th", "desc_en", "desc_zh",
     "qual_th", "qual_en", "qual_zh",
 ]
+HASH_COLS = JOB_COLS + ["quantity"]
+FETCH_PAGE = 1000
 
 
 def load_env():
@@ -55,18 +74,18 @@ def to_int(s):
         return None
 
 
-def main():
-    if len(sys.argv) < 2:
-        print("usage: import_jobs_from_csv.py <csv_path>")
-        sys.exit(1)
-    csv_path = sys.argv[1]
-    url, key = load_env()
-    if not url or not key:
-        print("❌ ไม่พบ SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY")
-        sys.exit(1)
+def row_hash(row):
+    """hash เฉพาะคอลัมน์เนื้อหา (ไม่รวม created_at/updated_at) — ค่า None กับ "" ถือว่าเท่ากัน"""
+    norm = {c: ("" if row.get(c) is None else row.get(c)) for c in HASH_COLS}
+    if norm["quantity"] == "":
+        norm["quantity"] = None
+    raw = json.dumps(norm, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
-    rows = []
-    with open(csv_path, encoding="utf-8-sig") as f:
+
+def csv_payloads(csv_path):
+    """อ่าน CSV ทีละแถว (ไม่โหลดทั้งไฟล์เข้า memory)"""
+    with open(csv_path, encoding="utf-8-sig", newline="") as f:
         for r in csv.DictReader(f):
             jid = (r.get("job_id") or "").strip()
             if not jid:
@@ -75,25 +94,189 @@ def main():
             payload["job_id"] = jid
             payload["status"] = (r.get("status") or "draft").strip() or "draft"
             payload["quantity"] = to_int(r.get("Quantity"))
-            rows.append(payload)
+            yield payload
+
 
-    print(f"อ่าน {len(rows)} งานจาก CSV")
+class Rest:
+    def __init__(self, url, key, timeout, retries):
+        self.base = f"{url}/rest/v1"
+        self.key = key
+        self.timeout = timeout
+        self.retries = retries
 
-    endpoint = f"{url}/rest/v1/jobs?on_conflict=job_id"
-    body = json.dumps(rows).encode("utf-8")
-    req = urllib.request.Request(endpoint, data=body, method="POST")
-    req.add_header("apikey", key)
-    req.add_header("Authorization", f"Bearer {key}")
-    req.add_header("Content-Type", "application/json")
-    req.add_header("Prefer", "resolution=merge-duplicates,return=minimal")
+    def call(self, method, path, body=None, prefer=None):
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        for attempt in range(self.retries + 1):
+            req = urllib.request.Request(f"{self.base}/{path}", data=data, method=method)
+            req.add_header("apikey", self.key)
+            req.add_header("Authorization", f"Bearer {self.key}")
+            req.add_header("Content-Type", "application/json")
+            if prefer:
+                req.add_header("Prefer", prefer)
+            try:
+                with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                    raw = resp.read()
+                    return json.loads(raw) if raw else None
+            except urllib.error.HTTPError as e:
+                # 4xx (ยกเว้น 408/429) = ข้อมูลผิด ลองซ้ำก็ไม่ผ่าน
+                retryable = e.code >= 500 or e.code in (408, 429)
+                if not retryable or attempt == self.retries:
+                    raise RuntimeError(f"HTTP {e.code}: {e.read().decode('utf-8', 'ignore')[:500]}")
+            except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+                if attempt == self.retries:
+                    raise RuntimeError(f"request failed: {e}")
+            time.sleep(min(30, 0.5 * (2 ** attempt)))
 
+
+def fetch_existing(rest):
+    """{job_id: (hash, status)} ของงานที่อยู่ใน Supabase แล้ว"""
+    out = {}
+    offset = 0
+    select = urllib.parse.quote(",".join(HASH_COLS), safe=",")
+    while True:
+        rows = rest.call("GET", f"jobs?select={select}&order=job_id&limit={FETCH_PAGE}&offset={offset}") or []
+        for r in rows:
+            out[r["job_id"]] = (row_hash(r), r.get("status"))
+        if len(rows) < FETCH_PAGE:
+            return out
+        offset += FETCH_PAGE
+
+
+def chunks(it, size):
+    buf = []
+    for x in it:
+        buf.append(x)
+        if len(buf) >= size:
+            yield buf
+            buf = []
+    if buf:
+        yield buf
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Incremental CSV -> Supabase jobs importer")
+    ap.add_argument("csv_path")
+    ap.add_argument("--batch-size", type=int, default=200, help="จำนวนแถวต่อ 1 request (default 200)")
+    ap.add_argument("--workers", type=int, default=4, help="จำนวน request พร้อมกัน (default 4)")
+    ap.add_argument("--retries", type=int, default=3, help="ลองซ้ำเมื่อ 5xx/timeout (default 3)")
+    ap.add_argument("--timeout", type=float, default=30, help="timeout ต่อ request วินาที (default 30)")
+    ap.add_argument("--close-missing", action="store_true", help="ปิด (status=closed) งานที่ไม่มีใน CSV แล้ว")
+    ap.add_argument("--close-max-ratio", type=float, default=0.2,
+                    help="(--close-missing) ปิดได้ไม่เกินสัดส่วนนี้ของงานที่เปิดอยู่ (default 0.2)")
+    ap.add_argument("--force", action="store_true", help="(--close-missing) ข้ามการป้องกันด้านบน")
+    ap.add_argument("--dry-run", action="store_true", help="แสดงผลต่างเท่านั้น ไม่เขียนอะไร")
+    args = ap.parse_args()
+
+    url, key = load_env()
+    if not url or not key:
+        print("❌ ไม่พบ SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY")
+        sys.exit(1)
+
+    t0 = time.time()
+    rest = Rest(url, key, args.timeout, max(0, args.retries))
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            print(f"✅ upsert สำเร็จ HTTP {resp.status} — {len(rows)} งานเข้า Supabase แล้ว")
-    except urllib.error.HTTPError as e:
-        print(f"❌ HTTP {e.code}: {e.read().decode('utf-8', 'ignore')[:500]}")
+        existing = fetch_existing(rest)
+    except RuntimeError as e:
+        print(f"❌ ดึงงานเดิมไม่สำเร็จ: {e}")
+        sys.exit(1)
+    print(f"มีงานใน Supabase แล้ว {len(existing)} งาน")
+
+    stats = {"read": 0, "new": 0, "changed": 0, "unchanged": 0, "duplicate": 0, "sent": 0, "failed": 0}
+    seen = set()
+    now_iso = datetime.now(timezone.utc).isoformat()
+
+    def changed_rows():
+        for p in csv_payloads(args.csv_path):
+            stats["read"] += 1
+            jid = p["job_id"]
+            if jid in seen:
+                stats["duplicate"] += 1
+                print(f"⚠️  job_id ซ้ำใน CSV ข้ามแถวหลัง: {jid}")
+                continue
+            seen.add(jid)
+            old = existing.get(jid)
+            if old and old[0] == row_hash(p):
+                stats["unchanged"] += 1
+                continue
+            stats["new" if old is None else "changed"] += 1
+            if args.dry_run:
+                print(f"  {'+' if old is None else '~'} {jid}")
+                continue
+            p["updated_at"] = now_iso
+            yield p
+
+    def send(batch):
+        try:
+            rest.call("POST", "jobs?on_conflict=job_id", batch, prefer="resolution=merge-duplicates,return=minimal")
+            return len(batch), None
+        except RuntimeError as e:
+            return len(batch), e
+
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        pending = set()
+        for batch in chunks(changed_rows(), max(1, args.batch_size)):
+            pending.add(pool.submit(send, batch))
+            # จำกัดจำนวน batch ที่ค้างอยู่ -> memory คงที่แม้ CSV ใหญ่
+            while len(pending) >= args.workers * 2:
+                done = next(as_completed(pending))
+                pending.discard(done)
+                _collect(done, stats)
+        for done in as_completed(pending):
+            _collect(done, stats)
+
+    closed = 0
+    blocked = False
+    if args.close_missing:
+        missing = sorted(j for j, (_, st) in existing.items() if j not in seen and st != "closed")
+        n_open = sum(1 for _, st in existing.values() if st != "closed")
+        refuse = ""
+        if not seen:
+            refuse = "CSV ไม่มีงานเลย"
+        elif missing and len(missing) > args.close_max_ratio * n_open:
+            refuse = f"จะปิด {len(missing)} จาก {n_open} งานที่เปิดอยู่ (เกิน {args.close_max_ratio:.0%})"
+        if refuse and not args.force:
+            print(f"❌ ไม่ปิดงาน: {refuse} — ตรวจไฟล์ CSV ก่อน หรือใส่ --force ถ้าตั้งใจ")
+            blocked = True
+            missing = []
+        if args.dry_run:
+            for j in missing:
+                print(f"  - {j} (close)")
+            closed = len(missing)
+        else:
+            for batch in chunks(missing, max(1, args.batch_size)):
+                ids = ",".join('"' + j.replace('"', '\\"') + '"' for j in batch)
+                try:
+                    rest.call(
+                        "PATCH", f"jobs?job_id=in.({urllib.parse.quote(ids)})",
+                        {"status": "closed", "updated_at": now_iso}, prefer="return=minimal",
+                    )
+                    closed += len(batch)
+                except RuntimeError as e:
+                    stats["failed"] += len(batch)
+                    print(f"❌ close batch failed: {e}")
+
+    elapsed = max(time.time() - t0, 1e-6)
+    mode = "DRY-RUN " if args.dry_run else ""
+    print(
+        f"{mode}สรุป: อ่าน {stats['read']} แถว | ใหม่ {stats['new']} | เปลี่ยน {stats['changed']} | "
+        f"เหมือนเดิม {stats['unchanged']} | ซ้ำ {stats['duplicate']} | ปิด {closed}"
+    )
+    print(
+        f"{mode}ส่งสำเร็จ {stats['sent']} แถว | ล้มเหลว {stats['failed']} | "
+        f"{elapsed:.2f}s | {stats['read'] / elapsed:.0f} แถว/วิ (อ่าน) | {stats['sent'] / elapsed:.0f} แถว/วิ (เขียน)"
+    )
+    if stats["failed"] or blocked:
         sys.exit(1)
 
 
+def _collect(fut, stats):
+    n, err = fut.result()
+    if err is None:
+        stats["sent"] += n
+    else:
+        stats["failed"] += n
+        print(f"❌ batch failed ({n} แถว): {err}")
+
+
 if __name__ == "__main__":
     main()
@@ -94,6 +94,7 @@ export type AdminApplication = {
   source_channel?: string;
   created_at?: string;
   reviewed_at?: string;
+  match_score?: number; // 0-1 เฉพาะ sort=match
 };
 
 export type AdminApplicationDetail = {
@@ -131,6 +132,7 @@ export type AdminJob = {
   level?: string;
   quantity?: number | null;
   applicant_count?: number;
+  applicant_by_status?: Record<string, number>;
   title_th?: string;
   title_en?: string;
   title_zh?: string;
@@ -191,6 +193,7 @@ export type ListResponse = {
   total: number;
   page: number;
   page_size: number;
+  sort?: "match";
 };
 
 export const STATUS_LIST = ["new", "reviewing", "shortlisted", "rejected", "hired"] as const;
@@ -228,6 +231,7 @@ export const adminApi = {
     q?: string;
     status?: string;
     job_id?: string;
+    sort?: "" | "newest" | "match"; // match ต้องมี job_id
     page?: number;
     page_size?: number;
   }) {
@@ -235,6 +239,7 @@ export const adminApi = {
     if (params.q) sp.set("q", params.q);
     if (params.status) sp.set("status", params.status);
     if (params.job_id) sp.set("job_id", params.job_id);
+    if (params.sort) sp.set("sort", params.sort);
     sp.set("page", String(params.page ?? 1));
     sp.set("page_size", String(params.page_size ?? 20));
     return request<ListResponse>(`/admin/applications?${sp.toString()}`);
@@ -244,11 +249,22 @@ export const adminApi = {
     return request<AdminApplicationDetail>(`/admin/applications/${encodeURIComponent(id)}`);
   },
 
-  async exportApplications(params: { q?: string; status?: string } = {}): Promise<Blob> {
+  async exportApplications(
+    params: {
+      q?: string;
+      status?: string;
+      job_id?: string;
+      format?: "csv" | "xlsx";
+      include?: Array<"educations" | "experiences" | "skills" | "attachments">;
+    } = {}
+  ): Promise<Blob> {
     if (!API_BASE) throw new AdminApiError(0, "ยังไม่ได้ตั้งค่า VITE_API_BASE");
     const sp = new URLSearchParams();
     if (params.q) sp.set("q", params.q);
     if (params.status) sp.set("status", params.status);
+    if (params.job_id) sp.set("job_id", params.job_id);
+    if (params.format) sp.set("format", params.format);
+    if (params.include?.length) sp.set("include", params.include.join(","));
     const res = await fetch(`${API_BASE}/admin/applications/export?${sp.toString()}`, {
       headers: { Authorization: `Bearer ${getToken()}` },
     });
@@ -268,17 +284,39 @@ export const adminApi = {
     );
   },
 
+  bulkUpdateApplications(body: {
+    ids?: string[];
+    filter?: { status?: string; job_id?: string; q?: string };
+    expected_count?: number;
+    status?: string;
+    admin_note?: string;
+  }) {
+    return request<{
+      ok: boolean;
+      updated: number;
+      failed: number;
+      results: { id: string; result: "updated" | "not_found" | "invalid" | "error" }[];
+    }>("/admin/applications/bulk", { method: "POST", body: JSON.stringify(body) });
+  },
+
   // ----- Jobs -----
-  listJobs(params: { q?: string; status?: string } = {}) {
+  listJobs(params: { q?: string; status?: string; page?: number; page_size?: number } = {}) {
     const sp = new URLSearchParams();
     if (params.q) sp.set("q", params.q);
     if (params.status) sp.set("status", params.status);
+    if (params.page) sp.set("page", String(params.page));
+    if (params.page_size) sp.set("page_size", String(params.page_size));
     const qs = sp.toString();
-    return request<{ ok: boolean; rows: AdminJob[]; total: number }>(
+    return request<{ ok: boolean; rows: AdminJob[]; total: number; page: number; page_size: number }>(
       `/admin/jobs${qs ? `?${qs}` : ""}`
     );
   },
 
+  /** ทุกงานแบบย่อ (ไม่แบ่งหน้า) สำหรับ dropdown */
+  jobChoices() {
+    return request<{ ok: boolean; rows: AdminJob[]; total: number }>("/admin/jobs/choices");
+  },
+
   jobOptions() {
     return request<JobOptions>("/admin/job-options");
   },
@@ -31,6 +31,8 @@ export default function ApplicationsPage() {
   const [searchInput, setSearchInput] = useState(searchParams.get("q") || "");
   const q = searchParams.get("q") || "";
   const jobId = searchParams.get("job_id") || "";
+  // เรียงตามความเข้ากันได้เฉพาะเมื่อเลือกตำแหน่งงานแล้ว (คะแนนเทียบกับคุณสมบัติของงานนั้น)
+  const sort = jobId && searchParams.get("sort") === "match" ? "match" : "";
 
   const [rows, setRows] = useState<AdminApplication[]>([]);
   const [total, setTotal] = useState(0);
@@ -39,7 +41,7 @@ export default function ApplicationsPage() {
 
   const [jobs, setJobs] = useState<AdminJob[]>([]);
   useEffect(() => {
-    adminApi.listJobs().then((r) => setJobs(r.rows)).catch(() => {});
+    adminApi.jobChoices().then((r) => setJobs(r.rows)).catch(() => {});
   }, []);
   const selectedJob = jobs.find((j) => j.job_id === jobId);
   const jobTitleById = useMemo(
@@ -52,7 +54,7 @@ export default function ApplicationsPage() {
     setLoading(true);
     setError(null);
     adminApi
-      .listApplications({ q, status, job_id: jobId, page, page_size: PAGE_SIZE })
+      .listApplications({ q, status, job_id: jobId, sort, page, page_size: PAGE_SIZE })
       .then((res) => {
         if (!alive) return;
         setRows(res.rows);
@@ -63,7 +65,7 @@ export default function ApplicationsPage() {
     return () => {
       alive = false;
     };
-  }, [q, status, jobId, page]);
+  }, [q, status, jobId, sort, page]);
 
   const updateParam = (patch: Record<string, string | null>) => {
     const next = new URLSearchParams(searchParams);
@@ -131,7 +133,7 @@ export default function ApplicationsPage() {
         <select
           className="input sm:w-72"
           value={jobId}
-          onChange={(e) => updateParam({ job_id: e.target.value || null })}
+          onChange={(e) => updateParam({ job_id: e.target.value || null, sort: e.target.value ? sort : null })}
         >
           <option value="">ทุกตำแหน่งงาน</option>
           {jobs.map((j) => (
@@ -142,6 +144,17 @@ export default function ApplicationsPage() {
           ))}
         </select>
 
+        {jobId && (
+          <select
+            className="input sm:w-56"
+            value={sort}
+            onChange={(e) => updateParam({ sort: e.target.value || null })}
+          >
+            <option value="">ใหม่สุดก่อน</option>
+            <option value="match">ตรงคุณสมบัติมากสุด</option>
+          </select>
+        )}
+
         <div className="flex flex-wrap gap-2">
           <button
             onClick={() => updateParam({ status: null })}
@@ -167,7 +180,7 @@ export default function ApplicationsPage() {
           <span className="text-blue-800">
             กำลังดูผู้สมัครตำแหน่ง <span className="font-bold">{selectedJob ? jobLabel(selectedJob) : jobId}</span>
           </span>
-          <button onClick={() => updateParam({ job_id: null })} className="font-semibold text-blue-700 hover:underline">
+          <button onClick={() => updateParam({ job_id: null, sort: null })} className="font-semibold text-blue-700 hover:underline">
             ล้างตัวกรอง
           </button>
         </div>
@@ -188,6 +201,7 @@ export default function ApplicationsPage() {
             <table className="w-full text-left text-sm">
               <thead className="border-b border-gray-200 bg-gray-50 text-xs uppercase text-gray-500">
                 <tr>
+                  {sort === "match" && <th className="px-4 py-3 font-semibold">ความเข้ากัน</th>}
                   <th className="px-4 py-3 font-semibold">ชื่อ</th>
                   <th className="px-4 py-3 font-semibold">ตำแหน่ง / แผนก</th>
                   <th className="px-4 py-3 font-semibold">ติดต่อ</th>
@@ -198,6 +212,11 @@ export default function ApplicationsPage() {
               <tbody>
                 {rows.map((r) => (
                   <tr key={r.id} className="border-b border-gray-100 last:border-0 hover:bg-gray-50">
+                    {sort === "match" && (
+                      <td className="px-4 py-3 font-semibold tabular-nums text-gray-700">
+                        {Math.round((r.match_score ?? 0) * 100)}%
+                      </td>
+                    )}
                     <td className="px-4 py-3">
                       <Link to={`/admin/applications/${r.id}`} className="font-semibold text-blue-700 hover:underline">
                         {r.first_name} {r.last_name}
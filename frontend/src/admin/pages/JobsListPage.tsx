@@ -1,6 +1,17 @@
 import { useEffect, useState, useCallback } from "react";
 import { Link } from "react-router-dom";
-import { Loader2, Search, Plus, Pencil, Trash2, Eye, EyeOff, Briefcase } from "lucide-react";
+import {
+  Loader2,
+  Search,
+  Plus,
+  Pencil,
+  Trash2,
+  Eye,
+  EyeOff,
+  Briefcase,
+  ChevronLeft,
+  ChevronRight,
+} from "lucide-react";
 import {
   adminApi,
   JOB_STATUS_LABEL,
@@ -20,8 +31,12 @@ function fmtDate(s?: string): string {
   return d.toLocaleDateString("th-TH", { dateStyle: "medium" });
 }
 
+const PAGE_SIZE = 50;
+
 export default function JobsListPage() {
   const [rows, setRows] = useState<AdminJob[]>([]);
+  const [total, setTotal] = useState(0);
+  const [page, setPage] = useState(1);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [q, setQ] = useState("");
@@ -32,17 +47,25 @@ export default function JobsListPage() {
     setLoading(true);
     setError(null);
     adminApi
-      .listJobs({ q: q.trim(), status })
-      .then((res) => setRows(res.rows))
+      .listJobs({ q: q.trim(), status, page, page_size: PAGE_SIZE })
+      .then((res) => {
+        setRows(res.rows);
+        setTotal(res.total);
+      })
       .catch((e) => setError(e.message || "โหลดข้อมูลไม่สำเร็จ"))
       .finally(() => setLoading(false));
-  }, [q, status]);
+  }, [q, status, page]);
 
   useEffect(() => {
     const t = setTimeout(load, 250); // debounce ค้นหา
     return () => clearTimeout(t);
   }, [load]);
 
+  // เปลี่ยนคำค้น/สถานะ -> กลับหน้า 1
+  useEffect(() => setPage(1), [q, status]);
+
+  const totalPages = Math.max(1, Math.ceil(total / PAGE_SIZE));
+
   const togglePublish = async (j: AdminJob) => {
     const next = j.status === "published" ? "draft" : "published";
     setBusy(j.job_id);
@@ -62,6 +85,7 @@ export default function JobsListPage() {
     try {
       await adminApi.deleteJob(j.job_id);
       setRows((rs) => rs.filter((r) => r.job_id !== j.job_id));
+      setTotal((t) => Math.max(0, t - 1));
     } catch (e: any) {
       alert(e.message || "ลบไม่สำเร็จ");
     } finally {
@@ -74,7 +98,7 @@ export default function JobsListPage() {
       <PageHeader
         icon={<Briefcase className="h-5 w-5" />}
         title="ประกาศงาน"
-        subtitle={`ทั้งหมด ${rows.length} ตำแหน่ง`}
+        subtitle={`ทั้งหมด ${total} ตำแหน่ง`}
         actions={
           <Link to="/admin/jobs/new" className="btn-primary shadow-lg shadow-blue-600/20">
             <Plus className="mr-1 h-4 w-4" /> สร้างงานใหม่
@@ -203,6 +227,31 @@ export default function JobsListPage() {
           </div>
         )}
       </div>
+
+      {/* Pagination */}
+      {!loading && !error && total > PAGE_SIZE && (
+        <div className="mt-4 flex items-center justify-between">
+          <div className="muted">
+            หน้า {page} / {totalPages}
+          </div>
+          <div className="flex gap-2">
+            <button
+              disabled={page <= 1}
+              onClick={() => setPage((p) => p - 1)}
+              className="btn-secondary disabled:opacity-40"
+            >
+              <ChevronLeft className="h-4 w-4" />
+            </button>
+            <button
+              disabled={page >= totalPages}
+              onClick={() => setPage((p) => p + 1)}
+              className="btn-secondary disabled:opacity-40"
+            >
+              <ChevronRight className="h-4 w-4" />
+            </button>
+          </div>
+        </div>
+      )}
     </div>
   );
 }
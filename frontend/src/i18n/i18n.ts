@@ -4,6 +4,7 @@ import { initReactI18next } from "react-i18next";
 import th from "./locales/th/common.json";
 import en from "./locales/en/common.json";
 import zh from "./locales/zh/common.json";
+import { snapshotJson } from "../lib/snapshot";
 
 const STORAGE_KEY = "shd_lang";
 
@@ -58,6 +59,13 @@ function unflatten(flat: Record<string, any>): Record<string, any> {
 export async function loadContentOverrides(lng: string): Promise<void> {
   if (!API_BASE || loadedOverrides.has(lng)) return;
   loadedOverrides.add(lng);
+  // ✅ snapshot (CDN) เก็บ bundle ที่ merge กับ default แล้ว (nested) — ไม่มี -> ถาม API
+  const snap = await snapshotJson<{ items?: Record<string, any> }>(`content/${lng}.json`);
+  if (snap?.items && typeof snap.items === "object" && Object.keys(snap.items).length) {
+    i18n.addResourceBundle(lng, "translation", snap.items, true, true);
+    i18n.emit("languageChanged", i18n.language); // re-render
+    return;
+  }
   try {
     const res = await fetch(`${API_BASE}/content?lang=${encodeURIComponent(lng)}`, {
       headers: { Accept: "application/json" },
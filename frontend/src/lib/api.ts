@@ -1,5 +1,6 @@
 import type { Job, JobsResponse, Language } from "./types";
 import { MOCK_JOBS } from "./mock";
+import { safeSegment, snapshotJson } from "./snapshot";
 
 const API_BASE = import.meta.env.VITE_API_BASE as string | undefined;
 
@@ -72,6 +73,20 @@ export async function listJobs(args: {
     return { jobs: filtered, total: filtered.length };
   }
 
+  // ✅ snapshot (CDN): ทั้งรายการของภาษานี้แล้วกรองใน browser แบบเดียวกับ facet_search ของ backend
+  //    (facet ตรงตัว, คำค้น = substring ของ title/department/level/location/country แบบไม่สนตัวพิมพ์)
+  const snap = await snapshotJson(`jobs/${args.lang}.json`);
+  if (snap) {
+    const all = normalizeJobsResponse(snap);
+    const q = (args.q ?? "").toLowerCase().trim();
+    const jobs = all.jobs
+      .filter((j) => (!args.country || args.country === "ALL" ? true : j.country === args.country))
+      .filter((j) => (!args.department || args.department === "ALL" ? true : j.department === args.department))
+      .filter((j) => (!args.level || args.level === "ALL" ? true : j.level === args.level))
+      .filter((j) => (!q ? true : `${j.title} ${j.department} ${j.level} ${j.location} ${j.country}`.toLowerCase().includes(q)));
+    return { jobs, total: jobs.length, version: all.version };
+  }
+
   const url = `${API_BASE}/jobs${qs({
     lang: args.lang,
     q: args.q,
@@ -106,6 +121,10 @@ export async function getJob(jobId: string, lang: Language): Promise<Job | null>
     return MOCK_JOBS.find((j) => j.job_id === jobId) ?? null;
   }
 
+  // งานที่ไม่อยู่ใน snapshot (เพิ่งเผยแพร่หลัง export) -> ถาม API
+  const snap = normalizeJobDetail(await snapshotJson(`jobs/${lang}/${safeSegment(jobId)}.json`));
+  if (snap && snap.job_id === jobId) return snap;
+
   const res = await fetch(`${API_BASE}/jobs/${encodeURIComponent(jobId)}${qs({ lang })}`, {
     headers: { Accept: "application/json" },
   });
@@ -0,0 +1,43 @@
+// ---------------------------------------------------------------
+// ✅ Static snapshot (backend/app/snapshot.py) — อ่านข้อมูลสาธารณะจาก CDN แทน API
+//    VITE_SNAPSHOT_BASE = URL โฟลเดอร์ snapshot (เช่น "/snapshot" หรือ https://cdn.../snapshot)
+//    manifest.json (cache สั้น) -> ชื่อไฟล์ hash ล่าสุด (immutable)
+//    ไม่ได้ตั้ง / โหลดไม่ได้ / ไม่มีไฟล์ใน manifest -> คืน null ให้ผู้เรียก fallback ไป API
+// ---------------------------------------------------------------
+const SNAPSHOT_BASE = ((import.meta.env.VITE_SNAPSHOT_BASE as string | undefined) || "").replace(/\/+$/, "");
+const MANIFEST_TTL_MS = 60_000;
+
+type Manifest = { files: Record<string, string> };
+
+let manifest: { at: number; p: Promise<Manifest | null> } | null = null;
+
+export const snapshotEnabled = Boolean(SNAPSHOT_BASE);
+
+// เหมือน _safe_segment ใน snapshot.py (ชื่อไฟล์รายละเอียดงาน)
+export function safeSegment(s: string): string {
+  return s.replace(/[^A-Za-z0-9._-]/g, "_") || "_";
+}
+
+function loadManifest(): Promise<Manifest | null> {
+  if (manifest && Date.now() - manifest.at < MANIFEST_TTL_MS) return manifest.p;
+  const p = fetch(`${SNAPSHOT_BASE}/manifest.json`, { cache: "no-cache", headers: { Accept: "application/json" } })
+    .then((res) => (res.ok ? res.json() : null))
+    .then((data) => (data && typeof data.files === "object" ? (data as Manifest) : null))
+    .catch(() => null);
+  manifest = { at: Date.now(), p };
+  return p;
+}
+
+// logical path เช่น "jobs/th.json" -> JSON ของไฟล์ล่าสุด หรือ null
+export async function snapshotJson<T = unknown>(logical: string): Promise<T | null> {
+  if (!SNAPSHOT_BASE) return null;
+  const m = await loadManifest();
+  const name = m?.files[logical];
+  if (!name) return null;
+  try {
+    const res = await fetch(`${SNAPSHOT_BASE}/${name}`, { headers: { Accept: "application/json" } });
+    return res.ok ? ((await res.json()) as T) : null;
+  } catch {
+    return null;
+  }
+}